@@ -0,0 +1,238 @@
+"""
+Local materialized ad-bundle store
+
+One directory per Drive ad folder, filled by the pipeline stages:
+
+    <root>/<folder_id>/bundle.json      - name, status, hashes, timestamps
+                      /ad.txt           - ad text as downloaded          (sync)
+                      /params.txt       - prepared parameters, if any    (sync)
+                      /raw/*            - original images                (sync)
+                      /extracted.json   - extractor output (kept for retries) (prepare)
+                      /cleaned.txt      - cleaned ad text                (prepare)
+                      /parameters.json  - validated form parameters      (prepare)
+                      /images/*         - processed images for upload    (prepare)
+
+sync only talks to Drive, prepare only to the extractor (in bulk and in
+parallel), post only reads the store - so the browser never waits on
+Drive or OpenAI.
+
+Bundle status (written durably before each step, so a crashed run can resume):
+
+    synced (queued) -> prepared -> submitting -> submitted -> verified
+    or empty / invalid / failed
+
+"submitting" is set right before the form is sent. A bundle still in that
+state after a crash - or whose ad was accepted but not yet found in the
+ad list - may or may not be online; it is reconciled against the account's
+ad list (OrbitaFormFillerV2.reconcile_submitting) instead of being posted
+again. "submitted" is only used when VERIFY_POSTED_ADS is off.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+SYNCED = "synced"
+EMPTY = "empty"
+PREPARED = "prepared"
+INVALID = "invalid"
+SUBMITTING = "submitting"
+SUBMITTED = "submitted"
+VERIFIED = "verified"
+FAILED = "failed"
+
+# The ad is online (or was accepted by the form) - never post it again
+POSTED_STATUSES = (SUBMITTED, VERIFIED)
+
+META_FILE = "bundle.json"
+
+
+def drive_listing_hash(files: List[Dict]) -> str:
+    """Hash of a folder listing (id, name, modifiedTime, size) - changes when any file changes"""
+    entries = sorted((f.get('id', ""), f.get('name', ""), f.get('modifiedTime', ""), str(f.get('size', "")))
+                     for f in files)
+    return hashlib.sha1(json.dumps(entries, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def fsync_directory(directory: str):
+    """Make a rename inside directory durable (no-op where directories cannot be opened)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class AdBundleStore:
+    """Directory-per-ad store shared by the sync, prepare and post stages"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, folder_id: str, *parts: str) -> str:
+        return os.path.join(self.root, folder_id, *parts)
+
+    # ------------------------------------------------------------ metadata
+
+    def load(self, folder_id: str) -> Optional[Dict]:
+        meta_path = self.path(folder_id, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read bundle {folder_id}: {e}")
+            return None
+
+    def save(self, meta: Dict):
+        """Write bundle.json atomically and durably (readers never see a half-written file,
+        a crash right after save() does not lose it)"""
+        directory = self.path(meta['folder_id'])
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".bundle-", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path(meta['folder_id'], META_FILE))
+        fsync_directory(directory)
+
+    def update(self, folder_id: str, **fields) -> Dict:
+        meta = self.load(folder_id) or {'folder_id': folder_id}
+        meta.update(fields)
+        self.save(meta)
+        return meta
+
+    def transition(self, folder_id: str, status: str, **fields) -> Dict:
+        """Change the status (recorded in the bundle's history with a timestamp)"""
+        meta = self.load(folder_id) or {'folder_id': folder_id}
+        meta.update(fields)
+        meta['status'] = status
+        meta.setdefault('history', []).append([status, datetime.now().isoformat(timespec='seconds')])
+        self.save(meta)
+        return meta
+
+    def list_bundles(self, status: Optional[str] = None) -> List[Dict]:
+        """All bundles (optionally with one status), in folder name order"""
+        bundles = []
+        for folder_id in os.listdir(self.root):
+            meta = self.load(folder_id) if not folder_id.startswith('.') else None
+            if meta and (status is None or meta.get('status') == status):
+                bundles.append(meta)
+        return sorted(bundles, key=lambda m: m.get('folder_name', ""))
+
+    # ------------------------------------------------------------ sync
+
+    def write_synced(self, folder_id: str, folder_name: str, listing_hash: str, ad_text: str,
+                     params_text: Optional[str], image_paths: List[str]) -> Dict:
+        """Store the raw Drive data of an ad (images are moved into the bundle)"""
+        directory = self.path(folder_id)
+        # Old prepared output belongs to the old content
+        for stale in ("raw", "images", "cleaned.txt", "parameters.json", "params.txt", "extracted.json"):
+            stale_path = os.path.join(directory, stale)
+            if os.path.isdir(stale_path):
+                shutil.rmtree(stale_path)
+            elif os.path.exists(stale_path):
+                os.remove(stale_path)
+
+        raw_dir = self.path(folder_id, "raw")
+        os.makedirs(raw_dir, exist_ok=True)
+        self._write_text(folder_id, "ad.txt", ad_text)
+        if params_text is not None:
+            self._write_text(folder_id, "params.txt", params_text)
+
+        raw_images = []
+        for path in image_paths:
+            target = os.path.join(raw_dir, os.path.basename(path))
+            shutil.move(path, target)
+            raw_images.append(os.path.basename(path))
+
+        return self.transition(folder_id, SYNCED if ad_text.strip() else EMPTY,
+                               folder_name=folder_name,
+                               listing_hash=listing_hash,
+                               raw_images=raw_images,
+                               synced_at=datetime.now().isoformat(timespec='seconds'),
+                               prepared_hash=None,
+                               errors={},
+                               content_hash=self.content_hash(folder_id, raw_images))
+
+    def content_hash(self, folder_id: str, raw_images: List[str]) -> str:
+        """Hash of everything sync stored: ad text, params.txt and image bytes"""
+        digest = hashlib.sha1()
+        for name in ["ad.txt", "params.txt"] + [os.path.join("raw", image) for image in raw_images]:
+            path = self.path(folder_id, name)
+            digest.update(name.encode('utf-8'))
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 16), b''):
+                        digest.update(chunk)
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------ prepare / post
+
+    def write_prepared(self, folder_id: str, cleaned_text: str, parameters: Dict[str, str],
+                       images: List[str], prepared_hash: str, status: str = PREPARED,
+                       errors: Optional[Dict[str, str]] = None) -> Dict:
+        self._write_text(folder_id, "cleaned.txt", cleaned_text)
+        self._write_text(folder_id, "parameters.json", json.dumps(parameters, ensure_ascii=False, indent=1))
+        return self.transition(folder_id, status, images=images, prepared_hash=prepared_hash,
+                               errors=errors or {}, prepared_at=datetime.now().isoformat(timespec='seconds'))
+
+    def write_extracted(self, folder_id: str, parameters: Dict[str, str], prepared_hash: str):
+        """Keep the extractor output, so a failed prepare does not call the extractor again"""
+        self._write_text(folder_id, "extracted.json",
+                         json.dumps({'prepared_hash': prepared_hash, 'parameters': parameters},
+                                    ensure_ascii=False, indent=1))
+
+    def read_extracted(self, folder_id: str, prepared_hash: str) -> Optional[Dict[str, str]]:
+        """Extractor output stored for the same prepared hash, None otherwise"""
+        try:
+            extracted = json.loads(self.read_text(folder_id, "extracted.json") or "{}")
+        except ValueError:
+            return None
+        if extracted.get('prepared_hash') != prepared_hash:
+            return None
+        return extracted.get('parameters')
+
+    def read_text(self, folder_id: str, name: str) -> Optional[str]:
+        path = self.path(folder_id, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def read_for_post(self, folder_id: str) -> Tuple[str, Dict[str, str], List[str]]:
+        """(ad text, parameters incl. cleaned_text, processed image paths) of a prepared bundle"""
+        meta = self.load(folder_id) or {}
+        parameters = json.loads(self.read_text(folder_id, "parameters.json") or "{}")
+        cleaned_text = self.read_text(folder_id, "cleaned.txt")
+        if cleaned_text:
+            parameters['cleaned_text'] = cleaned_text
+        images = [self.path(folder_id, "images", name) for name in meta.get('images', [])]
+        return self.read_text(folder_id, "ad.txt") or "", parameters, images
+
+    def drop_images(self, folder_id: str):
+        """Free the disk space of a posted ad (text and metadata are kept)"""
+        for name in ("raw", "images"):
+            shutil.rmtree(self.path(folder_id, name), ignore_errors=True)
+
+    def status_counts(self) -> Dict[str, int]:
+        counts = {}
+        for meta in self.list_bundles():
+            counts[meta.get('status', "?")] = counts.get(meta.get('status', "?"), 0) + 1
+        return counts
+
+    def _write_text(self, folder_id: str, name: str, text: str):
+        with open(self.path(folder_id, name), 'w', encoding='utf-8') as f:
+            f.write(text)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Deterministic Drive ingestion benchmark
+
+Points GoogleDriveClient at fake_drive.FakeDriveService (a local directory
+tree shaped like the real Drive path) and measures folder enumeration and
+per-ad ingestion (folder listing, document text, images). No credentials,
+no quota - unless --quota simulates one, then the adaptive Drive rate
+limiter (rate_limiter.py) is used and every ad must still be ingested.
+
+Usage:
+    python benchmark_drive_ingestion.py                       # 10, 100, 10000 folders
+    python benchmark_drive_ingestion.py --folders 100 --latency 0.05 --page-size 50
+    python benchmark_drive_ingestion.py --folders 100 --latency 0.05 --workers 1 4 8
+    python benchmark_drive_ingestion.py --folders 100 --quota 15 --workers 8
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+import config
+from fake_drive import FakeDriveService, generate_fake_tree
+from orbita_form_filler_v2 import GoogleDriveClient
+from rate_limiter import RateLimiter, drive_rate_limiter
+
+BENCH_ROOT = ".bench_drive"
+
+
+def ingest(client: GoogleDriveClient, folders, max_ads: int) -> int:
+    """Fetch text and images the same way _process_single_ad does"""
+    ingested = 0
+    for folder in folders[:max_ads]:
+        contents = client.get_folder_contents(folder['id'])
+        if contents['text_documents']:
+            client.download_document_text(contents['text_documents'][0])
+        for image in contents['images']:
+            path = client.download_image(image['id'], image['name'])
+            if path:
+                os.remove(path)
+        ingested += 1
+    return ingested
+
+
+def ingest_parallel(client: GoogleDriveClient, folders, max_ads: int, workers: int) -> int:
+    """Same as ingest(), one folder per Drive worker thread"""
+    def ingest_folder(folder):
+        contents = client.get_folder_contents(folder['id'])
+        if contents['text_documents']:
+            client.download_document_text(contents['text_documents'][0])
+        download_dir = tempfile.mkdtemp(prefix="bench-images-")
+        client.download_images(contents['images'], download_dir)
+        shutil.rmtree(download_dir, ignore_errors=True)
+        return 1
+
+    return sum(client.map_parallel(ingest_folder, folders[:max_ads], workers))
+
+
+def run_benchmark(folder_count: int, latency: float, page_size: int, images: int, max_ads: int,
+                  workers=(), quota: float = 0.0) -> dict:
+    """Benchmark enumeration and ingestion for one tree size"""
+    root = os.path.join(BENCH_ROOT, str(folder_count))
+    generate_fake_tree(root, folder_count, images_per_ad=images, drive_path=config.GOOGLE_DRIVE_PATH)
+
+    service = FakeDriveService(root, latency=latency, page_size=page_size, max_page_size=page_size,
+                               quota_per_second=quota)
+    # Without a simulated quota there is nothing to adapt to - don't throttle the benchmark
+    limiter = drive_rate_limiter() if quota else RateLimiter.unlimited("Fake Drive")
+    client = GoogleDriveClient(service=service, rate_limiter=limiter)
+    client.authenticate()
+
+    # Cold enumeration: path lookup + all pages of ad folders
+    started = time.perf_counter()
+    folders = client.get_ad_folders()
+    enumerate_time = time.perf_counter() - started
+    enumerate_calls = service.calls['list']
+
+    # Warm enumeration: path lookups must come from the cache
+    service.reset_calls()
+    started = time.perf_counter()
+    client.get_ad_folders()
+    warm_time = time.perf_counter() - started
+    warm_calls = service.calls['list']
+
+    # Ingestion of (up to) max_ads folders
+    service.reset_calls()
+    started = time.perf_counter()
+    ingested = ingest(client, folders, max_ads)
+    ingest_time = time.perf_counter() - started
+
+    # Parallel ingestion (each worker thread gets its own service from the transport)
+    parallel = {}
+    for count in workers:
+        parallel_client = GoogleDriveClient(service=service, rate_limiter=limiter)
+        started = time.perf_counter()
+        parallel_ingested = ingest_parallel(parallel_client, folders, max_ads, count)
+        parallel[count] = (time.perf_counter() - started, parallel_ingested)
+        parallel_client.close()
+
+    expected_pages = max(1, -(-folder_count // page_size))
+    path_depth = len([p for p in config.GOOGLE_DRIVE_PATH.split('/') if p.strip()])
+
+    return {
+        'folders': len(folders),
+        'expected_folders': folder_count,
+        'enumerate_time': enumerate_time,
+        'enumerate_calls': enumerate_calls,
+        'expected_enumerate_calls': path_depth + expected_pages,
+        'warm_time': warm_time,
+        'warm_calls': warm_calls,
+        'expected_warm_calls': expected_pages,
+        'ingested': ingested,
+        'ingest_time': ingest_time,
+        'per_ad_ms': (ingest_time / ingested * 1000) if ingested else 0.0,
+        'ingest_calls': dict(service.calls),
+        'parallel': parallel,
+        'throttled_calls': service.calls['throttled'],
+        'limiter': limiter.get_stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Drive ingestion against a local fake Drive")
+    parser.add_argument("--folders", type=int, nargs="+", default=[10, 100, 10000])
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every API call")
+    parser.add_argument("--page-size", type=int, default=100, help="Maximum files per list page")
+    parser.add_argument("--images", type=int, default=1, help="Images per ad folder")
+    parser.add_argument("--max-ads", type=int, default=200, help="Ads to ingest per tree size")
+    parser.add_argument("--workers", type=int, nargs="*", default=[],
+                        help="Also ingest with these numbers of Drive worker threads")
+    parser.add_argument("--quota", type=float, default=0.0,
+                        help="Simulated Drive quota in requests/s (403 userRateLimitExceeded above it)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("📁 DRIVE INGESTION BENCHMARK (FAKE DRIVE)")
+    print("=" * 60)
+
+    all_ok = True
+    for folder_count in args.folders:
+        print(f"\n🔁 {folder_count} folders")
+        r = run_benchmark(folder_count, args.latency, args.page_size, args.images, args.max_ads, args.workers,
+                          args.quota)
+
+        pagination_ok = r['folders'] == r['expected_folders'] and r['enumerate_calls'] == r['expected_enumerate_calls']
+        cache_ok = r['warm_calls'] == r['expected_warm_calls']
+        all_ok = all_ok and pagination_ok and cache_ok
+
+        print(f"   📂 Enumerated {r['folders']}/{r['expected_folders']} folders in {r['enumerate_time']:.3f}s "
+              f"({r['enumerate_calls']} list calls, expected {r['expected_enumerate_calls']}) "
+              f"{'✅' if pagination_ok else '❌'}")
+        print(f"   ♻️ Warm enumeration {r['warm_time']:.3f}s ({r['warm_calls']} list calls, "
+              f"expected {r['expected_warm_calls']}) {'✅' if cache_ok else '❌'}")
+        print(f"   📄 Ingested {r['ingested']} ads in {r['ingest_time']:.3f}s "
+              f"({r['per_ad_ms']:.1f} ms/ad, calls: {r['ingest_calls']})")
+        for count, (elapsed, parallel_ingested) in r['parallel'].items():
+            all_ok = all_ok and parallel_ingested == r['ingested']
+            print(f"   🧵 {count} workers: {parallel_ingested} ads in {elapsed:.3f}s ({r['ingest_time'] / elapsed:.1f}x)")
+        if args.quota:
+            print(f"   🚦 Quota {args.quota:g} req/s: {r['throttled_calls']} calls throttled, limiter {r['limiter']}")
+
+    print("\n" + ("✅ Pagination, caching and ingestion verified" if all_ok else "❌ Pagination/caching/ingestion check failed"))
+
+
+if __name__ == "__main__":
+    main()
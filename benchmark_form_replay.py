@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the Orbita form stage
+
+Runs OrbitaFormFillerV2._fill_orbita_form against the captured pages
+(HAR replay mode) - no network, no Drive, no OpenAI, nothing is posted.
+
+Usage:
+    python benchmark_form_replay.py --iterations 5
+    python benchmark_form_replay.py --fast --max-p95 20    # CI regression gate
+"""
+
+import sys
+import math
+import time
+import argparse
+import statistics
+
+import config
+from orbita_form_filler_v2 import OrbitaFormFillerV2
+
+# Local fixture ad (same files as the manual test scripts use)
+FIXTURE_TEXT_FILE = "0245612354.txt"
+FIXTURE_PARAMETERS = {
+    "rooms": "4.5",
+    "floor": "2",
+    "furniture": "да",
+    "price": "2000000",
+    "district": "Ротшильд 12"
+}
+FIXTURE_IMAGES = ["1_935.jpg", "2_892.jpg", "3_866.jpg", "4_899.jpg", "5_763.jpg"]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def run_benchmark(iterations: int, fast: bool) -> dict:
+    """Fill the replayed form several times and collect timings"""
+    if fast:
+        # Measure browser work only, without the human-like pauses
+        config.STEP_DELAY = 0
+        config.BROWSER_SLOW_MO = 0
+    config.BROWSER_HEADLESS = True
+
+    with open(FIXTURE_TEXT_FILE, 'r', encoding='utf-8') as f:
+        ad_text = f.read()
+
+    filler = OrbitaFormFillerV2(replay_mode=True)
+    filler.current_account_email = "replay@example.com"
+    timings = []
+    failures = 0
+
+    try:
+        if not filler.start_browser():
+            print("❌ Browser start failed")
+            return {}
+
+        for i in range(iterations):
+            print(f"\n🔁 Iteration {i + 1}/{iterations}")
+            started = time.perf_counter()
+            success = filler._fill_orbita_form(ad_text, dict(FIXTURE_PARAMETERS), FIXTURE_IMAGES)
+            elapsed = time.perf_counter() - started
+            timings.append(elapsed)
+            if not success:
+                failures += 1
+            print(f"⏱️ Form stage: {elapsed:.2f}s ({'ok' if success else 'FAILED'})")
+
+    finally:
+        replay_stats = filler.replay.get_stats()
+        filler.cleanup()
+
+    return {
+        'iterations': iterations,
+        'failures': failures,
+        'mean': statistics.mean(timings) if timings else 0.0,
+        'p50': percentile(timings, 50) if timings else 0.0,
+        'p95': percentile(timings, 95) if timings else 0.0,
+        'replay': replay_stats
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the Orbita form stage")
+    parser.add_argument("--iterations", type=int, default=3, help="Number of form fills")
+    parser.add_argument("--fast", action="store_true", help="Disable STEP_DELAY and slow_mo")
+    parser.add_argument("--max-p95", type=float, default=None,
+                        help="Fail (exit 1) if p95 form-stage time exceeds this many seconds")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🎞️ ORBITA FORM STAGE BENCHMARK (HAR REPLAY)")
+    print("=" * 60)
+
+    results = run_benchmark(args.iterations, args.fast)
+    if not results:
+        sys.exit(1)
+
+    print("\n" + "=" * 60)
+    print("📊 RESULTS")
+    print("=" * 60)
+    print(f"Iterations: {results['iterations']}  Failures: {results['failures']}")
+    print(f"Mean: {results['mean']:.2f}s  p50: {results['p50']:.2f}s  p95: {results['p95']:.2f}s")
+    print(f"Replay: {results['replay']}")
+
+    if results['failures']:
+        print("❌ Some form fills failed")
+        sys.exit(1)
+    if args.max_p95 is not None and results['p95'] > args.max_p95:
+        print(f"❌ p95 {results['p95']:.2f}s exceeds limit {args.max_p95:.2f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Startup (import-time) benchmark
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the cumulative import time, the slowest imports and any heavy
+dependency that is still loaded eagerly at module import.
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --module orbita_form_filler_v2 --runs 5 --max-ms 150
+"""
+
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+# Packages that must only be imported by the subsystem that needs them
+HEAVY_MODULES = ["playwright", "googleapiclient", "google_auth_oauthlib", "google.oauth2",
+                 "openai", "twocaptcha", "requests", "psutil", "docx"]
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure_imports(module: str) -> List[Tuple[str, int, int, int]]:
+    """Import module in a fresh interpreter. Returns (name, self_us, cumulative_us, depth)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        tail = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed: {' '.join(tail[-3:])}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            depth = (len(match.group(3)) - 1) // 2
+            entries.append((match.group(4), int(match.group(1)), int(match.group(2)), depth))
+    return entries
+
+
+def run_benchmark(module: str, runs: int) -> Dict:
+    """Measure the module several times and collect the slowest imports of the last run"""
+    totals = []
+    entries = []
+    for _ in range(runs):
+        entries = measure_imports(module)
+        total = next((cumulative for name, _, cumulative, _ in entries if name == module), 0)
+        totals.append(total / 1000.0)
+
+    loaded = {name for name, _, _, _ in entries}
+    eager = [heavy for heavy in HEAVY_MODULES
+             if any(name == heavy or name.startswith(heavy + ".") for name in loaded)]
+
+    return {
+        'module': module,
+        'runs': runs,
+        'median_ms': statistics.median(totals),
+        'min_ms': min(totals),
+        'max_ms': max(totals),
+        'slowest': sorted(entries, key=lambda e: e[1], reverse=True),
+        'eager_heavy': eager
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure module import time with -X importtime")
+    parser.add_argument("--module", nargs="+", default=["orbita_form_filler_v2"])
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to show")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Fail (exit 1) if median import time exceeds this many milliseconds")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("⏱️ STARTUP BENCHMARK (-X importtime)")
+    print("=" * 60)
+
+    failed = False
+    for module in args.module:
+        try:
+            r = run_benchmark(module, args.runs)
+        except RuntimeError as e:
+            print(f"\n❌ {e}")
+            failed = True
+            continue
+
+        print(f"\n📦 {module}: median {r['median_ms']:.1f} ms "
+              f"(min {r['min_ms']:.1f}, max {r['max_ms']:.1f}, {r['runs']} runs)")
+        print("   Slowest imports (self time):")
+        for name, self_us, cumulative_us, _ in r['slowest'][:args.top]:
+            print(f"   {self_us / 1000.0:8.1f} ms  (cum {cumulative_us / 1000.0:8.1f} ms)  {name}")
+
+        if r['eager_heavy']:
+            print(f"   ❌ Heavy dependencies imported eagerly: {', '.join(r['eager_heavy'])}")
+            failed = True
+        else:
+            print("   ✅ No heavy dependencies imported at startup")
+
+        if args.max_ms is not None and r['median_ms'] > args.max_ms:
+            print(f"   ❌ Median {r['median_ms']:.1f} ms exceeds limit {args.max_ms:.1f} ms")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
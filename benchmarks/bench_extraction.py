@@ -0,0 +1,57 @@
+"""
+Benchmarks for local (non-LLM) text cleaning, parameter extraction and processed-log loading
+"""
+
+from orbita_form_filler_v2 import OpenAIExtractor, OrbitaFormFillerV2
+from text_cleaner import clean_ad_text, has_blocked_characters
+from extractors import LocalRulesExtractor
+from gazetteer import RISHON_LEZION_ENTRIES, STREET, Gazetteer
+
+
+def bench_clean_ad_text(benchmark, ad_texts):
+    def run():
+        return [clean_ad_text(text) for text in ad_texts]
+
+    results = benchmark(run)
+    assert not any(has_blocked_characters(text) for text in results)
+
+
+def bench_fallback_extraction(benchmark, ad_texts):
+    # The regex fallback needs no API client
+    extractor = OpenAIExtractor.__new__(OpenAIExtractor)
+
+    def run():
+        return [extractor._fallback_extraction(text) for text in ad_texts]
+
+    results = benchmark(run)
+    assert any('price' in r for r in results)
+
+
+def bench_local_rules_batch(benchmark, ad_texts):
+    extractor = LocalRulesExtractor()
+
+    results = benchmark(extractor.extract_batch_with_confidence, ad_texts)
+    assert all('rooms' in parameters and 'price' in parameters for parameters, _ in results)
+
+
+def bench_gazetteer_large_lexicon(benchmark, ad_texts):
+    # 5000 extra synthetic streets: scan + fuzzy lookup must stay flat as the lexicon grows
+    extra = [(f"Улица {n:04d} Тестовая", STREET, [f"Test street {n}"]) for n in range(5000)]
+    gazetteer = Gazetteer(RISHON_LEZION_ENTRIES + extra)
+    misspelled = ["Ротшилда", "Жаботинскиии", "Рамат Элиягу", "Нахлат Егуда"] * 5
+
+    def run():
+        found = [gazetteer.find_address(text) for text in ad_texts]
+        looked_up = [gazetteer.lookup(name) for name in misspelled]
+        return found, looked_up
+
+    found, looked_up = benchmark(run)
+    assert all(found) and all(looked_up)
+
+
+def bench_load_processed_ads(benchmark, processed_log):
+    filler = OrbitaFormFillerV2.__new__(OrbitaFormFillerV2)
+    filler.processed_ads_log = processed_log
+
+    processed = benchmark(filler._load_processed_ads)
+    assert len(processed) == 10000
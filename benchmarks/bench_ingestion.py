@@ -0,0 +1,73 @@
+"""
+Benchmarks for Drive document/image ingestion (GoogleDriveClient)
+"""
+
+import io
+import os
+
+import pytest
+
+import config
+from image_processing import process_image
+
+
+def bench_download_docx_text(benchmark, drive_client, corpus_files):
+    docs = corpus_files['docx']
+
+    def run():
+        return [drive_client.download_docx_text(f['id'], f['name']) for f in docs]
+
+    texts = benchmark(run)
+    assert all(texts)
+
+
+def bench_extract_docx_via_xml(benchmark, drive_client, docx_payloads):
+    handles = [io.BytesIO(payload) for payload in docx_payloads]
+
+    def run():
+        return [drive_client._extract_docx_via_xml(handle) for handle in handles]
+
+    texts = benchmark(run)
+    assert all(texts)
+
+
+def bench_download_google_doc_text(benchmark, drive_client, corpus_files):
+    docs = corpus_files['google_doc']
+
+    def run():
+        return [drive_client.download_google_doc_text(f['id']) for f in docs]
+
+    texts = benchmark(run)
+    assert all(texts)
+
+
+def bench_download_image(benchmark, drive_client, corpus_files):
+    images = corpus_files['image'][:5]
+
+    def run():
+        paths = [drive_client.download_image(f['id'], f"bench_{i}_{f['name']}") for i, f in enumerate(images)]
+        for path in paths:
+            os.remove(path)
+        return paths
+
+    paths = benchmark(run)
+    assert all(paths)
+
+
+def bench_process_image(benchmark, drive_client, corpus_files, tmp_path, monkeypatch):
+    pytest.importorskip("PIL")
+    # The corpus photos are 1600px - force the downscale + JPEG re-encode path
+    monkeypatch.setattr(config, 'IMAGE_MAX_DIMENSION', 1024)
+    sources = []
+    for i, f in enumerate(corpus_files['image'][:5]):
+        sources.append(drive_client.download_image(f['id'], f"bench_source_{i}_{f['name']}"))
+
+    def run():
+        return [process_image(path, str(tmp_path), i) for i, path in enumerate(sources)]
+
+    try:
+        paths = benchmark(run)
+    finally:
+        for path in sources:
+            os.remove(path)
+    assert all(path.endswith('.jpg') for path in paths)
@@ -0,0 +1,39 @@
+"""
+Benchmarks for level-by-level Drive folder traversal (drive_traversal.py)
+"""
+
+import re
+
+from drive_traversal import FOLDER_FIELDS, LevelTraversal
+
+
+def list_folders(service):
+    def run(query, order_by=None):
+        folders, page_token = [], None
+        while True:
+            params = {'q': query, 'fields': FOLDER_FIELDS, 'pageSize': 1000}
+            if order_by:
+                params['orderBy'] = order_by
+            if page_token:
+                params['pageToken'] = page_token
+            results = service.files().list(**params).execute()
+            folders.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return folders
+    return run
+
+
+def bench_traverse_year_of_datetime_folders(benchmark, datetime_drive):
+    root_id = datetime_drive.files().list(q="name='ad'").execute()['files'][0]['id']
+    levels = [{'keep': lambda f: re.match(r'^\d{8}$', f['name'])},
+              {'keep': lambda f: re.match(r'^\d{4}$', f['name'])}]
+
+    def run():
+        traversal = LevelTraversal(list_folders(datetime_drive), batch_size=50, workers=4)
+        return traversal, traversal.walk([root_id], levels)
+
+    traversal, folders = benchmark(run)
+    assert len(folders) == 365 * 2
+    # One query for the dates + 8 batched queries for the times, instead of 1 + 365
+    assert traversal.get_stats()['queries'] == 9
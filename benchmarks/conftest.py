@@ -0,0 +1,66 @@
+"""
+Shared fixtures for the benchmark suite (synthetic corpus + fake Drive)
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from corpus import build_corpus, build_datetime_tree, make_ad_text, make_docx, write_processed_log
+from fake_drive import FakeDriveService, DOCX_MIME, GOOGLE_DOC_MIME
+from orbita_form_filler_v2 import GoogleDriveClient
+from rate_limiter import RateLimiter
+
+
+@pytest.fixture(scope="session")
+def drive_client(tmp_path_factory):
+    """GoogleDriveClient backed by a fake Drive holding the synthetic corpus"""
+    root = str(tmp_path_factory.mktemp("drive"))
+    build_corpus(root, ad_count=20, drive_path=config.GOOGLE_DRIVE_PATH)
+    client = GoogleDriveClient(service=FakeDriveService(root), rate_limiter=RateLimiter.unlimited("Fake Drive"))
+    client.authenticate()
+    return client
+
+
+@pytest.fixture(scope="session")
+def datetime_drive(tmp_path_factory):
+    """Fake Drive holding a year of ad/YYYYMMDD/HHMM folders (v1 layout)"""
+    root = str(tmp_path_factory.mktemp("datetime_drive"))
+    build_datetime_tree(root, days=365, times_per_day=2)
+    return FakeDriveService(root)
+
+
+@pytest.fixture(scope="session")
+def corpus_files(drive_client):
+    """All files of the corpus grouped by kind"""
+    files = {'docx': [], 'google_doc': [], 'image': []}
+    for folder in drive_client.get_ad_folders():
+        for file_info in drive_client._list_all_files(f"parents in '{folder['id']}'"):
+            if file_info['mimeType'] == DOCX_MIME:
+                files['docx'].append(file_info)
+            elif file_info['mimeType'] == GOOGLE_DOC_MIME:
+                files['google_doc'].append(file_info)
+            elif file_info['mimeType'].startswith('image/'):
+                files['image'].append(file_info)
+    return files
+
+
+@pytest.fixture(scope="session")
+def ad_texts():
+    return [make_ad_text(n, extra_lines=n % 7) for n in range(50)]
+
+
+@pytest.fixture(scope="session")
+def docx_payloads(ad_texts):
+    return [make_docx(text) for text in ad_texts[:10]]
+
+
+@pytest.fixture(scope="session")
+def processed_log(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("logs") / "processed_ads_v2.log")
+    write_processed_log(path, entries=10000)
+    return path
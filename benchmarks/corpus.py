@@ -0,0 +1,139 @@
+"""
+Synthetic ad corpus for the benchmark suite
+
+Builds a fake Drive tree (see fake_drive.py) with .docx files, Google Doc
+text and JPEG images, plus a large processed-ads log.
+"""
+
+import io
+import os
+import random
+import shutil
+import zipfile
+from datetime import date, timedelta
+from xml.sax.saxutils import escape
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DISTRICTS = ['Ремез', 'Нахалат Иуда', 'Неве Дения', 'Кирьят Гаон', 'Рамат Элияу', 'Центр']
+STREETS = ['Ротшильд', 'Герцль', 'Жаботинский', 'Бялик', 'Ахад Хаам', 'Бен Гурион', 'Соколов']
+EXTRAS = [
+    '🌞 Солнечный балкон ~15 м² с открытым видом',
+    '🚗 Крытая парковка в табу, подходит для двух автомобилей',
+    '🏢 Есть мамад и лифт',
+    '📦 Освобождение: возможно очень быстро!',
+    '✨ Полностью обставлена, новая кухня',
+    'Квартира на 3 стороны – отличная вентиляция',
+    'Лучшая локация – рядом школы, тишина и вся инфраструктура',
+]
+
+CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>"""
+
+RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>{body}</w:body></w:document>"""
+
+
+def make_ad_text(n: int, extra_lines: int = 4) -> str:
+    """Realistic Russian apartment ad with emoji, prices and areas"""
+    return make_labeled_ad(n, extra_lines)[0]
+
+
+def make_labeled_ad(n: int, extra_lines: int = 4):
+    """Same ad as make_ad_text plus its ground-truth parameters"""
+    rng = random.Random(n)
+    rooms = rng.choice(['3', '3.5', '4', '4.5', '5'])
+    district = rng.choice(DISTRICTS)
+    street = rng.choice(STREETS)
+    house = rng.randint(1, 120)
+    area = rng.randint(60, 160)
+    floor = rng.randint(1, 12)
+    price = rng.randint(15, 45) * 100000
+    lines = [
+        f"Продаётся {rooms}-комнатная квартира в Ришон-ле-Цион",
+        f"В районе {district}, ул. {street} {house}",
+        f"📐 Площадь около {area} м², {floor} этаж",
+        f"💰 Цена: {price:,} ₪".replace(',', rng.choice([',', ' ', '.'])),
+    ]
+    extras = rng.sample(EXTRAS, min(extra_lines, len(EXTRAS)))
+    labels = {
+        'rooms': rooms,
+        'floor': str(floor),
+        'furniture': 'да' if any('обставлена' in line for line in extras) else 'нет',
+        'price': str(price),
+        'district': district,
+    }
+    return '\n'.join(lines + extras), labels
+
+
+def make_docx(text: str) -> bytes:
+    """Minimal .docx package with one paragraph per line"""
+    body = ''.join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+        for line in text.split('\n')
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        package.writestr('_rels/.rels', RELS_XML)
+        package.writestr('word/document.xml', DOCUMENT_XML.format(body=body))
+    return buffer.getvalue()
+
+
+def build_corpus(root: str, ad_count: int = 20, drive_path: str = "Real estate/Ришон Лецион/ПРОДАЖА") -> str:
+    """Write a fake Drive tree: even ads get a .docx, odd ads a Google Doc, all get a JPEG"""
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    base = os.path.join(root, *drive_path.split('/'))
+
+    for n in range(ad_count):
+        ad_dir = os.path.join(base, f"Объявление {n:03d}")
+        os.makedirs(ad_dir)
+        text = make_ad_text(n)
+
+        if n % 2 == 0:
+            with open(os.path.join(ad_dir, 'ad.docx'), 'wb') as f:
+                f.write(make_docx(text))
+        else:
+            with open(os.path.join(ad_dir, 'ad.gdoc'), 'w', encoding='utf-8') as f:
+                f.write(text)
+
+        image_source = os.path.join(REPO_ROOT, f"{n % 5 + 1}_{[935, 892, 866, 899, 763][n % 5]}.jpg")
+        shutil.copyfile(image_source, os.path.join(ad_dir, 'photo_1.jpg'))
+
+    return base
+
+
+def build_datetime_tree(root: str, days: int = 365, times_per_day: int = 2, parent: str = "ad") -> str:
+    """Write a fake Drive tree in the v1 layout <parent>/YYYYMMDD/HHMM with an ad text per folder"""
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    base = os.path.join(root, parent)
+
+    first_day = date(2025, 1, 1)
+    for day in range(days):
+        date_name = (first_day + timedelta(days=day)).strftime('%Y%m%d')
+        for slot in range(times_per_day):
+            ad_dir = os.path.join(base, date_name, f"{9 + slot * 8 // times_per_day:02d}{slot * 7 % 60:02d}")
+            os.makedirs(ad_dir)
+            with open(os.path.join(ad_dir, '0501234567.txt'), 'w', encoding='utf-8') as f:
+                f.write(make_ad_text(day * times_per_day + slot))
+
+    return base
+
+
+def write_processed_log(path: str, entries: int = 10000):
+    """processed_ads_v2.log with `entries` lines in the production format"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(entries):
+            folder_id = f"1{n:032x}"[:33]
+            f.write(f"{folder_id} # Объявление {n:05d} # Processed on 2025-06-07 08:34:35\n")
@@ -0,0 +1,118 @@
+"""
+Circuit breaker for external APIs (OpenAI)
+
+Tracks the outcome and latency of recent calls. When too many of them fail
+or are too slow the circuit opens and callers go straight to their local
+path for a cool-down window; after that a single probe call is let through
+(half-open) and its result closes or re-opens the circuit.
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe failure/latency circuit breaker"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, window: int = 10,
+                 slow_call_seconds: Optional[float] = None, cooldown: float = 120.0,
+                 max_cooldown: float = 900.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.state = CLOSED
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.recent = deque(maxlen=window)  # True = failure/slow call
+        self.lock = threading.Lock()
+        self.stats = {'calls': 0, 'failures': 0, 'slow_calls': 0, 'short_circuited': 0,
+                      'opened': 0, 'probes': 0}
+
+    def allow_request(self) -> bool:
+        """True if the caller may use the API now; False = use the local path"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+                print(f"🔌 {self.name} circuit half-open, probing for recovery")
+
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                self.stats['probes'] += 1
+                return True
+
+            self.stats['short_circuited'] += 1
+            return False
+
+    def record_success(self, latency: float):
+        """Record a completed call (slow calls count against the circuit)"""
+        slow = self.slow_call_seconds is not None and latency > self.slow_call_seconds
+        with self.lock:
+            self.stats['calls'] += 1
+            if slow:
+                self.stats['slow_calls'] += 1
+
+            if self.state == HALF_OPEN:
+                if slow:
+                    self._open(f"probe was slow ({latency:.1f}s)", backoff=True)
+                else:
+                    self._close()
+                return
+
+            self.recent.append(slow)
+            self._check_threshold("slow calls")
+
+    def record_failure(self, reason: str = ""):
+        """Record a failed call"""
+        with self.lock:
+            self.stats['calls'] += 1
+            self.stats['failures'] += 1
+
+            if self.state == HALF_OPEN:
+                self._open(f"probe failed: {reason}", backoff=True)
+                return
+
+            self.recent.append(True)
+            self._check_threshold(reason or "failures")
+
+    def get_stats(self) -> Dict:
+        """Current state and counters for run statistics"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['state'] = self.state
+            if self.state == OPEN:
+                stats['retry_in'] = round(max(0.0, self.cooldown - (time.monotonic() - self.opened_at)), 1)
+            return stats
+
+    def _check_threshold(self, reason: str):
+        if self.state == CLOSED and sum(self.recent) >= self.failure_threshold:
+            self._open(reason, backoff=False)
+
+    def _open(self, reason: str, backoff: bool):
+        # Repeated failed probes double the cool-down (up to max_cooldown)
+        self.cooldown = min(self.cooldown * 2, self.max_cooldown) if backoff else self.base_cooldown
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        self.stats['opened'] += 1
+        print(f"🔌 {self.name} circuit OPEN for {self.cooldown:.0f}s ({reason}) - using local path")
+
+    def _close(self):
+        self.state = CLOSED
+        self.cooldown = self.base_cooldown
+        self.probe_in_flight = False
+        self.recent.clear()
+        print(f"🔌 {self.name} circuit closed - API recovered")
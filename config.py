@@ -12,6 +12,30 @@ CAPTCHA_API_KEY = ""
 # Get your API key from: https://platform.openai.com/
 OPENAI_API_KEY = ""
 
+# OpenAI endpoint (None = api.openai.com). For offline load tests run
+# openai_stub_server.py and set e.g. "http://127.0.0.1:8089/v1"
+OPENAI_BASE_URL = None
+OPENAI_TIMEOUT = 30.0           # Seconds per request
+OPENAI_MAX_RETRIES = 2          # Client-side retries on connection errors / 429 / 5xx
+
+# Token budgeting
+OPENAI_RUN_TOKEN_BUDGET = 200000  # Total tokens per run; local extraction after that (0 = unlimited)
+OPENAI_MAX_AD_CHARS = 3000        # Longer ads are truncated before being sent
+
+# Circuit breaker: after N failed/slow calls among the last WINDOW, skip the
+# API (local extraction) for COOLDOWN seconds, then probe with one call
+OPENAI_BREAKER_FAILURES = 3
+OPENAI_BREAKER_WINDOW = 10
+OPENAI_BREAKER_SLOW_SECONDS = 15.0  # Successful calls slower than this count as failures
+OPENAI_BREAKER_COOLDOWN = 120.0     # Doubles after each failed probe (max 15 min)
+
+# Parameter extractor backend:
+#   "openai" - OpenAI for every ad (local rules only as fallback)
+#   "local"  - local rules only, no network (extractors.LocalRulesExtractor)
+#   "hybrid" - local rules first, OpenAI only for low-confidence fields
+EXTRACTOR_BACKEND = "openai"
+EXTRACTOR_MIN_CONFIDENCE = 0.8  # Hybrid: local fields below this go to OpenAI
+
 # ============================================================================
 # BROWSER SETTINGS
 # ============================================================================
@@ -25,6 +49,37 @@ STEP_DELAY = 2                 # General delay between form steps
 RECAPTCHA_WAIT = 3             # Wait time for reCAPTCHA to load
 FORM_LOAD_WAIT = 3             # Wait time for form to load completely
 
+# ============================================================================
+# REQUEST FILTERING
+# ============================================================================
+
+# Abort analytics/tag-manager/ad-network requests and unneeded media so page
+# loads (and 'networkidle' waits) don't depend on trackers.
+# Note: Playwright disables the browser HTTP cache while routing is active.
+BLOCK_THIRD_PARTY_REQUESTS = True
+BLOCKED_RESOURCE_TYPES = ["media", "font"]     # Playwright resource types to abort
+BLOCKED_URL_PATTERNS = [
+    r"googletagmanager\.com",
+    r"google-analytics\.com",
+    r"analytics\.google\.com",
+    r"doubleclick\.net",
+    r"googlesyndication\.com",
+    r"googleadservices\.com",
+    r"adservice\.google\.",
+    r"cloudflareinsights\.com",
+    r"/cdn-cgi/rum",
+    r"facebook\.(net|com)/.*(fbevents|tr\b)",
+    r"mc\.yandex\.ru",
+    r"hotjar\.com",
+]
+# Never blocked - everything the form (and reCAPTCHA) actually needs
+ALLOWED_URL_PATTERNS = [
+    r"^https?://([\w-]+\.)*orbita\.co\.il/(?!cdn-cgi/rum)",
+    r"google\.com/recaptcha",
+    r"gstatic\.com/recaptcha",
+    r"recaptcha\.net",
+]
+
 # ============================================================================
 # TOR IP ROTATION SETTINGS
 # ============================================================================
@@ -51,9 +106,17 @@ WAIT_BETWEEN_ADS = 180         # Wait 3 minutes between ads (unchanged)
 # Found folder: "Real estate" with subfolder structure intact
 GOOGLE_DRIVE_PATH = "Real estate/Ришон Лецион/ПРОДАЖА"  # Complete discovered path
 MAX_IMAGES_PER_AD = 5          # Maximum images to upload per ad
-
-# Google Drive API rate limiting
-GOOGLE_DRIVE_API_DELAY = 0.5   # Reasonable delay between API calls (seconds)
+DRIVE_WORKERS = 4              # Parallel Drive threads (each with its own service object)
+DRIVE_TRAVERSAL_BATCH = 50     # Parent folders per batched listing query (ad/YYYYMMDD/HHMM trees)
+
+# Google Drive API rate limiting (token bucket shared by all Drive threads, see rate_limiter.py)
+DRIVE_RATE_LIMIT = 10.0        # Starting rate (requests/second), halved on every quota error
+DRIVE_RATE_MIN = 0.5           # Never slower than this
+DRIVE_RATE_MAX = 20.0          # Rate climbs back up to this after quota errors
+DRIVE_RATE_BURST = 10          # Requests allowed back to back
+DRIVE_MAX_RETRIES = 6          # Retries of throttled (403/429) and 5xx responses
+DRIVE_BACKOFF_BASE = 1.0       # First retry delay (seconds), doubled per retry with jitter
+DRIVE_BACKOFF_MAX = 60.0       # Longest retry delay (seconds)
 
 # Alternative paths for testing:
 # GOOGLE_DRIVE_PATH = "Real estate"  # Just the main folder
@@ -76,6 +139,84 @@ REGISTRATION_NAME = "Konstantin"               # Fixed name for all accounts
 DEBUG_SCREENSHOTS = False     # Take screenshots for debugging
 DEBUG_CONSOLE_LOGS = True     # Show detailed console logs
 
+# ============================================================================
+# NETWORK RECORDER SETTINGS
+# ============================================================================
+
+# Bounded network log for long sessions (see network_recorder.py)
+NETWORK_RECORDER_ENABLED = True
+NETWORK_RECORDER_BUFFER_SIZE = 500     # Entries kept in memory (ring buffer)
+NETWORK_RECORDER_SAMPLE_RATE = 0.2     # Share of routine entries streamed to disk (POST, redirects, errors always kept)
+NETWORK_RECORDER_HEADERS = False       # Record full request/response headers
+NETWORK_RECORDER_URL_PATTERNS = [r"orbita\.co\.il"]  # Only record matching URLs (empty = all)
+NETWORK_RECORDER_EXCLUDE_PATTERNS = [r"\.(png|jpe?g|gif|webp|svg|woff2?|css)(\?|$)"]
+
+# ============================================================================
+# OFFLINE REPLAY SETTINGS
+# ============================================================================
+
+# Captured pages used by OrbitaFormFillerV2(replay_mode=True) and benchmark_form_replay.py
+REPLAY_HAR_PATH = "passport.orbita.co.il.har"
+REPLAY_FORM_HTML = "page.html"
+REPLAY_LOGIN_HTML = "login.html"
+REPLAY_LOGIN_FILES_DIR = "login_files"
+
+# ============================================================================
+# FORM CATALOGUE SETTINGS
+# ============================================================================
+
+# Option values of the add form selects, built once by form_catalogue.py
+FORM_CATALOGUE_PATH = "form_catalogue.json"
+FORM_CATALOGUE_SOURCE = "page.html"     # Saved add form used to build the catalogue
+FORM_CATALOGUE_LIVE_REFRESH = True      # Compare with the live form once per run and update the cache
+INVALID_PARAMETERS_POLICY = "reject"    # "reject" = skip the ad before the browser, "drop" = post without invalid fields
+CONTACT_PHONE_PREFIX = "055"            # Label of the phonecode option
+
+# ============================================================================
+# STAGED PIPELINE SETTINGS
+# ============================================================================
+
+# sync (Drive -> bundle store), prepare (extract, validate, images), post (bundle store -> form)
+BUNDLE_STORE_DIR = "ad_bundles"        # One directory per Drive ad folder
+PREPARE_WORKERS = 4                    # Ads prepared in parallel
+IMAGE_MAX_DIMENSION = 1600             # Downscale larger images before upload (needs Pillow, 0 = off)
+IMAGE_JPEG_QUALITY = 85                # Quality of downscaled images
+
+# orbita_form_filler_async.py (PREPARE_WORKERS extraction coroutines, DRIVE_WORKERS Drive threads)
+ASYNC_QUEUE_SIZE = 10                  # Ads buffered between stages (Drive stays this far ahead of the browser)
+ASYNC_IMAGE_PROCESSES = 2              # Image processing worker processes
+
+# Crash-safe posting: bundles go prepared -> submitting -> verified (or submitted without verification)
+MY_ADS_URL = "https://doska.orbita.co.il/my/"  # Account's ad list (verification and reconciliation)
+VERIFY_POSTED_ADS = True               # Look for each posted ad in the ad list (submitting -> verified)
+MY_ADS_MAX_PAGES = 5                   # Ad list pages read when looking for an ad
+MY_ADS_EMPTY_MARKERS = ("нет объявлений", "нет ни одного объявления")  # Text of an empty ad list (lowercase)
+
+# ============================================================================
+# DAEMON SETTINGS
+# ============================================================================
+
+# orbita_daemon.py keeps Drive, caches and the browser warm and polls Drive for new ad folders
+DAEMON_POLL_INTERVAL = 300             # Seconds between Drive polls
+DAEMON_MAX_POLL_INTERVAL = 3600        # Longest interval (after failed or idle polls)
+DAEMON_IDLE_BACKOFF = 1.5              # Interval multiplier after a poll without new ads (1 = fixed interval)
+DAEMON_FULL_SYNC_EVERY = 12            # Every N polls also re-check queued folders for changes
+POSTING_WINDOWS = []                   # Local times to post in, e.g. ["09:00-13:00", "17:00-21:00"] ([] = any time)
+
+# ============================================================================
+# RETRY POLICY SETTINGS
+# ============================================================================
+
+# Retries per stage and error kind (network / browser / session / validation; data errors are never
+# retried), see retry_policy.py. Backoff starts at 'backoff' seconds and doubles (with jitter) up to 'backoff_max'.
+RETRY_POLICIES = {
+    'sync':    {'retries': {'network': 3}, 'backoff': 2.0, 'backoff_max': 30.0},
+    'prepare': {'retries': {'network': 2}, 'backoff': 2.0, 'backoff_max': 30.0},
+    'login':   {'retries': {'network': 3, 'browser': 2, 'validation': 4}, 'backoff': 5.0, 'backoff_max': 60.0},
+    'post':    {'retries': {'network': 2, 'browser': 1, 'session': 1, 'validation': 1},
+                'backoff': 5.0, 'backoff_max': 60.0},
+}
+
 # Additional settings
 # Add any additional settings you need here
 
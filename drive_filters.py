@@ -0,0 +1,216 @@
+"""
+Folder enumeration filters pushed down into Drive queries
+
+Instead of listing every ad folder ever created and dropping old ones in
+Python, FolderFilter adds the restrictions to the files().list query:
+
+    --modified-after / --created-after / --created-before  -> modifiedTime / createdTime terms
+    --date-from / --date-to (v1 YYYYMMDD folders)           -> OR of name prefixes covering the range
+    --name-prefix (v2)                                      -> name contains (Drive matches word prefixes)
+    --newest N                                              -> orderBy + a page size of N, stop after N
+
+Times are absolute ("2025-03-01", "2025-03-01T08:00", local time) or
+relative to now ("7d", "12h", "30m"); relative ones are evaluated on every
+query, so a daemon keeps a sliding window. Drive cannot compare names and
+'name contains' matches the start of any word, so name ranges and the name
+prefix are also checked exactly in Python (matches()).
+"""
+
+import re
+import argparse
+import calendar
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+MAX_NAME_PREFIXES = 40  # Longer OR lists are not worth it - filter in Python only
+RELATIVE_TIME_RE = re.compile(r'^(\d+)\s*([dhm])$')
+
+
+def parse_time(value: str, now: Optional[datetime] = None) -> str:
+    """'7d' / '12h' / '30m' ago or a local ISO date/time -> RFC 3339 UTC time for Drive queries"""
+    match = RELATIVE_TIME_RE.match(value.strip().lower())
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = {'d': timedelta(days=amount), 'h': timedelta(hours=amount), 'm': timedelta(minutes=amount)}[unit]
+        moment = (now or datetime.now(timezone.utc)) - delta
+    else:
+        moment = datetime.fromisoformat(value.strip())
+    # Naive values are local time
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def time_argument(value: str) -> str:
+    """argparse type for TIME options: rejects bad times up front, keeps the raw value
+    (relative times are evaluated again on every query)"""
+    try:
+        parse_time(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time {value!r} (use e.g. 2025-03-01, 2025-03-01T08:00, 7d, 12h)")
+    return value
+
+
+def digit_prefixes(low: str, high: str) -> List[str]:
+    """Smallest set of prefixes whose names cover low..high (equal-length digit strings)
+
+    '20250115'..'20250131' -> ['20250115', ..., '20250119', '2025012', '20250130', '20250131']
+    '20240000'..'20259999' -> ['2024', '2025']
+    """
+    width = len(low)
+    start, end = int(low), int(high)
+    prefixes = []
+    while start <= end:
+        # Widest block of 10**k names starting at start that stays inside the range
+        k = 0
+        while k < width and start % 10 ** (k + 1) == 0 and start + 10 ** (k + 1) - 1 <= end:
+            k += 1
+        prefixes.append(str(start).zfill(width)[:width - k])
+        start += 10 ** k
+    return prefixes
+
+
+def widen_date_range(low: str, high: str) -> Tuple[str, str]:
+    """Stretch whole YYYYMMDD months/years to digit blocks so they become one prefix
+
+    ('20240101', '20251231') -> ('20240000', '20259999'), ('20250301', '20250331') -> ('20250300', '20250399');
+    names that are not dates never exist
+    """
+    if low.endswith('0101'):
+        low = low[:4] + '0000'
+    elif low.endswith('01'):
+        low = low[:6] + '00'
+    try:
+        year, month, day = int(high[:4]), int(high[4:6]), int(high[6:])
+        if high[4:] == '1231':
+            high = high[:4] + '9999'
+        elif day == calendar.monthrange(year, month)[1]:
+            high = high[:6] + '99'
+    except ValueError:
+        pass
+    return low, high
+
+
+def quote(value: str) -> str:
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+class FolderFilter:
+    """Restrictions for ad folder enumeration (empty filter = all folders)"""
+
+    def __init__(self, modified_after: Optional[str] = None, created_after: Optional[str] = None,
+                 created_before: Optional[str] = None, name_from: Optional[str] = None,
+                 name_to: Optional[str] = None, name_prefix: Optional[str] = None,
+                 newest: Optional[int] = None):
+        self.modified_after = modified_after
+        self.created_after = created_after
+        self.created_before = created_before
+        self.name_from = name_from
+        self.name_to = name_to
+        self.name_prefix = name_prefix
+        self.newest = newest
+
+    @classmethod
+    def from_args(cls, args) -> Optional['FolderFilter']:
+        """Filter from add_filter_arguments() options, None if none was given"""
+        folder_filter = cls(
+            modified_after=getattr(args, 'modified_after', None),
+            created_after=getattr(args, 'created_after', None),
+            created_before=getattr(args, 'created_before', None),
+            name_from=getattr(args, 'date_from', None),
+            name_to=getattr(args, 'date_to', None),
+            name_prefix=getattr(args, 'name_prefix', None),
+            newest=getattr(args, 'newest', None)
+        )
+        return folder_filter if folder_filter.is_active() else None
+
+    def is_active(self) -> bool:
+        return any(value is not None for value in (self.modified_after, self.created_after, self.created_before,
+                                                   self.name_from, self.name_to, self.name_prefix, self.newest))
+
+    # ------------------------------------------------------------ query
+
+    def time_terms(self) -> List[str]:
+        """modifiedTime / createdTime query terms (evaluated now)"""
+        terms = []
+        if self.modified_after:
+            terms.append(f"modifiedTime > '{parse_time(self.modified_after)}'")
+        if self.created_after:
+            terms.append(f"createdTime > '{parse_time(self.created_after)}'")
+        if self.created_before:
+            terms.append(f"createdTime < '{parse_time(self.created_before)}'")
+        return terms
+
+    def name_terms(self) -> List[str]:
+        """name query terms: a prefix, or an OR of prefixes covering a digit name range"""
+        terms = []
+        if self.name_prefix:
+            terms.append(f"name contains {quote(self.name_prefix)}")
+
+        low, high = self.name_from, self.name_to
+        if (low or high) and all(value is None or value.isdigit() for value in (low, high)):
+            width = len(low or high)
+            if width == 8 and not high:
+                # Open-ended date range: no ad folder is named after next year
+                high = f"{datetime.now().year + 1}1231"
+            low, high = low or "0" * width, high or "9" * width
+            if len(low) == len(high) and low <= high:
+                if width == 8:
+                    low, high = widen_date_range(low, high)
+                prefixes = digit_prefixes(low, high)
+                if 0 < len(prefixes) <= MAX_NAME_PREFIXES and prefixes != [""]:
+                    terms.append("(" + " or ".join(f"name contains {quote(p)}" for p in prefixes) + ")")
+        return terms
+
+    def query(self, names: bool = True, times: bool = True) -> Optional[str]:
+        """The filter terms as one query condition (None if there are none)"""
+        terms = (self.name_terms() if names else []) + (self.time_terms() if times else [])
+        return " and ".join(terms) or None
+
+    def apply(self, query: str, names: bool = True, times: bool = True) -> str:
+        """query with the filter terms added"""
+        terms = self.query(names, times)
+        return f"({query}) and {terms}" if terms else query
+
+    def order_by(self, default: Optional[str] = None) -> Optional[str]:
+        """Newest first when only the newest N folders are wanted"""
+        return "createdTime desc" if self.newest else default
+
+    def matches(self, folder: Dict) -> bool:
+        """Exact name checks (Drive can only match name prefixes of any word)"""
+        name = folder.get('name', "")
+        if self.name_prefix and not name.startswith(self.name_prefix):
+            return False
+        if self.name_from and name < self.name_from:
+            return False
+        if self.name_to and name > self.name_to:
+            return False
+        return True
+
+    def describe(self) -> str:
+        parts = []
+        for label, value in (("modified after", self.modified_after), ("created after", self.created_after),
+                             ("created before", self.created_before), ("name from", self.name_from),
+                             ("name to", self.name_to), ("name prefix", self.name_prefix),
+                             ("newest", self.newest)):
+            if value is not None:
+                parts.append(f"{label} {value}")
+        return ", ".join(parts) or "all folders"
+
+
+def add_filter_arguments(parser, date_names: bool = False):
+    """Add the enumeration filter options to an argparse parser
+
+    date_names: folders are named YYYYMMDD (v1) -> --date-from/--date-to, otherwise --name-prefix
+    """
+    group = parser.add_argument_group("folder filters (pushed down into the Drive query)")
+    group.add_argument("--modified-after", metavar="TIME", type=time_argument,
+                       help="Only folders modified after TIME (e.g. 2025-03-01, 2025-03-01T08:00, 7d, 12h)")
+    group.add_argument("--created-after", metavar="TIME", type=time_argument, help="Only folders created after TIME")
+    group.add_argument("--created-before", metavar="TIME", type=time_argument,
+                       help="Only folders created before TIME")
+    if date_names:
+        group.add_argument("--date-from", metavar="YYYYMMDD", help="First date folder to include")
+        group.add_argument("--date-to", metavar="YYYYMMDD", help="Last date folder to include")
+    else:
+        group.add_argument("--name-prefix", metavar="TEXT", help="Only folders whose name starts with TEXT")
+    group.add_argument("--newest", type=int, metavar="N", help="Only the N newest folders")
+    return group
@@ -0,0 +1,73 @@
+"""
+Thread-safe Google Drive transport
+
+A googleapiclient `service` sits on a single httplib2.Http connection,
+which must not be used from two threads at once. DriveTransport gives
+every thread its own service object (built once per thread on the shared
+credentials, keeping its connection alive between calls) and serializes
+credential refresh, so Drive listing and downloads can run on worker
+threads.
+"""
+
+import threading
+from typing import Callable, Dict, Optional
+
+
+class DriveTransport:
+    """Per-thread Drive service objects over one set of credentials"""
+
+    def __init__(self, credentials=None, service_factory: Optional[Callable] = None,
+                 token_path: Optional[str] = None):
+        self.credentials = credentials
+        self.token_path = token_path
+        self._factory = service_factory or self._build_service
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'services': 0, 'refreshes': 0}
+
+    @classmethod
+    def shared(cls, service) -> 'DriveTransport':
+        """Use one prebuilt service from every thread (e.g. fake_drive.FakeDriveService)"""
+        return cls(service_factory=lambda: service)
+
+    def service(self):
+        """Drive service of the calling thread"""
+        self.ensure_fresh()
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._factory()
+            self._local.service = service
+            with self._stats_lock:
+                self.stats['services'] += 1
+        return service
+
+    def ensure_fresh(self):
+        """Refresh expired credentials once, even if many workers notice at the same time"""
+        creds = self.credentials
+        if creds is None or creds.valid:
+            return
+
+        with self._refresh_lock:
+            if creds.valid:
+                return  # Another worker refreshed while we waited
+
+            from google.auth.transport.requests import Request
+            creds.refresh(Request())
+            with self._stats_lock:
+                self.stats['refreshes'] += 1
+            if self.token_path:
+                with open(self.token_path, 'w') as token:
+                    token.write(creds.to_json())
+            print("🔑 Google Drive token refreshed")
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _build_service(self):
+        from googleapiclient.discovery import build
+
+        # Each service gets its own authorized httplib2 connection
+        return build('drive', 'v3', credentials=self.credentials,
+                     static_discovery=True, cache_discovery=False)
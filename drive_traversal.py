@@ -0,0 +1,111 @@
+"""
+Level-by-level traversal of nested Drive folder trees
+
+Listing the children of every folder separately costs one files().list
+per folder (365 requests for a year of ad/YYYYMMDD folders). LevelTraversal
+lists a whole tree level at once instead: the parent ids of the level are
+packed into batched queries
+
+    ('id1' in parents or 'id2' in parents or ...) and mimeType = folder
+
+of DRIVE_TRAVERSAL_BATCH parents each, which run concurrently on
+DRIVE_WORKERS threads. A tree of any depth costs about
+depth x (folders per level / batch size / workers) round trips.
+
+    traversal = LevelTraversal(list_files)
+    leaves = traversal.walk([root_id], [
+        {'keep': lambda f: re.match(r'^\\d{8}$', f['name'])},   # level 1: YYYYMMDD
+        {'keep': lambda f: re.match(r'^\\d{4}$', f['name'])},   # level 2: HHMM
+    ])
+    # -> [{'id', 'name', 'parents', 'path': ['20250301', '0930']}, ...]
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+FOLDER_FIELDS = "nextPageToken, files(id, name, parents)"
+
+try:
+    from config import DRIVE_TRAVERSAL_BATCH, DRIVE_WORKERS
+except ImportError:
+    DRIVE_TRAVERSAL_BATCH = 50
+    DRIVE_WORKERS = 4
+
+
+class LevelTraversal:
+    """Lists Drive folder trees one level per round of batched, concurrent queries
+
+    list_files(query, order_by) must return all matching files (every page)
+    with their 'parents'; it is called from worker threads, so it has to use
+    a per-thread Drive service (see drive_transport.py).
+    """
+
+    def __init__(self, list_files: Callable[[str, Optional[str]], List[Dict]],
+                 batch_size: Optional[int] = None, workers: Optional[int] = None):
+        self.list_files = list_files
+        self.batch_size = max(1, batch_size or DRIVE_TRAVERSAL_BATCH)
+        self.workers = max(1, workers or DRIVE_WORKERS)
+        self._stats_lock = threading.Lock()
+        self.stats = {'queries': 0, 'rounds': 0, 'folders': 0}
+
+    def children(self, parents: List[Dict], query: Optional[str] = None, order_by: Optional[str] = None,
+                 keep: Optional[Callable[[Dict], bool]] = None,
+                 enough: Optional[Callable[[List[Dict]], bool]] = None) -> List[Dict]:
+        """Subfolders of all parents, each with 'path' = parent path + own name
+
+        query adds terms to every batched query, keep filters the results.
+        Batches run in order (parents first in the list first); enough(results)
+        is checked after every round and stops the traversal early.
+        """
+        by_id = {parent['id']: parent for parent in parents}
+        batches = [parents[i:i + self.batch_size] for i in range(0, len(parents), self.batch_size)]
+        results = []
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(batches) or 1)) as pool:
+            for start in range(0, len(batches), self.workers):
+                round_batches = batches[start:start + self.workers]
+                self._count('rounds')
+                for files in pool.map(lambda batch: self._list_batch(batch, query, order_by), round_batches):
+                    for folder in files:
+                        if keep and not keep(folder):
+                            continue
+                        parent = next((by_id[p] for p in folder.get('parents', []) if p in by_id), None)
+                        if parent is None:
+                            continue
+                        folder['path'] = parent.get('path', []) + [folder['name']]
+                        results.append(folder)
+                if enough and enough(results):
+                    break
+
+        self._count('folders', len(results))
+        return results
+
+    def walk(self, root_ids: List[str], levels: List[Dict]) -> List[Dict]:
+        """Folders at depth len(levels) below the roots
+
+        Each level is a dict of children() options: query, order_by, keep, enough.
+        """
+        current = [{'id': root_id, 'path': []} for root_id in root_ids]
+        for level in levels:
+            if not current:
+                break
+            current = self.children(current, **level)
+        return current
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _list_batch(self, batch: List[Dict], query: Optional[str], order_by: Optional[str]) -> List[Dict]:
+        parents_query = " or ".join(f"'{parent['id']}' in parents" for parent in batch)
+        full_query = f"({parents_query}) and mimeType='{FOLDER_MIME}'"
+        if query:
+            full_query += f" and ({query})"
+        self._count('queries')
+        return self.list_files(full_query, order_by)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
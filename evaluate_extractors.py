@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Extraction accuracy / latency evaluation over a labeled corpus
+
+Each case in the corpus is a folder with the ad text (ad.txt) and its
+ground truth in params.txt format (same file the pipeline reads from
+Drive). Every backend is run over all cases and scored per field
+(precision / recall), with latency percentiles and tokens per ad.
+
+Answers of API backends (openai, hybrid) are cached per prompt version
+in <corpus>/.cache, so re-scoring or changing the comparison rules costs
+no API calls.
+
+Usage:
+    python evaluate_extractors.py                                  # local + fallback on eval_corpus/
+    python evaluate_extractors.py --backend local openai --base-url http://127.0.0.1:8089/v1
+    python evaluate_extractors.py --backend local --synthetic 300
+    python evaluate_extractors.py --seed-drive 50                  # add Drive folders that have params.txt
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import hashlib
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from extractors import PARAMETER_FIELDS, LocalRulesExtractor
+from gazetteer import normalize_address
+from orbita_form_filler_v2 import (EXTRACTION_PROMPT_VERSION, GoogleDriveClient, OpenAIExtractor,
+                                   create_extractor, parse_params_text)
+
+CORPUS_DIR = "eval_corpus"
+API_BACKENDS = ("openai", "hybrid")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def load_corpus(corpus_dir: str) -> List[Dict]:
+    """Read <corpus>/<case>/{ad.txt, params.txt}"""
+    cases = []
+    if not os.path.isdir(corpus_dir):
+        return cases
+
+    for name in sorted(os.listdir(corpus_dir)):
+        ad_path = os.path.join(corpus_dir, name, "ad.txt")
+        params_path = os.path.join(corpus_dir, name, "params.txt")
+        if name.startswith('.') or not (os.path.exists(ad_path) and os.path.exists(params_path)):
+            continue
+        with open(ad_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        with open(params_path, 'r', encoding='utf-8') as f:
+            truth = parse_params_text(f.read())
+        cases.append({'name': name, 'text': text, 'truth': truth})
+    return cases
+
+
+def synthetic_cases(count: int) -> List[Dict]:
+    """Labeled synthetic ads from the benchmark corpus generator"""
+    sys.path.insert(0, "benchmarks")
+    from corpus import make_labeled_ad
+
+    cases = []
+    for n in range(count):
+        text, labels = make_labeled_ad(n, extra_lines=n % 7)
+        cases.append({'name': f"synthetic_{n:05d}", 'text': text, 'truth': labels})
+    return cases
+
+
+def seed_from_drive(corpus_dir: str, limit: int) -> int:
+    """Copy Drive ad folders that have a params.txt into the corpus"""
+    client = GoogleDriveClient()
+    if not client.authenticate():
+        return 0
+
+    added = 0
+    for folder in client.get_ad_folders():
+        if added >= limit:
+            break
+        case_dir = os.path.join(corpus_dir, f"drive_{folder['id']}")
+        if os.path.exists(case_dir):
+            continue
+
+        contents = client.get_folder_contents(folder['id'])
+        if not contents.get('params_file') or not contents['text_documents']:
+            continue
+
+        ad_text = client.download_document_text(contents['text_documents'][0])
+        params_content = client.download_text_file(contents['params_file']['id'])
+        if not ad_text.strip() or not parse_params_text(params_content):
+            continue
+
+        os.makedirs(case_dir, exist_ok=True)
+        with open(os.path.join(case_dir, "ad.txt"), 'w', encoding='utf-8') as f:
+            f.write(ad_text)
+        with open(os.path.join(case_dir, "params.txt"), 'w', encoding='utf-8') as f:
+            f.write(params_content)
+        added += 1
+        print(f"➕ Added {folder['name']} -> {case_dir}")
+
+    return added
+
+
+# ---------------------------------------------------------------- scoring
+
+def normalize_field(field: str, value: Optional[str]) -> str:
+    """Comparable form of a parameter value"""
+    if value is None:
+        return ""
+    value = str(value).strip().lower().replace('ё', 'е')
+    if not value:
+        return ""
+
+    if field == 'rooms':
+        try:
+            return f"{float(value.replace(',', '.')):g}"
+        except ValueError:
+            return value
+    if field == 'floor':
+        digits = re.sub(r'\D', '', value)
+        if '+' in value or (digits and int(digits) >= 10):
+            return "10+"
+        return digits or value
+    if field == 'price':
+        return re.sub(r'\D', '', value)
+    if field == 'furniture':
+        return "да" if value.startswith(('да', 'yes')) else "нет"
+    if field == 'district':
+        # Gazetteer canonical form first, so spelling variants compare equal
+        value = normalize_address(value).lower().replace('ё', 'е')
+        value = re.sub(r'\b(?:ул|улица|район|квартал|рехов)\b\.?', ' ', value)
+        value = re.sub(r'[^\w\s-]', ' ', value)
+        return ' '.join(value.split())
+    return value
+
+
+def field_matches(field: str, predicted: str, truth: str) -> bool:
+    """District: same name or one is the street part of the other; other fields: exact"""
+    if field == 'district' and predicted and truth:
+        return predicted == truth or truth.startswith(predicted + ' ') or predicted.startswith(truth + ' ')
+    return predicted == truth
+
+
+def score(results: List[Tuple[Dict, Dict]]) -> Dict[str, Dict]:
+    """Per-field precision/recall over (predicted, truth) pairs"""
+    report = {}
+    for field in PARAMETER_FIELDS:
+        tp = fp = fn = 0
+        for predicted, truth in results:
+            p = normalize_field(field, predicted.get(field))
+            t = normalize_field(field, truth.get(field))
+            if p and t and field_matches(field, p, t):
+                tp += 1
+            else:
+                if p:
+                    fp += 1
+                if t:
+                    fn += 1
+        report[field] = {
+            'precision': tp / (tp + fp) if tp + fp else None,
+            'recall': tp / (tp + fn) if tp + fn else None,
+            'support': tp + fn
+        }
+    return report
+
+
+# ---------------------------------------------------------------- backends
+
+class OutputCache:
+    """JSON cache of API backend answers keyed by backend, prompt version and text hash"""
+
+    def __init__(self, corpus_dir: str, backend: str):
+        self.path = os.path.join(corpus_dir, ".cache", f"{backend}-{EXTRACTION_PROMPT_VERSION}.json")
+        self.entries = {}
+        self.hits = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def get(self, text: str) -> Optional[Dict]:
+        entry = self.entries.get(self.key(text))
+        if entry:
+            self.hits += 1
+        return entry
+
+    def put(self, text: str, entry: Dict):
+        self.entries[self.key(text)] = entry
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+
+
+def build_backend(backend: str, base_url: Optional[str]):
+    """Return (extractor, api extractor or None)"""
+    if backend == "fallback":
+        # Regex fallback of OpenAIExtractor, no client needed
+        extractor = OpenAIExtractor.__new__(OpenAIExtractor)
+        extractor.extract_parameters = lambda text, known=None: extractor._fallback_extraction(text)
+        return extractor, None
+    if backend == "local":
+        return LocalRulesExtractor(), None
+
+    extractor = create_extractor(backend, base_url=base_url)
+    api = getattr(extractor, 'api', extractor)
+    return extractor, api
+
+
+def evaluate_backend(backend: str, cases: List[Dict], corpus_dir: str, base_url: Optional[str],
+                     use_cache: bool) -> Dict:
+    """Run one backend over all cases"""
+    extractor, api = build_backend(backend, base_url)
+    cache = OutputCache(corpus_dir, backend) if backend in API_BACKENDS and use_cache else None
+
+    latencies = []
+    tokens = []
+    results = []
+
+    for case in cases:
+        entry = cache.get(case['text']) if cache else None
+        if entry is None:
+            tokens_before = api.stats.get('total_tokens', 0) if api else 0
+            started = time.perf_counter()
+            parameters = extractor.extract_parameters(case['text'])
+            elapsed = time.perf_counter() - started
+            entry = {
+                'parameters': {k: v for k, v in parameters.items() if k in PARAMETER_FIELDS},
+                'latency': elapsed,
+                'tokens': (api.stats.get('total_tokens', 0) - tokens_before) if api else 0
+            }
+            if cache:
+                cache.put(case['text'], entry)
+
+        latencies.append(entry['latency'])
+        tokens.append(entry['tokens'])
+        results.append((entry['parameters'], case['truth']))
+
+    if cache:
+        cache.save()
+
+    return {
+        'backend': backend,
+        'cases': len(cases),
+        'fields': score(results),
+        'latency_ms': {
+            'mean': sum(latencies) / len(latencies) * 1000,
+            'p50': percentile(latencies, 50) * 1000,
+            'p95': percentile(latencies, 95) * 1000,
+            'p99': percentile(latencies, 99) * 1000
+        },
+        'tokens_per_ad': sum(tokens) / len(tokens),
+        'cache_hits': cache.hits if cache else 0
+    }
+
+
+def print_report(r: Dict):
+    print(f"\n🧮 {r['backend']} ({r['cases']} ads, {r['cache_hits']} cached)")
+    print(f"   {'field':<10} {'precision':>9} {'recall':>7} {'support':>8}")
+    for field, m in r['fields'].items():
+        precision = f"{m['precision']:.2f}" if m['precision'] is not None else "-"
+        recall = f"{m['recall']:.2f}" if m['recall'] is not None else "-"
+        print(f"   {field:<10} {precision:>9} {recall:>7} {m['support']:>8}")
+    lat = r['latency_ms']
+    print(f"   ⏱️ latency mean {lat['mean']:.2f} ms  p50 {lat['p50']:.2f}  p95 {lat['p95']:.2f}  p99 {lat['p99']:.2f}")
+    print(f"   🪙 tokens/ad {r['tokens_per_ad']:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate extractor backends on a labeled corpus")
+    parser.add_argument("--backend", nargs="+", default=["local", "fallback"],
+                        choices=["local", "fallback", "openai", "hybrid"])
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="Folder of <case>/{ad.txt,params.txt}")
+    parser.add_argument("--synthetic", type=int, default=0, help="Add N labeled synthetic ads")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint (e.g. openai_stub_server.py)")
+    parser.add_argument("--no-cache", action="store_true", help="Always call API backends")
+    parser.add_argument("--seed-drive", type=int, default=0, metavar="N",
+                        help="Copy up to N Drive folders that have params.txt into the corpus and exit")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("📏 EXTRACTOR EVALUATION")
+    print("=" * 60)
+
+    if args.seed_drive:
+        added = seed_from_drive(args.corpus, args.seed_drive)
+        print(f"\n✅ Added {added} cases to {args.corpus}")
+        return
+
+    cases = load_corpus(args.corpus) + synthetic_cases(args.synthetic)
+    if not cases:
+        print(f"❌ No labeled cases in {args.corpus}")
+        sys.exit(1)
+    print(f"📚 {len(cases)} labeled ads")
+
+    reports = []
+    for backend in args.backend:
+        report = evaluate_backend(backend, cases, args.corpus, args.base_url, not args.no_cache)
+        print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Report saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Parameter extractor backends
+
+All backends return the same dict as OpenAIExtractor.extract_parameters:
+rooms / floor / furniture / price / district (+ cleaned_text).
+
+- LocalRulesExtractor: compiled rules, no network, a few hundred
+  microseconds per ad, with a confidence per field
+- HybridExtractor: local rules first, the API only for fields the rules
+  are not confident about (the confident ones are passed as `known`, so
+  the API is asked for the uncertain fields only - and not at all when
+  the rules are sure of everything)
+
+The backend is chosen with config.EXTRACTOR_BACKEND (see
+orbita_form_filler_v2.create_extractor).
+"""
+
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from text_cleaner import clean_ad_text
+from gazetteer import DISTRICT, find_address, format_address, normalize_address
+
+# Parameter fields filled on the Orbita form
+PARAMETER_FIELDS = ('rooms', 'floor', 'furniture', 'price', 'district')
+
+NUMBER = r'(\d{1,3}(?:[ ,.\u00a0]\d{3})+|\d{4,9})'
+
+# (pattern, confidence) - first match wins, so stronger patterns go first
+ROOM_RULES = [
+    (re.compile(r'(\d{1,2}(?:[.,]5)?)\s*[-‑–]?\s*(?:х\s*)?комнатн', re.IGNORECASE), 0.95),
+    (re.compile(r'(\d{1,2}(?:[.,]5)?)\s*комнат', re.IGNORECASE), 0.9),
+    (re.compile(r'(\d{1,2}(?:[.,]5)?)\s*rooms?\b', re.IGNORECASE), 0.8),
+    (re.compile(r'(\d{1,2}(?:[.,]5)?)\s*[-‑]?\s*(?:комн\.?|к\.|к\b)', re.IGNORECASE), 0.7),
+]
+
+FLOOR_RULES = [
+    (re.compile(r'этаж\s*[:\-–]?\s*(\d{1,2})\s*(?:из|/)\s*\d{1,2}', re.IGNORECASE), 0.95),
+    (re.compile(r'(\d{1,2})\s*(?:-?(?:й|ом|ой))?\s*этаж', re.IGNORECASE), 0.9),
+    (re.compile(r'этаж\s*[:\-–]?\s*(\d{1,2})\b', re.IGNORECASE), 0.85),
+    (re.compile(r'(\d{1,2})\s*(?:th|st|nd|rd)?\s*floor', re.IGNORECASE), 0.8),
+]
+FLOOR_WORDS = [
+    (re.compile(r'перв(?:ый|ом)\s+этаж', re.IGNORECASE), "1", 0.9),
+    (re.compile(r'втор(?:ой|ом)\s+этаж', re.IGNORECASE), "2", 0.9),
+    (re.compile(r'трет(?:ий|ьем)\s+этаж', re.IGNORECASE), "3", 0.9),
+    (re.compile(r'высок(?:ий|ом)\s+этаж', re.IGNORECASE), "10+", 0.6),
+]
+
+PRICE_RULES = [
+    (re.compile(r'(?:цена|стоимость|price)\s*[:\-–]?\s*' + NUMBER, re.IGNORECASE), 0.95),
+    (re.compile(NUMBER + r'\s*(?:₪|шекел|nis\b|ils\b)', re.IGNORECASE), 0.95),
+    (re.compile(r'(\d{1,3}(?:[ ,.\u00a0]\d{3}){2,}|\d{7,9})'), 0.7),
+]
+PRICE_MILLIONS_RE = re.compile(r'(\d{1,2}(?:[.,]\d{1,3})?)\s*(?:млн|миллион)', re.IGNORECASE)
+
+NO_FURNITURE_RE = re.compile(r'без\s+мебели|не\s*меблирован|без\s+обстановк', re.IGNORECASE)
+FURNITURE_RE = re.compile(r'мебел|обставлен|меблирован|furnished', re.IGNORECASE)
+
+GENERIC_STREET_RE = re.compile(r'(?:ул\.|улиц[аеы])\s*([А-ЯЁA-Z][\w\-]+(?:\s+[А-ЯЁA-Z][\w\-]+)?(?:\s+\d+)?)')
+
+
+def _digits(value: str) -> str:
+    return re.sub(r'\D', '', value)
+
+
+class BaseExtractor(ABC):
+    """Common interface of all extractor backends"""
+
+    name = "base"
+
+    @abstractmethod
+    def extract_parameters(self, ad_text: str, known: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Return rooms/floor/furniture/price/district (+ cleaned_text); `known` values win
+
+        Backends that call an API only ask it for the fields missing from `known`.
+        """
+
+    def extract_batch(self, ad_texts: List[str]) -> List[Dict[str, str]]:
+        """Extract many ads at once (backends override this when they can do better)"""
+        return [self.extract_parameters(ad_text) for ad_text in ad_texts]
+
+    def get_stats(self) -> Dict:
+        return {}
+
+
+class LocalRulesExtractor(BaseExtractor):
+    """Network-free extraction with compiled rules and per-field confidence"""
+
+    name = "local"
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.stats = {'ads': 0, 'fields': 0, 'missing': 0}
+
+    def extract_with_confidence(self, ad_text: str) -> Tuple[Dict[str, str], Dict[str, float]]:
+        """Return (parameters, confidence per found field in 0..1)"""
+        parameters = {}
+        confidence = {}
+
+        for pattern, score in ROOM_RULES:
+            match = pattern.search(ad_text)
+            if match:
+                rooms = match.group(1).replace(',', '.')
+                if 1 <= float(rooms) <= 12:
+                    parameters['rooms'], confidence['rooms'] = rooms, score
+                    break
+
+        for pattern, score in FLOOR_RULES:
+            match = pattern.search(ad_text)
+            if match and int(match.group(1)) <= 60:
+                parameters['floor'], confidence['floor'] = str(int(match.group(1))), score
+                break
+        else:
+            for pattern, value, score in FLOOR_WORDS:
+                if pattern.search(ad_text):
+                    parameters['floor'], confidence['floor'] = value, score
+                    break
+
+        for pattern, score in PRICE_RULES:
+            for match in pattern.finditer(ad_text):
+                price = _digits(match.group(1))
+                if price and 100000 <= int(price) <= 20000000:
+                    parameters['price'], confidence['price'] = price, score
+                    break
+            if 'price' in parameters:
+                break
+        else:
+            match = PRICE_MILLIONS_RE.search(ad_text)
+            if match:
+                price = int(round(float(match.group(1).replace(',', '.')) * 1000000))
+                if 100000 <= price <= 20000000:
+                    parameters['price'], confidence['price'] = str(price), 0.85
+
+        if NO_FURNITURE_RE.search(ad_text):
+            parameters['furniture'], confidence['furniture'] = "нет", 0.9
+        elif FURNITURE_RE.search(ad_text):
+            parameters['furniture'], confidence['furniture'] = "да", 0.85
+        else:
+            # Same default the model is instructed to use
+            parameters['furniture'], confidence['furniture'] = "нет", 0.8
+
+        address = find_address(ad_text)
+        if address:
+            # Exact lexicon hits: district 0.9, street 0.85; fuzzy hits scale with their score
+            base = 0.9 if address['kind'] == DISTRICT else 0.85
+            parameters['district'] = format_address(address)
+            confidence['district'] = round(base * min(1.0, address['score']), 2)
+        else:
+            match = GENERIC_STREET_RE.search(ad_text)
+            if match:
+                parameters['district'], confidence['district'] = normalize_address(match.group(1)), 0.6
+
+        return parameters, confidence
+
+    def extract_parameters(self, ad_text: str, known: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        parameters, _ = self.extract_with_confidence(ad_text)
+        parameters.update({field: value for field, value in (known or {}).items() if value})
+        self._record(parameters)
+        parameters["cleaned_text"] = clean_ad_text(ad_text)
+        return parameters
+
+    def extract_batch(self, ad_texts: List[str]) -> List[Dict[str, str]]:
+        return [self.extract_parameters(ad_text) for ad_text in ad_texts]
+
+    def extract_batch_with_confidence(self, ad_texts: List[str]) -> List[Tuple[Dict[str, str], Dict[str, float]]]:
+        return [self.extract_with_confidence(ad_text) for ad_text in ad_texts]
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _record(self, parameters: Dict[str, str]):
+        found = sum(1 for field in PARAMETER_FIELDS if parameters.get(field))
+        with self._stats_lock:
+            self.stats['ads'] += 1
+            self.stats['fields'] += found
+            self.stats['missing'] += len(PARAMETER_FIELDS) - found
+
+
+class HybridExtractor(BaseExtractor):
+    """Local rules first; the API extractor only fills low-confidence fields"""
+
+    name = "hybrid"
+
+    def __init__(self, api: BaseExtractor, local: Optional[LocalRulesExtractor] = None,
+                 min_confidence: float = 0.8):
+        self.api = api
+        self.local = local or LocalRulesExtractor()
+        self.min_confidence = min_confidence
+        self._stats_lock = threading.Lock()
+        self.stats = {'ads': 0, 'local_only': 0, 'api_ads': 0, 'api_fields': 0}
+
+    def extract_parameters(self, ad_text: str, known: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        local, confidence = self.local.extract_with_confidence(ad_text)
+        return self._merge(ad_text, local, confidence, known)
+
+    def extract_batch(self, ad_texts: List[str]) -> List[Dict[str, str]]:
+        local_results = self.local.extract_batch_with_confidence(ad_texts)
+        return [self._merge(ad_text, local, confidence, None)
+                for ad_text, (local, confidence) in zip(ad_texts, local_results)]
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['api'] = self.api.get_stats()
+        return stats
+
+    def _merge(self, ad_text: str, local: Dict[str, str], confidence: Dict[str, float],
+               known: Optional[Dict[str, str]]) -> Dict[str, str]:
+        confident = {field: value for field, value in local.items()
+                     if confidence.get(field, 0.0) >= self.min_confidence}
+        confident.update({field: value for field, value in (known or {}).items() if value})
+        uncertain = [field for field in PARAMETER_FIELDS if not confident.get(field)]
+
+        with self._stats_lock:
+            self.stats['ads'] += 1
+            if uncertain:
+                self.stats['api_ads'] += 1
+                self.stats['api_fields'] += len(uncertain)
+            else:
+                self.stats['local_only'] += 1
+
+        if not uncertain:
+            result = dict(confident)
+            result["cleaned_text"] = clean_ad_text(ad_text)
+            return result
+
+        print(f"🤖 Low-confidence fields, asking API: {', '.join(uncertain)}")
+        result = self.api.extract_parameters(ad_text, known=confident)
+
+        # Keep low-confidence local guesses for fields the API did not find either
+        for field in uncertain:
+            if not result.get(field) and local.get(field):
+                result[field] = local[field]
+        return result
@@ -0,0 +1,491 @@
+"""
+Local Google Drive API stand-in for deterministic benchmarks
+
+FakeDriveService mimics the parts of a googleapiclient Drive v3 `service`
+used by GoogleDriveClient, backed by a local directory tree:
+
+    <root>/Real estate/Ришон Лецион/ПРОДАЖА/<ad>/ad.gdoc     -> Google Doc (plain text)
+                                                 /ad.docx     -> .docx file
+                                                 /params.txt  -> text/plain
+                                                 /photo_1.jpg -> image/jpeg
+
+Supported calls: files().list (q, fields, pageSize, pageToken, orderBy),
+files().get_media and files().export_media. Media requests work with
+MediaIoBaseDownload. Latency and page sizes are configurable and every
+call is counted in `service.calls` so pagination and caching can be checked.
+With quota_per_second set, calls above that rate fail like Drive does
+(403 userRateLimitExceeded) so rate limiting and retries can be exercised.
+
+Usage:
+    service = FakeDriveService("bench_drive/100", latency=0.05, page_size=50)
+    client = GoogleDriveClient(service=service, rate_limiter=RateLimiter.unlimited("Fake Drive"))
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import mimetypes
+import threading
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+GOOGLE_DOC_MIME = 'application/vnd.google-apps.document'
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+DEFAULT_FILE_FIELDS = ['kind', 'id', 'name', 'mimeType']
+
+RATE_LIMIT_ERROR = {'error': {'code': 403, 'message': "User Rate Limit Exceeded",
+                              'errors': [{'reason': "userRateLimitExceeded"}]}}
+
+
+class FakeDriveError(Exception):
+    """Error raised by the fake service (mirrors HttpError status codes)"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"<FakeDriveError {status}: {message}>")
+        self.status = status
+
+
+class _FakeResponse(dict):
+    """httplib2-style response: header dict with a status attribute"""
+
+    def __init__(self, status: int, headers: Dict[str, str]):
+        super().__init__(headers)
+        self.status = status
+
+
+class _FakeHttp:
+    """Answers media downloads issued by MediaIoBaseDownload"""
+
+    def __init__(self, service):
+        self.service = service
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        self.service._sleep()
+        if self.service._over_quota():
+            return _FakeResponse(403, {}), json.dumps(RATE_LIMIT_ERROR).encode('utf-8')
+        self.service.calls['media_chunk'] += 1
+
+        match = re.match(r'fake://drive/files/([^?]+)\?(.*)$', uri)
+        if not match:
+            return _FakeResponse(404, {}), b""
+
+        content = self.service._read_media(match.group(1), match.group(2))
+        total = len(content)
+
+        range_header = (headers or {}).get('range') or (headers or {}).get('Range')
+        if range_header:
+            start, end = [int(x) for x in range_header.replace('bytes=', '').split('-')]
+            chunk = content[start:end + 1]
+            return _FakeResponse(206, {
+                'content-range': f"bytes {start}-{start + len(chunk) - 1}/{total}"
+            }), chunk
+
+        return _FakeResponse(200, {'content-length': str(total)}), content
+
+
+class _FakeRequest:
+    """Equivalent of googleapiclient.http.HttpRequest"""
+
+    def __init__(self, service, method: str, execute_fn, uri: str = ""):
+        self.service = service
+        self.method = method
+        self.uri = uri
+        self.headers = {}
+        self.http = service._http
+        self._execute_fn = execute_fn
+
+    def execute(self, num_retries: int = 0):
+        self.service._sleep()
+        if self.service._over_quota():
+            raise FakeDriveError(403, "userRateLimitExceeded: User Rate Limit Exceeded")
+        self.service.calls[self.method] += 1
+        return self._execute_fn()
+
+
+class _FakeFiles:
+    """Equivalent of service.files()"""
+
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, q: str = "", fields: Optional[str] = None, pageSize: Optional[int] = None,
+             pageToken: Optional[str] = None, orderBy: Optional[str] = None, **kwargs):
+        return _FakeRequest(
+            self.service, 'list',
+            lambda: self.service._list(q, fields, pageSize, pageToken, orderBy)
+        )
+
+    def get(self, fileId: str, fields: Optional[str] = None, **kwargs):
+        return _FakeRequest(
+            self.service, 'get',
+            lambda: self.service._select_fields(self.service._get_file(fileId), fields)
+        )
+
+    def get_media(self, fileId: str, **kwargs):
+        self.service._get_file(fileId)
+        uri = f"fake://drive/files/{fileId}?alt=media"
+        return _FakeRequest(self.service, 'get_media',
+                            lambda: self.service._read_media(fileId, "alt=media"), uri)
+
+    def export_media(self, fileId: str, mimeType: str, **kwargs):
+        self.service._get_file(fileId)
+        uri = f"fake://drive/files/{fileId}?export={mimeType}"
+        return _FakeRequest(self.service, 'export_media',
+                            lambda: self.service._read_media(fileId, f"export={mimeType}"), uri)
+
+
+class FakeDriveService:
+    """In-process stand-in for build('drive', 'v3') over a local directory"""
+
+    def __init__(self, root_dir: str, latency: float = 0.0, page_size: int = 100,
+                 max_page_size: int = 1000, quota_per_second: float = 0.0):
+        self.root_dir = os.path.abspath(root_dir)
+        self.latency = latency
+        self.quota_per_second = quota_per_second
+        self._recent_calls = deque()
+        self._quota_lock = threading.Lock()
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.calls = Counter()
+        self._http = _FakeHttp(self)
+        self._files = {}
+        self._paths = {}
+        self._scan()
+
+    def files(self):
+        return _FakeFiles(self)
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _scan(self):
+        """Index the local tree once - ids are stable hashes of relative paths"""
+        self._paths['root'] = self.root_dir
+        for dirpath, dirnames, filenames in os.walk(self.root_dir):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            parent_id = self._file_id(dirpath)
+            for name in dirnames:
+                self._add_entry(os.path.join(dirpath, name), parent_id, FOLDER_MIME)
+            for name in sorted(f for f in filenames if not f.startswith('.')):
+                path = os.path.join(dirpath, name)
+                self._add_entry(path, parent_id, self._guess_mime(name))
+
+    def _file_id(self, path: str) -> str:
+        relative = os.path.relpath(path, self.root_dir)
+        if relative == '.':
+            return 'root'
+        return hashlib.sha1(relative.encode('utf-8')).hexdigest()[:28]
+
+    def _add_entry(self, path: str, parent_id: str, mime_type: str):
+        stat = os.stat(path)
+        file_id = self._file_id(path)
+        timestamp = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        timestamp = timestamp.strftime('%Y-%m-%dT%H:%M:%S.') + f"{timestamp.microsecond // 1000:03d}Z"
+        name = os.path.basename(path)
+        if mime_type == GOOGLE_DOC_MIME:
+            name = name[:-len('.gdoc')]
+
+        self._files[file_id] = {
+            'kind': 'drive#file',
+            'id': file_id,
+            'name': name,
+            'mimeType': mime_type,
+            'parents': [parent_id],
+            'createdTime': timestamp,
+            'modifiedTime': timestamp,
+            'size': str(stat.st_size),
+            'trashed': False
+        }
+        self._paths[file_id] = path
+
+    @staticmethod
+    def _guess_mime(name: str) -> str:
+        lower = name.lower()
+        if lower.endswith('.gdoc'):
+            return GOOGLE_DOC_MIME
+        if lower.endswith('.docx'):
+            return DOCX_MIME
+        mime_type, _ = mimetypes.guess_type(lower)
+        return mime_type or 'application/octet-stream'
+
+    # ------------------------------------------------------------------
+    # API behaviour
+    # ------------------------------------------------------------------
+
+    def _sleep(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _over_quota(self) -> bool:
+        """True (and counted as 'throttled') if this call exceeds quota_per_second"""
+        if not self.quota_per_second:
+            return False
+        with self._quota_lock:
+            now = time.monotonic()
+            while self._recent_calls and now - self._recent_calls[0] >= 1.0:
+                self._recent_calls.popleft()
+            if len(self._recent_calls) >= self.quota_per_second:
+                self.calls['throttled'] += 1
+                return True
+            self._recent_calls.append(now)
+            return False
+
+    def _get_file(self, file_id: str) -> Dict:
+        if file_id not in self._files:
+            raise FakeDriveError(404, f"File not found: {file_id}")
+        return self._files[file_id]
+
+    def _list(self, q: str, fields: Optional[str], page_size: Optional[int],
+              page_token: Optional[str], order_by: Optional[str]) -> Dict:
+        predicate = DriveQuery(q) if q else None
+        matches = [f for f in self._files.values() if not predicate or predicate.matches(f)]
+        matches = self._order(matches, order_by)
+
+        size = min(page_size, self.max_page_size) if page_size else self.page_size
+        offset = int(page_token) if page_token else 0
+        page = matches[offset:offset + size]
+
+        result = {'kind': 'drive#fileList', 'incompleteSearch': False}
+        result['files'] = [self._select_fields(f, self._files_fields(fields)) for f in page]
+        if offset + size < len(matches) and (not fields or 'nextPageToken' in fields):
+            result['nextPageToken'] = str(offset + size)
+        return result
+
+    @staticmethod
+    def _order(files: List[Dict], order_by: Optional[str]) -> List[Dict]:
+        if not order_by:
+            return files
+        ordered = list(files)
+        for key in reversed([k.strip() for k in order_by.split(',') if k.strip()]):
+            parts = key.split()
+            field = {'name_natural': 'name', 'createdTime': 'createdTime',
+                     'modifiedTime': 'modifiedTime'}.get(parts[0], parts[0])
+            descending = len(parts) > 1 and parts[1].lower() == 'desc'
+            if field == 'folder':
+                ordered.sort(key=lambda f: f['mimeType'] != FOLDER_MIME, reverse=descending)
+            else:
+                ordered.sort(key=lambda f: f.get(field, ''), reverse=descending)
+        return ordered
+
+    @staticmethod
+    def _files_fields(fields: Optional[str]) -> Optional[List[str]]:
+        """Extract the per-file field list from e.g. 'nextPageToken, files(id, name)'"""
+        if not fields:
+            return None
+        match = re.search(r'files\(([^)]*)\)', fields)
+        if not match:
+            return None
+        return [f.strip() for f in match.group(1).split(',') if f.strip()]
+
+    @staticmethod
+    def _select_fields(file_info: Dict, fields) -> Dict:
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(',') if f.strip()]
+        wanted = fields or DEFAULT_FILE_FIELDS
+        if '*' in wanted:
+            return dict(file_info)
+        return {k: file_info[k] for k in wanted if k in file_info}
+
+    def _read_media(self, file_id: str, query: str) -> bytes:
+        file_info = self._get_file(file_id)
+        if file_info['mimeType'] == FOLDER_MIME:
+            raise FakeDriveError(403, "Folders have no media")
+
+        if query.startswith('export='):
+            if file_info['mimeType'] != GOOGLE_DOC_MIME:
+                raise FakeDriveError(403, "Only Google Docs can be exported")
+        elif file_info['mimeType'] == GOOGLE_DOC_MIME:
+            raise FakeDriveError(403, "Use export for Google Docs")
+
+        with open(self._paths[file_id], 'rb') as f:
+            return f.read()
+
+
+class DriveQuery:
+    """Evaluator for the subset of Drive `q` syntax used in this repo
+
+    Supports: and / or / not, parentheses, 'id' in parents, parents in 'id',
+    name/mimeType =, !=, contains (prefix match like Drive), createdTime /
+    modifiedTime comparisons and trashed = true/false.
+    """
+
+    TOKEN_RE = re.compile(r"\s*(?:(\()|(\))|('(?:\\.|[^'\\])*')|(<=|>=|!=|=|<|>)|([A-Za-z_]+))")
+
+    def __init__(self, query: str):
+        self.tokens = self._tokenize(query)
+        self.pos = 0
+        self.tree = self._parse_or()
+        if self.pos != len(self.tokens):
+            raise FakeDriveError(400, f"Invalid query near: {self.tokens[self.pos:]}")
+
+    def matches(self, file_info: Dict) -> bool:
+        return self._eval(self.tree, file_info)
+
+    def _tokenize(self, query: str) -> List[str]:
+        tokens = []
+        pos = 0
+        query = query.strip()
+        while pos < len(query):
+            match = self.TOKEN_RE.match(query, pos)
+            if not match or match.end() == pos:
+                raise FakeDriveError(400, f"Invalid query: {query}")
+            tokens.append(match.group(0).strip())
+            pos = match.end()
+        return [t for t in tokens if t]
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _take(self) -> str:
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def _parse_or(self):
+        node = self._parse_and()
+        while (self._peek() or '').lower() == 'or':
+            self._take()
+            node = ('or', node, self._parse_and())
+        return node
+
+    def _parse_and(self):
+        node = self._parse_not()
+        while (self._peek() or '').lower() == 'and':
+            self._take()
+            node = ('and', node, self._parse_not())
+        return node
+
+    def _parse_not(self):
+        if (self._peek() or '').lower() == 'not':
+            self._take()
+            return ('not', self._parse_not())
+        if self._peek() == '(':
+            self._take()
+            node = self._parse_or()
+            if self._take() != ')':
+                raise FakeDriveError(400, "Unbalanced parentheses in query")
+            return node
+        return self._parse_term()
+
+    def _parse_term(self):
+        left = self._take()
+        operator = (self._take() or '').lower()
+        right = self._take()
+        if left is None or right is None:
+            raise FakeDriveError(400, "Incomplete query term")
+
+        # 'id' in parents
+        if left.startswith("'") and operator == 'in':
+            return ('in_parents', self._unquote(left))
+        # parents in 'id' (form used by GoogleDriveClient)
+        if left == 'parents' and operator == 'in':
+            return ('in_parents', self._unquote(right))
+        if operator not in ['=', '!=', '<', '<=', '>', '>=', 'contains']:
+            raise FakeDriveError(400, f"Unsupported operator: {operator}")
+        return ('cmp', left, operator, self._unquote(right))
+
+    @staticmethod
+    def _unquote(token: str):
+        if token.startswith("'"):
+            return token[1:-1].replace("\\'", "'").replace("\\\\", "\\")
+        if token.lower() in ['true', 'false']:
+            return token.lower() == 'true'
+        return token
+
+    def _eval(self, node, file_info: Dict) -> bool:
+        kind = node[0]
+        if kind == 'or':
+            return self._eval(node[1], file_info) or self._eval(node[2], file_info)
+        if kind == 'and':
+            return self._eval(node[1], file_info) and self._eval(node[2], file_info)
+        if kind == 'not':
+            return not self._eval(node[1], file_info)
+        if kind == 'in_parents':
+            return node[1] in file_info.get('parents', [])
+
+        _, field, operator, value = node
+        actual = file_info.get(field)
+        if operator == 'contains':
+            if field == 'name':
+                # Drive matches name prefixes (per word)
+                words = [actual] + re.split(r'[\s_\-.]+', actual or '')
+                return any(w.lower().startswith(str(value).lower()) for w in words if w)
+            return str(value).lower() in str(actual or '').lower()
+        if operator == '=':
+            return actual == value
+        if operator == '!=':
+            return actual != value
+        if actual is None:
+            return False
+        if operator == '<':
+            return actual < value
+        if operator == '<=':
+            return actual <= value
+        if operator == '>':
+            return actual > value
+        return actual >= value
+
+
+# ----------------------------------------------------------------------
+# Synthetic tree generator
+# ----------------------------------------------------------------------
+
+SAMPLE_AD_TEXT = """Продается квартира в Ришон-ле-Ционе
+Район Ремез, ул. Ротшильд {n}
+{rooms} комнаты, {floor} этаж, есть мебель
+📐 Площадь около {area} м²
+💰 Цена: {price:,} ₪
+"""
+
+
+def generate_fake_tree(root_dir: str, folder_count: int, images_per_ad: int = 1,
+                       drive_path: str = "Real estate/Ришон Лецион/ПРОДАЖА",
+                       image_source: str = "1_935.jpg", with_params: bool = False) -> str:
+    """Create <root>/<drive_path>/<ad>/{ad.gdoc, photo_N.jpg} for `folder_count` ads"""
+    base = os.path.join(root_dir, *drive_path.split('/'))
+    marker = os.path.join(root_dir, '.fake_drive.json')
+
+    if os.path.exists(marker):
+        with open(marker, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        if existing == {'folders': folder_count, 'images': images_per_ad, 'params': with_params}:
+            return base
+        shutil.rmtree(root_dir)
+
+    os.makedirs(base, exist_ok=True)
+    for n in range(1, folder_count + 1):
+        ad_dir = os.path.join(base, f"Объявление {n:05d}")
+        os.makedirs(ad_dir, exist_ok=True)
+
+        rooms = 2 + n % 4
+        floor = n % 10
+        price = 1500000 + (n % 50) * 25000
+        with open(os.path.join(ad_dir, 'ad.gdoc'), 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_AD_TEXT.format(n=n, rooms=rooms, floor=floor, area=60 + n % 80, price=price))
+
+        if with_params:
+            with open(os.path.join(ad_dir, 'params.txt'), 'w', encoding='utf-8') as f:
+                f.write(f"Адрес\nРотшильд {n}\nКомнаты\n{rooms}\nЭтаж\n{floor}\nМебель\nДа\nЦена\n{price}\n")
+
+        for i in range(1, images_per_ad + 1):
+            target = os.path.join(ad_dir, f"photo_{i}.jpg")
+            try:
+                os.link(image_source, target)
+            except OSError:
+                shutil.copyfile(image_source, target)
+
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump({'folders': folder_count, 'images': images_per_ad, 'params': with_params}, f)
+
+    print(f"✅ Generated fake Drive tree with {folder_count} ad folders in {base}")
+    return base
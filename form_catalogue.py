@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Orbita add-form option catalogue
+
+Every <select> of the add form (board, city, phonecode and the apartment
+fields loaded into #dyncon) is parsed once into a label -> option value
+map and cached in FORM_CATALOGUE_PATH together with a version hash.
+
+Parameters of each ad are validated and normalized against the catalogue
+before the browser is opened, so a value the form does not offer (e.g.
+"7 комнат" or floor "12") is caught up front instead of silently being
+posted as "Не указано".
+
+Limitation: the saved page.html has no scripts, so the #dyncon selects
+(room, floor, furniture) are not in it. Until the live form has been seen
+they come from har_replay.DYNCON_FIXTURE - option tables copied by hand
+from the site, i.e. the same values _fill_apartment_parameters used
+before. They are listed as `unverified` in the cached catalogue; the
+first run that opens the add form (FORM_CATALOGUE_LIVE_REFRESH) replaces
+them with the options scraped from the live page.
+
+Usage:
+    python form_catalogue.py            # build from the saved page.html and print a summary
+    python form_catalogue.py --show room floor
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+import config
+
+# Apartment parameter -> select name on the form
+PARAMETER_SELECTS = {'rooms': 'room', 'floor': 'floor', 'furniture': 'furniture'}
+
+# Option shown when nothing is selected - never a valid answer
+EMPTY_OPTION_LABELS = ("не указано", "выберите", "---")
+
+FURNITURE_WORDS = {
+    'да': "Да", 'yes': "Да", 'есть': "Да", 'с мебелью': "Да",
+    'нет': "Нет", 'no': "Нет", 'без мебели': "Нет",
+    'частично': "Частично", 'частичная': "Частично", 'partial': "Частично"
+}
+
+MAX_DISTRICT_LENGTH = 100
+
+
+class SelectParser(HTMLParser):
+    """Collect {select name: {label: value}} from form HTML"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.selects = {}
+        self._select = None
+        self._value = None
+        self._label = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'select':
+            self._select = attrs.get('name') or attrs.get('id')
+            if self._select:
+                self.selects.setdefault(self._select, {})
+        elif tag == 'option' and self._select:
+            self._finish_option()
+            self._value = attrs.get('value', "")
+            self._label = []
+
+    def handle_endtag(self, tag):
+        if tag == 'option':
+            self._finish_option()
+        elif tag == 'select':
+            self._finish_option()
+            self._select = None
+
+    def handle_data(self, data):
+        if self._value is not None:
+            self._label.append(data)
+
+    def _finish_option(self):
+        if self._select and self._value is not None:
+            label = ' '.join(''.join(self._label).split())
+            if label:
+                self.selects[self._select].setdefault(label, self._value)
+        self._value = None
+        self._label = []
+
+
+def parse_selects(html: str) -> Dict[str, Dict[str, str]]:
+    """All selects of a page as {name: {label: value}}"""
+    parser = SelectParser()
+    parser.feed(html)
+    parser.close()
+    return {name: options for name, options in parser.selects.items() if options}
+
+
+def catalogue_version(selects: Dict[str, Dict[str, str]]) -> str:
+    return hashlib.sha1(json.dumps(selects, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:12]
+
+
+def _number(value: str) -> Optional[float]:
+    # The sign is kept: floor "-1" must not become "1"
+    match = re.search(r'[-−]?\d+(?:[.,]\d+)?', value)
+    if match:
+        return float(match.group(0).replace(',', '.').replace('−', '-'))
+    return None
+
+
+class FormCatalogue:
+    """Label -> option value maps of the add form with parameter validation"""
+
+    def __init__(self, selects: Dict[str, Dict[str, str]], source: str = "", created: str = "",
+                 unverified: Optional[List[str]] = None):
+        self.selects = selects
+        self.source = source
+        self.created = created or datetime.now().isoformat(timespec='seconds')
+        # Selects taken from the hand-copied fixture, not yet seen on the live form
+        self.unverified = sorted(set(unverified or []) & set(selects))
+        self.version = catalogue_version(selects)
+        # Case-insensitive label lookup
+        self._folded = {name: {label.casefold(): value for label, value in options.items()}
+                        for name, options in selects.items()}
+
+    # ------------------------------------------------------------ building
+
+    @classmethod
+    def from_html(cls, html: str, source: str = "") -> 'FormCatalogue':
+        return cls(parse_selects(html), source=source)
+
+    @classmethod
+    def from_saved_form(cls, path: str = None) -> 'FormCatalogue':
+        """Build from the saved add form (view-source copy) plus the #dyncon fields"""
+        from har_replay import DYNCON_FIXTURE, extract_view_source_html
+
+        path = path or config.REPLAY_FORM_HTML
+        selects = parse_selects(extract_view_source_html(path))
+        fixture = parse_selects(DYNCON_FIXTURE)
+        unverified = [name for name in fixture if name not in selects]
+        return cls({**fixture, **selects}, source=path, unverified=unverified)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['FormCatalogue']:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            catalogue = cls(data['selects'], source=data.get('source', ""), created=data.get('created', ""),
+                            unverified=data.get('unverified', []))
+            if catalogue.version != data.get('version'):
+                print(f"⚠️ Form catalogue {path} was edited by hand (version mismatch), rebuilding")
+                return None
+            return catalogue
+        except Exception as e:
+            print(f"⚠️ Could not read form catalogue {path}: {e}")
+            return None
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'source': self.source, 'created': self.created,
+                       'unverified': self.unverified, 'selects': self.selects}, f, ensure_ascii=False, indent=1)
+
+    def refresh_from_html(self, html: str, source: str = "live form") -> bool:
+        """Merge selects scraped from the live form; True if any option changed or was verified"""
+        scraped = parse_selects(html)
+        merged = dict(self.selects)
+        merged.update(scraped)
+        unverified = [name for name in self.unverified if name not in scraped]
+        if catalogue_version(merged) == self.version:
+            if unverified == self.unverified:
+                return False
+            print(f"✅ Fixture options confirmed by the live form: "
+                  f"{', '.join(name for name in self.unverified if name in scraped)}")
+            self.unverified = unverified
+            return True
+
+        changed = sorted(name for name, options in scraped.items() if self.selects.get(name) != options)
+        print(f"⚠️ Form options changed since {self.source or 'the cached catalogue'}: {', '.join(changed)}")
+        self.__init__(merged, source=source, unverified=unverified)
+        return True
+
+    # ------------------------------------------------------------ lookup
+
+    def option_value(self, select: str, label: str) -> Optional[str]:
+        """Option value for a label (case-insensitive), None if the form has no such option"""
+        if label is None:
+            return None
+        return self._folded.get(select, {}).get(' '.join(str(label).split()).casefold())
+
+    def labels(self, select: str) -> List[str]:
+        """Selectable labels (without the "Не указано" placeholder)"""
+        return [label for label, value in self.selects.get(select, {}).items()
+                if value not in ("", "0") and not label.casefold().startswith(EMPTY_OPTION_LABELS)]
+
+    # ------------------------------------------------------------ validation
+
+    def validate_parameters(self, parameters: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Return (normalized parameters, {field: error}) for the form fields
+
+        Values are rewritten to the exact option labels ("4,5" -> "4.5",
+        floor 14 -> "10+", "Да" for yes). Fields that are missing are left
+        out; fields that are present but not postable are reported.
+        """
+        normalized = dict(parameters)
+        errors = {}
+
+        for field, select in PARAMETER_SELECTS.items():
+            value = parameters.get(field)
+            if value is None or not str(value).strip():
+                normalized.pop(field, None)
+                continue
+            label = self._select_label(field, str(value).strip())
+            if label is None:
+                errors[field] = f"'{value}' is not an option of '{select}' ({', '.join(self.labels(select))})"
+            else:
+                normalized[field] = label
+
+        price = parameters.get('price')
+        if price is not None and str(price).strip():
+            digits = re.sub(r'\D', '', str(price))
+            if not digits or int(digits) <= 0 or str(price).strip()[0] in '-−':
+                errors['price'] = f"'{price}' is not a price"
+            else:
+                normalized['price'] = str(int(digits))
+        else:
+            normalized.pop('price', None)
+
+        district = parameters.get('district')
+        if district is not None and str(district).strip():
+            district = ' '.join(str(district).split())
+            if len(district) > MAX_DISTRICT_LENGTH:
+                errors['district'] = f"address is longer than {MAX_DISTRICT_LENGTH} characters"
+            else:
+                normalized['district'] = district
+        else:
+            normalized.pop('district', None)
+
+        return normalized, errors
+
+    def _select_label(self, field: str, value: str) -> Optional[str]:
+        """Map a parameter value to an option label of its select"""
+        select = PARAMETER_SELECTS[field]
+        candidates = [value]
+
+        if field == 'furniture':
+            word = value.casefold().rstrip('.')
+            candidates.append(FURNITURE_WORDS.get(word, ""))
+        else:
+            number = _number(value)
+            if number is not None:
+                # Open-ended last option: "6+" rooms, "10+" floor
+                open_ended = [label for label in self.labels(select) if label.endswith('+')]
+                if open_ended and number >= _number(open_ended[0]):
+                    candidates.append(open_ended[0])
+                candidates.append(f"{number:g}")
+
+        selectable = {label.casefold(): label for label in self.labels(select)}
+        for candidate in candidates:
+            label = selectable.get(' '.join(candidate.split()).casefold())
+            if label:
+                return label
+        return None
+
+
+_catalogue = None
+
+
+def load_catalogue(path: str = None, rebuild: bool = False) -> FormCatalogue:
+    """Cached catalogue; built from the saved form on first use"""
+    global _catalogue
+    path = path or config.FORM_CATALOGUE_PATH
+    if _catalogue is not None and not rebuild:
+        return _catalogue
+
+    catalogue = None if rebuild else FormCatalogue.load(path)
+    if catalogue is None:
+        catalogue = FormCatalogue.from_saved_form(config.FORM_CATALOGUE_SOURCE)
+        catalogue.save(path)
+        print(f"📚 Form catalogue built from {catalogue.source}: {len(catalogue.selects)} selects "
+              f"(version {catalogue.version})")
+    if catalogue.unverified:
+        print(f"⚠️ Options of {', '.join(catalogue.unverified)} come from the hand-copied #dyncon fixture "
+              f"until the live add form has been seen once")
+    _catalogue = catalogue
+    return catalogue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Orbita add-form option catalogue")
+    parser.add_argument("--html", default=config.FORM_CATALOGUE_SOURCE, help="Saved add form (view-source copy)")
+    parser.add_argument("--output", default=config.FORM_CATALOGUE_PATH)
+    parser.add_argument("--show", nargs="*", metavar="SELECT", help="Print the options of these selects")
+    args = parser.parse_args()
+
+    catalogue = FormCatalogue.from_saved_form(args.html)
+    catalogue.save(args.output)
+    print(f"✅ {len(catalogue.selects)} selects, version {catalogue.version} -> {args.output}")
+    if catalogue.unverified:
+        print(f"⚠️ Not from a real capture (hand-copied #dyncon fixture): {', '.join(catalogue.unverified)}")
+    for name, options in catalogue.selects.items():
+        print(f"   {name:<12} {len(options)} options")
+    for name in args.show or []:
+        print(f"\n📋 {name}:")
+        for label, value in catalogue.selects.get(name, {}).items():
+            print(f"   {value:>6}  {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+District / street gazetteer with fuzzy lookup
+
+Canonical Rishon LeZion districts and streets with their Russian, Hebrew
+and Latin spellings. Two indexes are built once per lexicon:
+
+- a token index for a single-pass exact scan of ad text (inflected Russian
+  endings such as "в Ремезе" / "Ротшильда" are accepted)
+- a trigram inverted index for fuzzy lookup of misspelled names
+
+normalize_address() turns whatever the model or the regexes found into one
+canonical address value ("Ремез", "ул. Ротшильд 12-1").
+
+More cities/streets can be loaded from JSON with Gazetteer.from_json().
+"""
+
+import re
+import json
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+DISTRICT = "district"
+STREET = "street"
+
+# (canonical, kind, variants) - canonical is what goes into the form
+RISHON_LEZION_ENTRIES = [
+    # Districts
+    ("Ремез", DISTRICT, ["Ремэз", "רמז", "Remez"]),
+    ("Нахалат Иегуда", DISTRICT, ["Нахлад Иуда", "Нахалат Иуда", "Нахалат Егуда", "Нахлат Иегуда",
+                                  "נחלת יהודה", "Nahalat Yehuda"]),
+    ("Неве Дения", DISTRICT, ["Неве Деня", "Нве Дения", "Neve Denya"]),
+    ("Кирьят Гаон", DISTRICT, ["Кирьят Гаонь", "Kiryat Gaon"]),
+    ("Рамат Элияу", DISTRICT, ["Рамат Элиягу", "Рамат Эльяху", "Рамат Элиаху", "רמת אליהו", "Ramat Eliyahu"]),
+    ("Центр", DISTRICT, ["Центр города", "מרכז העיר", "City Center"]),
+    ("Старый город", DISTRICT, ["Старом городе", "העיר העתיקה", "Old City"]),
+    ("Неве Хадарим", DISTRICT, ["Нве Хадарим", "נווה הדרים", "Neve Hadarim"]),
+    ("Неве Ям", DISTRICT, ["Нве Ям", "נווה ים", "Neve Yam"]),
+    ("Кирьят ха-Цайярим", DISTRICT, ["Кирьят Ацайярим", "Квартал художников", "קריית הציירים",
+                                     "Kiryat HaTzayarim"]),
+    ("Западный Ришон", DISTRICT, ["Маарав Ришон", "מערב ראשון", "Rishon West"]),
+    ("Шикун Ватиким", DISTRICT, ["שיכון ותיקים", "Shikun Vatikim"]),
+    ("Ган Нахум", DISTRICT, ["גן נחום", "Gan Nahum"]),
+    # Streets
+    ("Ротшильд", STREET, ["Ротшилд", "רוטשילד", "Rothschild"]),
+    ("Герцль", STREET, ["Герцел", "Герцль", "הרצל", "Herzl"]),
+    ("Жаботинский", STREET, ["Жаботински", "Зеэв Жаботинский", "ז'בוטינסקי", "Jabotinsky"]),
+    ("Бялик", STREET, ["Бьялик", "ביאליק", "Bialik"]),
+    ("Ахад ха-Ам", STREET, ["Ахад Хаам", "Ахад Ха-Ам", "Ахад Гаам", "אחד העם", "Ahad Haam"]),
+    ("Рош Пина", STREET, ["Рош-Пина", "ראש פינה", "Rosh Pina"]),
+    ("Вайцман", STREET, ["Вейцман", "ויצמן", "Weizmann"]),
+    ("Бен Гурион", STREET, ["Бен-Гурион", "בן גוריון", "Ben Gurion"]),
+    ("Соколов", STREET, ["סוקולוב", "Sokolov"]),
+    ("Абарбанель", STREET, ["Абарбанел", "אברבנאל", "Abarbanel"]),
+    ("Карл Неттер", STREET, ["Карл Нетер", "קרל נטר", "Karl Netter"]),
+    ("Дгания", STREET, ["Дегания", "דגניה", "Degania"]),
+    ("Гисин", STREET, ["Гиссин", "גיסין", "Gissin"]),
+    ("ха-Башан", STREET, ["Башан", "הבשן", "HaBashan"]),
+]
+
+TOKEN_RE = re.compile(r"\d+(?:[-/]\d+)*[а-яa-z]?|[^\W\d_]+")
+HEBREW_MARKS_RE = re.compile(r"[֑-ׇ'\"׳״]")
+HOUSE_RE = re.compile(r"^\d+(?:[-/]\d+)*[а-яa-z]?$")
+MARKER_RE = re.compile(r"\b(?:ул|улица|улице|район|районе|квартал|рехов|шхунат|шхуна)\b\.?", re.IGNORECASE)
+# Words that introduce a district name ("район Неве Ям", "в квартале Ремез")
+DISTRICT_MARKERS = {"район", "районе", "квартал", "квартале", "микрорайон", "микрорайоне", "шхунат", "шхуна"}
+# Variants that are ordinary words too ("торговый центр") - only a district right after a marker
+GENERIC_VARIANTS = {("центр",)}
+
+# Russian case endings accepted after a lexicon token ("Ремезе", "Ротшильда")
+MAX_SUFFIX = 2
+MIN_STEM = 4
+
+
+def normalize(text: str) -> str:
+    """Lowercase, ё->е, no Hebrew points/geresh, punctuation and hyphens -> spaces"""
+    text = HEBREW_MARKS_RE.sub('', text.lower().replace('ё', 'е'))
+    return ' '.join(TOKEN_RE.findall(text))
+
+
+def trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class Gazetteer:
+    """Lexicon of places with exact token scan and trigram fuzzy lookup"""
+
+    def __init__(self, entries, city: str = "Ришон ле-Цион"):
+        self.entries = []          # (canonical, kind, city)
+        self.variants = []         # (normalized variant, entry index, trigram count)
+        self.first_token = defaultdict(list)  # first token -> [(tokens, entry index)]
+        self.trigram_index = defaultdict(set)  # trigram -> {variant index}
+        self.add_entries(entries, city)
+
+    @classmethod
+    def from_json(cls, path: str) -> 'Gazetteer':
+        """Load [{"city": ..., "canonical": ..., "kind": ..., "variants": [...]}, ...]"""
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        gazetteer = cls([])
+        for record in records:
+            gazetteer.add_entries([(record['canonical'], record.get('kind', STREET), record.get('variants', []))],
+                                  record.get('city', ""))
+        return gazetteer
+
+    def add_entries(self, entries, city: str = ""):
+        for canonical, kind, variants in entries:
+            entry_index = len(self.entries)
+            self.entries.append((canonical, kind, city))
+            for variant in {normalize(v) for v in [canonical] + list(variants)}:
+                if not variant:
+                    continue
+                variant_index = len(self.variants)
+                grams = set(trigrams(variant))
+                self.variants.append((variant, entry_index, len(grams)))
+                tokens = tuple(variant.split())
+                self.first_token[tokens[0]].append((tokens, entry_index))
+                for gram in grams:
+                    self.trigram_index[gram].add(variant_index)
+
+        # Longest variants first so "Старый город" beats a shorter overlap
+        for candidates in self.first_token.values():
+            candidates.sort(key=lambda c: len(c[0]), reverse=True)
+
+    # ------------------------------------------------------------ exact scan
+
+    def find_all(self, text: str) -> List[Dict]:
+        """All lexicon places mentioned in text, in order (single pass over tokens)"""
+        tokens = normalize(text).split()
+        matches = []
+        i = 0
+        while i < len(tokens):
+            match = self._match_at(tokens, i)
+            if match:
+                matches.append(match)
+                i = match['end']
+            else:
+                i += 1
+        return matches
+
+    def find_address(self, text: str) -> Optional[Dict]:
+        """Best address in text (with house number for streets)
+
+        First district after a marker ("район Неве Ям"), else first district,
+        else first street, else a generic word such as a bare "центр".
+        """
+        matches = self.find_all(text)
+        if not matches:
+            return self._fuzzy_after_marker(text)
+        districts = [match for match in matches if match['kind'] == DISTRICT and not match['generic']]
+        streets = [match for match in matches if match['kind'] == STREET]
+        for candidates in ([match for match in districts if match['marked']], districts, streets, matches):
+            if candidates:
+                return candidates[0]
+
+    def _match_at(self, tokens: List[str], i: int) -> Optional[Dict]:
+        token = tokens[i]
+        keys = [token]
+        # Inflected form: try the stems "ремезе" -> "ремез", "ротшильда" -> "ротшильд"
+        for cut in range(1, MAX_SUFFIX + 1):
+            if len(token) - cut >= MIN_STEM:
+                keys.append(token[:-cut])
+
+        for key in keys:
+            for variant_tokens, entry_index in self.first_token.get(key, ()):
+                end = i + len(variant_tokens)
+                if end <= len(tokens) and all(self._token_matches(tokens[i + k], t)
+                                              for k, t in enumerate(variant_tokens)):
+                    match = self._make_match(entry_index, tokens, end, 1.0)
+                    match['marked'] = i > 0 and tokens[i - 1] in DISTRICT_MARKERS
+                    match['generic'] = variant_tokens in GENERIC_VARIANTS and not match['marked']
+                    return match
+        return None
+
+    @staticmethod
+    def _token_matches(token: str, variant_token: str) -> bool:
+        if token == variant_token:
+            return True
+        return (len(variant_token) >= MIN_STEM and token.startswith(variant_token)
+                and len(token) - len(variant_token) <= MAX_SUFFIX)
+
+    def _make_match(self, entry_index: int, tokens: List[str], end: int, score: float) -> Dict:
+        canonical, kind, city = self.entries[entry_index]
+        house = tokens[end] if kind == STREET and end < len(tokens) and HOUSE_RE.match(tokens[end]) else None
+        return {'canonical': canonical, 'kind': kind, 'city': city, 'house': house,
+                'score': score, 'end': end + (1 if house else 0)}
+
+    # ------------------------------------------------------------ fuzzy lookup
+
+    def lookup(self, name: str, kind: Optional[str] = None, min_score: float = 0.5) -> Optional[Dict]:
+        """Closest lexicon entry to a (possibly misspelled) name by trigram Dice score"""
+        query = normalize(name)
+        if not query:
+            return None
+
+        query_grams = set(trigrams(query))
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for variant_index in self.trigram_index.get(gram, ()):
+                shared[variant_index] += 1
+
+        best = None
+        best_score = min_score
+        query_count = len(query_grams)
+        for variant_index, common in shared.items():
+            # Dice can't beat best_score unless enough trigrams are shared
+            if 2.0 * common / (query_count + common) <= best_score:
+                continue
+            _, entry_index, variant_count = self.variants[variant_index]
+            if kind and self.entries[entry_index][1] != kind:
+                continue
+            score = 2.0 * common / (query_count + variant_count)
+            if score > best_score:
+                best, best_score = entry_index, score
+
+        if best is None:
+            return None
+        canonical, entry_kind, city = self.entries[best]
+        return {'canonical': canonical, 'kind': entry_kind, 'city': city, 'house': None, 'score': best_score}
+
+    def _fuzzy_after_marker(self, text: str) -> Optional[Dict]:
+        """Fuzzy-match the words after 'ул.' / 'район' when the exact scan found nothing"""
+        for marker in MARKER_RE.finditer(text):
+            tail = normalize(text[marker.end():marker.end() + 40]).split()
+            words = [t for t in tail[:3] if not HOUSE_RE.match(t)]
+            house = next((t for t in tail[:4] if HOUSE_RE.match(t)), None)
+            for length in (2, 1):
+                if len(words) >= length:
+                    match = self.lookup(' '.join(words[:length]), min_score=0.6)
+                    if match:
+                        if match['kind'] == STREET:
+                            match['house'] = house
+                        return match
+        return None
+
+    # ------------------------------------------------------------ formatting
+
+    def normalize_address(self, value: str) -> str:
+        """Canonical address for the form; unknown places are returned cleaned up"""
+        if not value or not value.strip():
+            return ""
+
+        match = self.find_address(value)
+        if not match:
+            words = [t for t in normalize(MARKER_RE.sub(' ', value)).split() if not HOUSE_RE.match(t)]
+            match = self.lookup(' '.join(words), min_score=0.6) if words else None
+            if match and match['kind'] == STREET:
+                match['house'] = next((t for t in normalize(value).split() if HOUSE_RE.match(t)), None)
+
+        return format_address(match) if match else ' '.join(value.split())
+
+
+def format_address(match: Dict) -> str:
+    if match['kind'] == STREET:
+        return f"ул. {match['canonical']}" + (f" {match['house']}" if match.get('house') else "")
+    return match['canonical']
+
+
+_default = None
+
+
+def default_gazetteer() -> Gazetteer:
+    """Shared Rishon LeZion gazetteer (indexes are built on first use)"""
+    global _default
+    if _default is None:
+        _default = Gazetteer(RISHON_LEZION_ENTRIES)
+    return _default
+
+
+def find_address(text: str) -> Optional[Dict]:
+    return default_gazetteer().find_address(text)
+
+
+def normalize_address(value: str) -> str:
+    return default_gazetteer().normalize_address(value)
@@ -0,0 +1,170 @@
+"""
+Offline HAR replay for the Orbita form pipeline
+
+Serves the pages captured from the live site so the browser part of
+OrbitaFormFillerV2 can run with no network at all:
+- passport.orbita.co.il.har  -> login page and its assets
+- login.html + login_files/  -> login page (saved copy)
+- page.html                  -> add form (saved as "view-source", unwrapped here)
+- form POST                  -> redirect to /my/add/?addsuccess=1
+
+Anything not covered by the captures is aborted, so a replay run can
+never reach the real board.
+"""
+
+import os
+import re
+import html
+import mimetypes
+from typing import Dict, Optional
+
+FORM_URL = "https://doska.orbita.co.il/my/add/"
+SUCCESS_URL = "https://doska.orbita.co.il/my/add/?addsuccess=1"
+
+# Apartment fields are loaded into #dyncon by changeBoard() on the live site.
+# The saved page has no scripts, so they are provided here with the option
+# values used by _fill_apartment_parameters.
+DYNCON_FIXTURE = """
+<div class="row"><div class="col-md-6">Комнат:</div><div class="col-md-8">
+<select class="form-control input-sm" name="room">
+<option value="0">Не указано</option>
+<option value="77">1</option><option value="78">1.5</option><option value="79">2</option>
+<option value="80">2.5</option><option value="81">3</option><option value="82">3.5</option>
+<option value="83">4</option><option value="84">4.5</option><option value="85">5</option>
+<option value="86">5.5</option><option value="87">6+</option>
+</select></div></div>
+<div class="row"><div class="col-md-6">Этаж:</div><div class="col-md-8">
+<select class="form-control input-sm" name="floor">
+<option value="0">Не указано</option>
+<option value="57">0</option><option value="58">1</option><option value="59">2</option>
+<option value="60">3</option><option value="61">4</option><option value="62">5</option>
+<option value="63">6</option><option value="64">7</option><option value="65">8</option>
+<option value="66">9</option><option value="67">10+</option>
+</select></div></div>
+<div class="row"><div class="col-md-6">Мебель:</div><div class="col-md-8">
+<select class="form-control input-sm" name="furniture">
+<option value="0">Не указано</option>
+<option value="26">Да</option><option value="27">Нет</option><option value="28">Частично</option>
+</select></div></div>
+<div class="row"><div class="col-md-6">Цена:</div><div class="col-md-8">
+<input type="text" class="form-control input-sm" name="cost"></div></div>
+<div class="row"><div class="col-md-6">Адрес:</div><div class="col-md-8">
+<input type="text" class="form-control input-sm" name="address"></div></div>
+"""
+
+
+def extract_view_source_html(path: str) -> str:
+    """Recover the original HTML from a page saved from Chrome's view-source tab"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    rows = re.findall(r'<td class="line-content">(.*?)</td></tr>', content, re.S)
+    if not rows:
+        # Regular saved page
+        return content
+
+    return '\n'.join(html.unescape(re.sub(r'<[^>]+>', '', row)) for row in rows)
+
+
+class HarReplay:
+    """Installs Playwright routes that serve captured Orbita pages"""
+
+    def __init__(self, har_path: str, form_html_path: str, login_html_path: str,
+                 login_files_dir: str):
+        self.har_path = har_path
+        self.login_html_path = login_html_path
+        self.login_files_dir = login_files_dir
+        self.form_html = self._build_form_html(form_html_path)
+        self.login_html = self._read_text(login_html_path)
+        self.stats = {'served': 0, 'har': 0, 'aborted': 0, 'submitted': 0}
+
+    def install(self, context):
+        """Register replay routes on a browser context (later routes run first)"""
+        # 1. Lowest priority: block everything that was not captured
+        context.route("**/*", self._abort)
+
+        # 2. Recorded responses from the HAR file
+        if self.har_path and os.path.exists(self.har_path):
+            context.route_from_har(self.har_path, not_found="fallback")
+        else:
+            print(f"⚠️ HAR file not found: {self.har_path}")
+
+        # 3. Highest priority: saved pages and the form submission
+        context.route("**/*", self._serve_local)
+
+        print("🎞️ HAR replay routes installed - network access disabled")
+
+    def _serve_local(self, route):
+        """Serve saved pages, fall back to the HAR for everything else"""
+        request = route.request
+        url = request.url.split('#')[0]
+        path = url.split('?')[0]
+
+        if path.startswith(FORM_URL[:-1]):
+            if request.method == "POST":
+                self.stats['submitted'] += 1
+                route.fulfill(status=302, headers={'Location': SUCCESS_URL}, body="")
+            else:
+                self._fulfill(route, self.form_html, "text/html; charset=utf-8")
+            return
+
+        if "passport.orbita.co.il/site/login" in path and "/login_files/" not in path \
+                and request.method == "GET" and self.login_html:
+            self._fulfill(route, self.login_html, "text/html; charset=utf-8")
+            return
+
+        if "/login_files/" in path:
+            local_file = self._find_login_file(path.rsplit('/login_files/', 1)[1])
+            if local_file:
+                with open(local_file, 'rb') as f:
+                    body = f.read()
+                self._fulfill(route, body, self._guess_content_type(local_file))
+                return
+
+        self.stats['har'] += 1
+        route.fallback()
+
+    def _abort(self, route):
+        """Abort requests that are not part of the capture"""
+        self.stats['aborted'] += 1
+        route.abort()
+
+    def _fulfill(self, route, body, content_type: str):
+        self.stats['served'] += 1
+        route.fulfill(status=200, headers={'Content-Type': content_type}, body=body)
+
+    def _find_login_file(self, name: str) -> Optional[str]:
+        """Find a saved asset - Chrome appends '.загрузка' to script names"""
+        from urllib.parse import unquote
+        name = unquote(name)
+        for candidate in [name, f"{name}.загрузка"]:
+            path = os.path.join(self.login_files_dir, candidate)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    @staticmethod
+    def _guess_content_type(path: str) -> str:
+        name = path[:-len('.загрузка')] if path.endswith('.загрузка') else path
+        content_type, _ = mimetypes.guess_type(name)
+        return content_type or "application/octet-stream"
+
+    @staticmethod
+    def _read_text(path: str) -> str:
+        if not path or not os.path.exists(path):
+            return ""
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    @staticmethod
+    def _build_form_html(path: str) -> str:
+        """Unwrap the saved form and add the dynamic apartment fields"""
+        if not path or not os.path.exists(path):
+            print(f"⚠️ Form page not found: {path}")
+            return "<html><body></body></html>"
+
+        form_html = extract_view_source_html(path)
+        return form_html.replace('<div id="dyncon">', '<div id="dyncon">' + DYNCON_FIXTURE, 1)
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
@@ -0,0 +1,71 @@
+"""
+Image preparation for upload
+
+Checks that a downloaded file really is an image the board accepts
+(by its magic bytes, Drive MIME types are not always right) and writes
+the processed copy into the bundle. With Pillow installed, images larger
+than IMAGE_MAX_DIMENSION are downscaled and re-encoded as JPEG, which
+makes the browser upload step much faster; without it they are copied
+unchanged.
+"""
+
+import os
+import shutil
+from typing import Optional
+
+import config
+
+# Magic bytes -> extension
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+]
+
+
+def detect_image_type(path: str) -> Optional[str]:
+    """Extension for a supported image file, None if it is not one"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(12)
+    except OSError:
+        return None
+    for signature, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+
+def process_image(source_path: str, target_dir: str, index: int) -> Optional[str]:
+    """Write the upload-ready copy of an image as <target_dir>/<index>.<ext>; None if unusable"""
+    extension = detect_image_type(source_path)
+    if not extension:
+        print(f"⚠️ Not a supported image, skipping: {os.path.basename(source_path)}")
+        return None
+
+    os.makedirs(target_dir, exist_ok=True)
+    max_dimension = config.IMAGE_MAX_DIMENSION
+
+    if max_dimension:
+        try:
+            from PIL import Image, ImageOps
+
+            with Image.open(source_path) as image:
+                if max(image.size) > max_dimension:
+                    # Re-encoding drops EXIF, so apply its orientation to the pixels first
+                    image = ImageOps.exif_transpose(image)
+                    image.thumbnail((max_dimension, max_dimension))
+                    target_path = os.path.join(target_dir, f"{index:02d}.jpg")
+                    image.convert('RGB').save(target_path, 'JPEG', quality=config.IMAGE_JPEG_QUALITY)
+                    return target_path
+        except ImportError:
+            pass  # Pillow is optional - upload the original
+        except Exception as e:
+            print(f"⚠️ Could not resize {os.path.basename(source_path)}: {e}")
+
+    target_path = os.path.join(target_dir, f"{index:02d}{extension}")
+    shutil.copyfile(source_path, target_path)
+    return target_path
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the extraction layer
+
+Starts openai_stub_server.py in-process (or uses --base-url) and runs
+OpenAIExtractor.extract_parameters over a synthetic ad corpus with the
+requested concurrency. Reports throughput, latency percentiles and how
+many answers ended in the local fallback.
+
+Usage:
+    python load_test_extraction.py --ads 500 --concurrency 8 --latency 0.2 --error-rate 0.05
+"""
+
+import sys
+import math
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from openai_stub_server import start_stub_server
+from orbita_form_filler_v2 import OpenAIExtractor
+
+sys.path.insert(0, "benchmarks")
+from corpus import make_ad_text
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def run_load_test(extractor: OpenAIExtractor, ads, concurrency: int) -> dict:
+    """Extract all ads with a thread pool and collect per-call latency"""
+    latencies = []
+
+    def extract(ad_text):
+        started = time.perf_counter()
+        result = extractor.extract_parameters(ad_text)
+        latencies.append(time.perf_counter() - started)
+        return result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(extract, ads))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'ads': len(ads),
+        'elapsed': elapsed,
+        'throughput': len(ads) / elapsed if elapsed else 0.0,
+        'mean': statistics.mean(latencies),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'extractor': extractor.get_stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test OpenAIExtractor against a local stub")
+    parser.add_argument("--ads", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--base-url", help="Use an already running OpenAI-compatible server")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🧪 EXTRACTION LOAD TEST (OFFLINE)")
+    print("=" * 60)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = start_stub_server(
+            port=0, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+            error_status=args.error_status, malformed_rate=args.malformed_rate, seed=42
+        )
+        print(f"🤖 Stub server started on {base_url}")
+
+    config.OPENAI_BASE_URL = base_url
+    extractor = OpenAIExtractor(base_url=base_url)
+    ads = [make_ad_text(n, extra_lines=n % 7) for n in range(args.ads)]
+
+    try:
+        r = run_load_test(extractor, ads, args.concurrency)
+    finally:
+        if server:
+            stub_stats = server.RequestHandlerClass.behaviour.stats
+            server.shutdown()
+
+    print("\n" + "=" * 60)
+    print("📊 RESULTS")
+    print("=" * 60)
+    print(f"Ads: {r['ads']}  Concurrency: {args.concurrency}  Elapsed: {r['elapsed']:.2f}s")
+    print(f"Throughput: {r['throughput']:.1f} ads/s")
+    print(f"Latency mean {r['mean'] * 1000:.0f} ms  p50 {r['p50'] * 1000:.0f} ms  "
+          f"p95 {r['p95'] * 1000:.0f} ms  p99 {r['p99'] * 1000:.0f} ms")
+    print(f"Extractor: {r['extractor']}")
+    if server:
+        print(f"Stub: {stub_stats}")
+
+
+if __name__ == "__main__":
+    main()
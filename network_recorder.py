@@ -0,0 +1,245 @@
+"""
+Low-overhead network recorder for the production form filler
+
+Based on PageStateRecorder from test_2captcha_orbita.py, but meant for long
+sessions with the sync Playwright API:
+- Recent requests/responses/console messages live in a bounded ring buffer
+- Sampled entries are streamed to a gzip-compressed JSONL file
+- The full buffer is dumped to JSON only when an ad fails
+- Request bodies are recorded without secrets: password/token fields are
+  redacted and file uploads are reduced to their size and content type
+"""
+
+import os
+import re
+import gzip
+import json
+import random
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode
+
+POST_DATA_LIMIT = 500  # Characters of a request body kept in an entry
+SECRET_FIELD_RE = re.compile(r'password|_csrf|token|secret', re.IGNORECASE)
+SECRET_HEADERS = ("cookie", "authorization")
+TEXT_CONTENT_TYPES = ("text/", "application/x-www-form-urlencoded", "application/json", "application/xml")
+REDACTED = "***"
+
+
+def redact_fields(fields: List) -> List:
+    """(name, value) pairs with password/token values replaced"""
+    return [(name, REDACTED if SECRET_FIELD_RE.search(name) else value) for name, value in fields]
+
+
+def summarize_post_data(body: Optional[bytes], content_type: str = "") -> Optional[str]:
+    """Loggable form of a request body: redacted text, or just the size of uploads/binary data"""
+    if not body:
+        return None
+    content_type = (content_type or "").lower()
+    if content_type and not content_type.startswith(TEXT_CONTENT_TYPES):
+        # multipart/form-data carries the uploaded images - never decode it
+        return f"<{len(body)} bytes {content_type.split(';')[0]}>"
+
+    text = body.decode('utf-8', errors='replace')
+    if content_type.startswith("application/json"):
+        try:
+            data = json.loads(text)
+            if isinstance(data, dict):
+                text = json.dumps(dict(redact_fields(list(data.items()))), ensure_ascii=False)
+        except ValueError:
+            pass
+    elif "=" in text and not content_type.startswith(("text/", "application/xml")):
+        text = urlencode(redact_fields(parse_qsl(text, keep_blank_values=True)))
+    return text[:POST_DATA_LIMIT]
+
+
+class NetworkRecorder:
+    """Records page network activity into a ring buffer and a compressed JSONL stream"""
+
+    def __init__(self, session_name: str = "production_session", buffer_size: int = 500,
+                 sample_rate: float = 1.0, url_patterns: Optional[List[str]] = None,
+                 exclude_patterns: Optional[List[str]] = None, record_headers: bool = False,
+                 log_root: str = "debug_logs"):
+        self.session_name = session_name
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.log_dir = os.path.join(log_root, f"{session_name}_{self.timestamp}")
+        os.makedirs(self.log_dir, exist_ok=True)
+
+        self.buffer = deque(maxlen=buffer_size)
+        self.sample_rate = sample_rate
+        self.record_headers = record_headers
+        self.url_patterns = [re.compile(p) for p in (url_patterns or [])]
+        self.exclude_patterns = [re.compile(p) for p in (exclude_patterns or [])]
+        self.current_ad = None
+
+        self.stream_path = os.path.join(self.log_dir, "network.jsonl.gz")
+        self._stream = gzip.open(self.stream_path, "at", encoding="utf-8")
+        self._pages = []
+        self.stats = {'seen': 0, 'filtered': 0, 'buffered': 0, 'streamed': 0, 'dumps': 0}
+
+        print(f"📋 Network recorder streaming to: {self.stream_path}")
+
+    def attach(self, page):
+        """Start listening to events of a Playwright page"""
+        page.on("request", self._on_request)
+        page.on("response", self._on_response)
+        page.on("requestfailed", self._on_request_failed)
+        page.on("console", self._on_console)
+        self._pages.append(page)
+
+    def detach(self, page):
+        """Stop listening to events of a Playwright page"""
+        try:
+            page.remove_listener("request", self._on_request)
+            page.remove_listener("response", self._on_response)
+            page.remove_listener("requestfailed", self._on_request_failed)
+            page.remove_listener("console", self._on_console)
+        except Exception:
+            pass
+        if page in self._pages:
+            self._pages.remove(page)
+
+    def start_ad(self, ad_name: str):
+        """Tag all following entries with the ad being processed"""
+        self.current_ad = ad_name
+        self.buffer.clear()
+        self._record({"type": "ad_start"}, important=True)
+
+    def dump_failure(self, ad_name: Optional[str] = None, reason: str = "") -> Optional[str]:
+        """Promote the ring buffer to a full JSON dump for a failed ad"""
+        try:
+            ad_name = ad_name or self.current_ad or "unknown"
+            safe_name = re.sub(r'[^\w\-]+', '_', ad_name).strip('_') or "ad"
+            dump_path = os.path.join(
+                self.log_dir, f"failed_{safe_name}_{datetime.now().strftime('%H%M%S')}.json"
+            )
+
+            summary = {
+                "session_name": self.session_name,
+                "ad": ad_name,
+                "reason": reason,
+                "entries": len(self.buffer),
+                "all_entries": list(self.buffer)
+            }
+
+            with open(dump_path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+
+            self.stats['dumps'] += 1
+            print(f"💾 Network log for failed ad saved to: {dump_path}")
+            return dump_path
+
+        except Exception as e:
+            print(f"⚠️ Could not dump network log: {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get recorder counters"""
+        return dict(self.stats, buffer_size=len(self.buffer))
+
+    def close(self):
+        """Detach from pages and finish the compressed stream"""
+        for page in list(self._pages):
+            self.detach(page)
+        try:
+            if self._stream:
+                self._stream.close()
+                self._stream = None
+        except Exception as e:
+            print(f"⚠️ Error closing network recorder stream: {e}")
+
+    def _url_allowed(self, url: str) -> bool:
+        """Apply include/exclude URL filters"""
+        if self.url_patterns and not any(p.search(url) for p in self.url_patterns):
+            return False
+        if any(p.search(url) for p in self.exclude_patterns):
+            return False
+        return True
+
+    def _record(self, entry: Dict, important: bool = False):
+        """Add entry to the ring buffer and (sampled) to the JSONL stream"""
+        self.stats['seen'] += 1
+        entry["timestamp"] = datetime.now().isoformat()
+        entry["ad"] = self.current_ad
+
+        self.buffer.append(entry)
+        self.stats['buffered'] += 1
+
+        # Routine entries are sampled, anything unusual is always kept
+        if self._stream and (important or random.random() < self.sample_rate):
+            try:
+                self._stream.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.stats['streamed'] += 1
+                if self.stats['streamed'] % 100 == 0:
+                    self._stream.flush()
+            except Exception:
+                pass
+
+    def _on_request(self, request):
+        """Record outgoing requests"""
+        if not self._url_allowed(request.url):
+            self.stats['filtered'] += 1
+            return
+
+        entry = {
+            "type": "request",
+            "url": request.url,
+            "method": request.method,
+            "resource_type": request.resource_type
+        }
+        if request.method != "GET":
+            try:
+                # post_data decodes strictly as UTF-8 and raises on uploads - use the raw buffer
+                post_data = summarize_post_data(request.post_data_buffer, request.headers.get("content-type", ""))
+            except Exception as e:
+                post_data = f"<unreadable body: {e}>"
+            if post_data:
+                entry["post_data"] = post_data
+        if self.record_headers:
+            entry["headers"] = {name: REDACTED if name.lower() in SECRET_HEADERS else value
+                                for name, value in request.headers.items()}
+
+        self._record(entry, important=request.method != "GET")
+
+    def _on_response(self, response):
+        """Record responses"""
+        if not self._url_allowed(response.url):
+            self.stats['filtered'] += 1
+            return
+
+        entry = {
+            "type": "response",
+            "url": response.url,
+            "status": response.status
+        }
+        if response.status >= 300:
+            entry["location"] = response.headers.get("location", "")
+        if self.record_headers:
+            entry["headers"] = dict(response.headers)
+
+        self._record(entry, important=response.status >= 300)
+
+    def _on_request_failed(self, request):
+        """Record failed requests"""
+        if not self._url_allowed(request.url):
+            self.stats['filtered'] += 1
+            return
+
+        self._record({
+            "type": "request_failed",
+            "url": request.url,
+            "method": request.method,
+            "failure": str(request.failure)
+        }, important=True)
+
+    def _on_console(self, msg):
+        """Record console errors and warnings"""
+        if msg.type not in ["error", "warning"]:
+            return
+
+        self._record({
+            "type": "console",
+            "level": msg.type,
+            "text": msg.text[:500]
+        }, important=msg.type == "error")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub server for offline extraction load tests
+
+Implements POST /v1/chat/completions with rule-based (or canned) answers
+in the same JSON format OpenAIExtractor expects, plus injectable latency,
+HTTP errors and malformed JSON. Repeated system prompts are reported as
+cached prompt tokens the way the real API does. GET /stats returns
+request counters.
+
+Usage:
+    python openai_stub_server.py --port 8089 --latency 0.3 --error-rate 0.1 --malformed-rate 0.05
+
+Then set in config.py:
+    OPENAI_BASE_URL = "http://127.0.0.1:8089/v1"
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class StubBehaviour:
+    """Response behaviour shared by all handler threads"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, malformed_rate: float = 0.0,
+                 canned_response: Optional[str] = None, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.malformed_rate = malformed_rate
+        self.canned_response = canned_response
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'malformed': 0,
+                      'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0}
+        self.seen_prefixes = set()
+
+    def count(self, key: str, value: int = 1):
+        with self.lock:
+            self.stats[key] += value
+
+    def cached_tokens(self, prefix: str) -> int:
+        """Mimic provider prompt caching: repeated prefixes of 1024+ tokens hit in 128-token blocks"""
+        prefix_tokens = len(prefix) // 4
+        with self.lock:
+            seen = prefix in self.seen_prefixes
+            self.seen_prefixes.add(prefix)
+        if not seen or prefix_tokens < 1024:
+            return 0
+        return prefix_tokens // 128 * 128
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.random.random()
+
+    def delay(self) -> float:
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+
+def rule_based_parameters(ad_text: str) -> Dict[str, str]:
+    """Cheap deterministic extraction so responses look like the model's"""
+    parameters = {}
+
+    rooms = re.search(r'(\d+(?:[.,]5)?)\s*[-‑]?\s*(?:комн|к\b|room)', ad_text, re.IGNORECASE)
+    if rooms:
+        parameters['rooms'] = rooms.group(1).replace(',', '.')
+
+    floor = re.search(r'(\d+)\s*[-‑]?\s*(?:й\s*)?этаж', ad_text, re.IGNORECASE)
+    if floor:
+        parameters['floor'] = floor.group(1) if int(floor.group(1)) < 10 else "10+"
+
+    price = re.search(r'(\d{1,3}(?:[ ,.]\d{3}){2,})|(\d{7,})', ad_text)
+    if price:
+        parameters['price'] = re.sub(r'\D', '', price.group(0))
+
+    parameters['furniture'] = "да" if re.search(r'мебел|обставлен', ad_text, re.IGNORECASE) else "нет"
+
+    district = re.search(r'(?:район|ул\.|улица)\s+([А-ЯЁA-Z][\w\- ]{2,30}?)(?:[,.\n—]|$)', ad_text)
+    if district:
+        parameters['district'] = district.group(1).strip()
+
+    return parameters
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Minimal /v1/chat/completions implementation"""
+
+    behaviour = StubBehaviour()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.behaviour.stats)
+        elif self.path.rstrip('/') == '/v1/models':
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'gpt-4o-mini', 'object': 'model'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/v1/chat/completions':
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+
+        behaviour = self.behaviour
+        behaviour.count('requests')
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON body', 'type': 'invalid_request_error'}})
+            return
+
+        time.sleep(behaviour.delay())
+
+        if behaviour.roll() < behaviour.error_rate:
+            behaviour.count('errors')
+            self._send_json(behaviour.error_status, {
+                'error': {'message': 'Injected stub error', 'type': 'server_error', 'code': None}
+            })
+            return
+
+        messages = body.get('messages', [])
+        user_text = next((m.get('content', '') for m in reversed(messages) if m.get('role') == 'user'), '')
+        prompt_text = ' '.join(str(m.get('content', '')) for m in messages)
+        system_text = ''.join(str(m.get('content', '')) for m in messages if m.get('role') == 'system')
+        ad_text = user_text.split('Текст объявления:')[-1].strip()
+
+        if behaviour.roll() < behaviour.malformed_rate:
+            behaviour.count('malformed')
+            content = "Конечно! Вот параметры: {rooms: 3, price: '2 500 000'"
+        elif behaviour.canned_response is not None:
+            content = behaviour.canned_response
+        else:
+            parameters = rule_based_parameters(ad_text)
+            # "Нужны только поля: rooms, price" - answer only those, like the model is told to
+            fields_line = next((line for line in user_text.split('\n') if line.startswith('Нужны только поля:')), None)
+            if fields_line:
+                fields = [field.strip() for field in fields_line.split(':', 1)[1].split(',')]
+                parameters = {key: value for key, value in parameters.items() if key in fields}
+            content = json.dumps(parameters, ensure_ascii=False)
+
+        prompt_tokens = max(1, len(prompt_text) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        cached_tokens = behaviour.cached_tokens(system_text) if system_text else 0
+        behaviour.count('ok')
+        behaviour.count('cached_tokens', cached_tokens)
+        behaviour.count('prompt_tokens', prompt_tokens)
+        behaviour.count('completion_tokens', completion_tokens)
+
+        self._send_json(200, {
+            'id': f"chatcmpl-stub-{int(time.time() * 1000)}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'gpt-4o-mini'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+                'prompt_tokens_details': {'cached_tokens': cached_tokens}
+            }
+        })
+
+    def _send_json(self, status: int, payload: Dict):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 8089, **behaviour_options):
+    """Start the stub in a background thread. Returns (server, base_url)"""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {'behaviour': StubBehaviour(**behaviour_options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}/v1"
+    return server, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub for offline extraction tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds added to latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with an HTTP error")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status for injected errors (e.g. 429)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of answers that are not valid JSON")
+    parser.add_argument("--canned", help="File whose content is returned as the model answer")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    canned = None
+    if args.canned:
+        with open(args.canned, 'r', encoding='utf-8') as f:
+            canned = f.read()
+
+    server, base_url = start_stub_server(
+        args.host, args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status,
+        malformed_rate=args.malformed_rate, canned_response=canned, seed=args.seed
+    )
+    print(f"🤖 OpenAI stub listening on {base_url} (Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\n📊 Stub stats: {server.RequestHandlerClass.behaviour.stats}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
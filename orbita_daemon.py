@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Orbita Form Filler v2 - daemon mode
+
+Instead of a cron job starting OrbitaFormFillerV2 from scratch (Tor, Drive
+auth, browser, login, full folder walk), one long-running process keeps
+the Drive client, its caches and the browser warm and polls Drive:
+
+    every DAEMON_POLL_INTERVAL seconds: list ad folders -> sync new ones -> prepare
+    inside POSTING_WINDOWS:             post prepared ads
+
+The bundle store is the persistent work queue: new folders are synced into
+it (queued), prepared, and posted when a posting window is open, so
+nothing is lost between polls or restarts. Failed polls back off
+exponentially, polls without new ads stretch the interval (up to
+DAEMON_MAX_POLL_INTERVAL). SIGTERM / Ctrl+C stop after the current step.
+
+Usage:
+    python orbita_daemon.py
+    python orbita_daemon.py --interval 60
+    python orbita_daemon.py --once          # one poll (and posting window), then exit
+"""
+
+import signal
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import config
+from ad_bundle_store import PREPARED
+from drive_filters import FolderFilter, add_filter_arguments
+from orbita_form_filler_v2 import OrbitaFormFillerV2
+
+
+def parse_window(window: str) -> Tuple[int, int]:
+    """'HH:MM-HH:MM' -> (start, end) in minutes after midnight"""
+    start, end = window.split('-')
+    return tuple(int(part.split(':')[0]) * 60 + int(part.split(':')[1]) for part in (start, end))
+
+
+def in_posting_window(now: Optional[datetime] = None, windows: Optional[List[str]] = None) -> bool:
+    """True if now is inside one of the posting windows (always True without windows)"""
+    windows = config.POSTING_WINDOWS if windows is None else windows
+    if not windows:
+        return True
+
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    for start, end in map(parse_window, windows):
+        if start <= end and start <= minute < end:
+            return True
+        if start > end and (minute >= start or minute < end):  # Window across midnight
+            return True
+    return False
+
+
+def seconds_until_window(now: Optional[datetime] = None, windows: Optional[List[str]] = None) -> float:
+    """Seconds until the next posting window opens (0 inside a window)"""
+    windows = config.POSTING_WINDOWS if windows is None else windows
+    now = now or datetime.now()
+    if in_posting_window(now, windows):
+        return 0.0
+
+    seconds = now.hour * 3600 + now.minute * 60 + now.second
+    return float(min((start * 60 - seconds) % 86400 for start, _ in map(parse_window, windows)))
+
+
+class OrbitaDaemon:
+    """Polls Drive and posts within the posting windows, keeping everything warm between polls"""
+
+    def __init__(self, filler: Optional[OrbitaFormFillerV2] = None, poll_interval: Optional[float] = None):
+        self.filler = filler or OrbitaFormFillerV2()
+        self.poll_interval = poll_interval or config.DAEMON_POLL_INTERVAL
+        self.interval = self.poll_interval
+        self.failures = 0
+        self.logged_in = False
+        self.stop_event = threading.Event()
+        self.stats = {'polls': 0, 'failed_polls': 0, 'new_ads': 0, 'posted': 0, 'failed': 0}
+
+    def stop(self, *args):
+        print("\n🛑 Stopping after the current step...")
+        self.stop_event.set()
+
+    def run(self, once: bool = False) -> bool:
+        if not self.filler.initialize():
+            print("❌ Initialization failed")
+            return False
+
+        while not self.stop_event.is_set():
+            new_ads = self.poll()
+            if not self.stop_event.is_set() and in_posting_window():
+                self.post()
+            if once:
+                break
+
+            delay = self._next_delay(new_ads)
+            print(f"💤 Next poll in {delay:.0f}s")
+            self.stop_event.wait(delay)
+        return True
+
+    # ------------------------------------------------------------ polling
+
+    def poll(self) -> Optional[int]:
+        """Sync new folders and prepare them; returns the number of new ads, None if Drive failed
+
+        The first poll and every DAEMON_FULL_SYNC_EVERY-th one also re-check queued
+        folders for changes; the others only look at folders without a bundle.
+        """
+        filler = self.filler
+        self.stats['polls'] += 1
+        full_sync = (self.stats['polls'] - 1) % max(1, config.DAEMON_FULL_SYNC_EVERY) == 0
+        print(f"\n🔎 Poll {self.stats['polls']} at {datetime.now():%Y-%m-%d %H:%M:%S}"
+              f"{' (full sync)' if full_sync else ''}")
+
+        try:
+            folders = filler.retry_policy.run('sync', filler.drive_client.get_ad_folders, filler.folder_filter)
+        except Exception as e:
+            self.failures += 1
+            self.stats['failed_polls'] += 1
+            print(f"❌ Drive poll failed ({self.failures} in a row): {e}")
+            return None
+        self.failures = 0
+
+        processed = filler._load_processed_ads()
+        known = {meta['folder_id'] for meta in filler.bundle_store.list_bundles()}
+        pending = [folder for folder in folders
+                   if folder['id'] not in processed and (full_sync or folder['id'] not in known)]
+        new_ads = len([folder for folder in pending if folder['id'] not in known])
+        self.stats['new_ads'] += new_ads
+        print(f"📊 {len(folders)} folders, {new_ads} new")
+
+        if pending:
+            filler.sync_folders(pending)
+            filler.prepare_ads()
+        return new_ads
+
+    def _next_delay(self, new_ads: Optional[int]) -> float:
+        if new_ads is None:
+            # Drive is failing: back off exponentially
+            delay = self.poll_interval * 2 ** min(self.failures, 10)
+        else:
+            # New ads -> back to the base interval, idle polls -> stretch it
+            self.interval = self.poll_interval if new_ads else self.interval * config.DAEMON_IDLE_BACKOFF
+            delay = self.interval
+        delay = min(delay, config.DAEMON_MAX_POLL_INTERVAL)
+        self.interval = min(self.interval, config.DAEMON_MAX_POLL_INTERVAL)
+
+        # Prepared ads are waiting for a posting window: wake up when it opens
+        if self.filler.bundle_store.list_bundles(PREPARED):
+            until_window = seconds_until_window()
+            if until_window > 0:
+                delay = min(delay, until_window + 1)
+        return delay
+
+    # ------------------------------------------------------------ posting
+
+    def post(self):
+        """Post prepared ads while the window is open (the browser is started on first use)"""
+        if not self.filler.bundle_store.list_bundles(PREPARED):
+            return
+        if not self._ensure_session():
+            return
+
+        stats = self.filler.post_ads(
+            should_continue=lambda: not self.stop_event.is_set() and in_posting_window())
+        self.stats['posted'] += stats['processed']
+        self.stats['failed'] += stats['failed']
+        # post_ads logs out after posting - the next batch registers a fresh account
+        if config.LOGOUT_BETWEEN_ADS or stats['processed']:
+            self.logged_in = False
+
+    def _ensure_session(self) -> bool:
+        filler = self.filler
+        if not self._browser_alive():
+            started = filler._restart_browser() if filler.browser else filler.start_browser()
+            if not started:
+                print("❌ Browser start failed - posting postponed to the next poll")
+                return False
+            self.logged_in = False
+            # A browser that died may have left an ad half-submitted
+            filler.reconcile_submitting()
+
+        if not self.logged_in:
+            self.logged_in = filler.register_and_login()
+            if not self.logged_in:
+                print("❌ Registration/login failed - posting postponed to the next poll")
+        return self.logged_in
+
+    def _browser_alive(self) -> bool:
+        try:
+            return self.filler.page is not None and not self.filler.page.is_closed()
+        except Exception:
+            return False
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orbita Form Filler v2.0 - daemon mode")
+    parser.add_argument("--interval", type=float, default=None,
+                        help=f"Seconds between Drive polls (default {config.DAEMON_POLL_INTERVAL})")
+    parser.add_argument("--once", action="store_true", help="Poll (and post) once, then exit")
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🎯 ORBITA FORM FILLER V2.0 - DAEMON MODE")
+    print("=" * 60)
+    print(f"🔎 Polling every {args.interval or config.DAEMON_POLL_INTERVAL}s, "
+          f"posting windows: {', '.join(config.POSTING_WINDOWS) or 'any time'}")
+
+    daemon = OrbitaDaemon(poll_interval=args.interval)
+    # Relative times (e.g. --created-after 2d) slide with every poll
+    daemon.filler.folder_filter = FolderFilter.from_args(args)
+    signal.signal(signal.SIGTERM, daemon.stop)
+
+    try:
+        daemon.run(once=args.once)
+    except KeyboardInterrupt:
+        print("\n⚠️ Daemon interrupted by user")
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+    finally:
+        print("\n" + "=" * 60)
+        print(f"📊 DAEMON STATISTICS: {daemon.get_stats()}")
+        print(f"🔁 Retries: {daemon.filler.retry_policy.get_stats()}")
+        print("=" * 60)
+        daemon.filler.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,11 @@ import requests
 import sys
 import tarfile
 import urllib.request
+import argparse
+from drive_filters import FolderFilter, add_filter_arguments
+from drive_traversal import LevelTraversal, FOLDER_FIELDS
+from drive_transport import DriveTransport
+from rate_limiter import drive_rate_limiter
 
 # Import configuration
 try:
@@ -381,6 +386,9 @@ class AdLogger:
 class GoogleDriveClient:
     def __init__(self):
         self.service = None
+        self.transport = None  # Per-thread services for the parallel folder traversal
+        # Shared with v2 - the Drive quota is per user, including the concurrent traversal
+        self.rate_limiter = drive_rate_limiter()
         self.setup_drive_api()
     
     def setup_drive_api(self):
@@ -409,14 +417,40 @@ class GoogleDriveClient:
                 token.write(creds.to_json())
         
         self.service = build('drive', 'v3', credentials=creds)
+        self.transport = DriveTransport(creds, token_path='token.json')
         print("✅ Google Drive API connected successfully!")
 
-    def find_datetime_folders(self, parent_folder_name="ad"):
-        """Find folders with datetime format ad/YYYYMMDD/HHMM"""
+    def list_folders(self, query, order_by=None):
+        """files().list results over all pages (safe to call from worker threads)"""
+        # googleapiclient services are not thread-safe - each thread lists with its own
+        service = self.transport.service() if getattr(self, 'transport', None) else self.service
+        folders = []
+        page_token = None
+        while True:
+            params = {'q': query, 'fields': FOLDER_FIELDS, 'pageSize': 1000}
+            if order_by:
+                params['orderBy'] = order_by
+            if page_token:
+                params['pageToken'] = page_token
+            results = self.rate_limiter.call(service.files().list(**params).execute)
+            folders.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return folders
+
+    def find_datetime_folders(self, parent_folder_name="ad", folder_filter=None):
+        """Find folders with datetime format ad/YYYYMMDD/HHMM
+
+        Each level is listed with batched, concurrent queries (drive_traversal.py)
+        instead of one request per date folder. folder_filter (drive_filters.FolderFilter)
+        is pushed down into the queries: the date range selects YYYYMMDD folders,
+        created/modified times select HHMM folders, newest N lists the newest dates
+        first and stops early.
+        """
         try:
             # Search for the parent folder 'ad'
             parent_query = f"name='{parent_folder_name}' and mimeType='application/vnd.google-apps.folder'"
-            parent_results = self.service.files().list(q=parent_query).execute()
+            parent_results = self.rate_limiter.call(self.service.files().list(q=parent_query).execute)
             parent_folders = parent_results.get('files', [])
             
             if not parent_folders:
@@ -426,36 +460,46 @@ class GoogleDriveClient:
             
             parent_folder_id = parent_folders[0]['id']
             print(f"✅ Found parent folder: {parent_folder_name}")
+            if folder_filter:
+                print(f"🔎 Filter: {folder_filter.describe()}")
             
-            # Get all date folders in 'ad' directory (YYYYMMDD format)
-            query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder'"
-            results = self.service.files().list(q=query).execute()
-            date_folders = results.get('files', [])
-            
-            # Filter folders that match datetime pattern and get time subfolders
-            datetime_folders = []
             date_pattern = re.compile(r'^\d{8}$')  # YYYYMMDD format
+            time_pattern = re.compile(r'^\d{4}$')  # HHMM format
+            newest = folder_filter.newest if folder_filter else None
+            order_by = "name desc" if newest else None
+            
+            traversal = LevelTraversal(self.list_folders)
+            time_folders = traversal.walk([parent_folder_id], [
+                # Date folders in 'ad' directory (only the filtered date range)
+                {'query': folder_filter.query(times=False) if folder_filter else None,
+                 'order_by': order_by,
+                 'keep': lambda f: date_pattern.match(f['name']) and (not folder_filter or folder_filter.matches(f))},
+                # Time subfolders of all date folders - newest dates first when only the newest N are wanted
+                {'query': folder_filter.query(names=False) if folder_filter else None,
+                 'order_by': order_by,
+                 'keep': lambda f: time_pattern.match(f['name']),
+                 'enough': (lambda found: len(found) >= newest) if newest else None}
+            ])
             
-            for date_folder in date_folders:
-                if date_pattern.match(date_folder['name']):
-                    # Get time subfolders (HHMM format)
-                    time_query = f"'{date_folder['id']}' in parents and mimeType='application/vnd.google-apps.folder'"
-                    time_results = self.service.files().list(q=time_query).execute()
-                    time_folders = time_results.get('files', [])
-                    
-                    for time_folder in time_folders:
-                        if re.match(r'^\d{4}$', time_folder['name']):  # HHMM format
-                            full_path = f"{parent_folder_name}/{date_folder['name']}/{time_folder['name']}"
-                            datetime_folders.append({
-                                'name': full_path,
-                                'id': time_folder['id'],
-                                'date': date_folder['name'],
-                                'time': time_folder['name'],
-                                'path': full_path
-                            })
-            
-            print(f"✅ Found {len(datetime_folders)} datetime folders in '{parent_folder_name}'")
-            return sorted(datetime_folders, key=lambda x: x['name'])
+            datetime_folders = []
+            for time_folder in time_folders:
+                date_name, time_name = time_folder['path']
+                full_path = f"{parent_folder_name}/{date_name}/{time_name}"
+                datetime_folders.append({
+                    'name': full_path,
+                    'id': time_folder['id'],
+                    'date': date_name,
+                    'time': time_name,
+                    'path': full_path
+                })
+            
+            datetime_folders = sorted(datetime_folders, key=lambda x: x['name'])
+            if newest:
+                datetime_folders = datetime_folders[-newest:]
+            stats = traversal.get_stats()
+            print(f"✅ Found {len(datetime_folders)} datetime folders in '{parent_folder_name}' "
+                  f"({stats['queries']} Drive queries in {stats['rounds']} rounds)")
+            return datetime_folders
             
         except Exception as e:
             print(f"❌ Error searching for folders: {e}")
@@ -465,7 +509,7 @@ class GoogleDriveClient:
         """Get contents of a specific folder"""
         try:
             query = f"'{folder_id}' in parents"
-            results = self.service.files().list(q=query).execute()
+            results = self.rate_limiter.call(self.service.files().list(q=query).execute)
             files = results.get('files', [])
             
             ad_data = {
@@ -547,7 +591,7 @@ class GoogleDriveClient:
             downloader = MediaIoBaseDownload(file_io, request)
             done = False
             while done is False:
-                status, done = downloader.next_chunk()
+                status, done = self.rate_limiter.call(downloader.next_chunk)
             
             content = file_io.getvalue().decode('utf-8')
             return content
@@ -564,7 +608,7 @@ class GoogleDriveClient:
                 downloader = MediaIoBaseDownload(f, request)
                 done = False
                 while done is False:
-                    status, done = downloader.next_chunk()
+                    status, done = self.rate_limiter.call(downloader.next_chunk)
             return True
             
         except Exception as e:
@@ -1345,6 +1389,11 @@ def logout_orbita(page):
 
 def main():
     """Main function - PRODUCTION MODE with live website"""
+    parser = argparse.ArgumentParser(description="Orbita Form Filler - production mode (ad/YYYYMMDD/HHMM folders)")
+    add_filter_arguments(parser, date_names=True)
+    args = parser.parse_args()
+    folder_filter = FolderFilter.from_args(args)
+
     print("🚀 ORBITA FORM FILLER - PRODUCTION MODE")
     print("=" * 50)
     print("⚠️  WILL SUBMIT TO LIVE WEBSITE!")
@@ -1388,7 +1437,7 @@ def main():
 
     # Get ad folders from Google Drive
     try:
-        ad_folders = drive_client.find_datetime_folders("ad")  # Use 'ad' folder
+        ad_folders = drive_client.find_datetime_folders("ad", folder_filter)  # Use 'ad' folder
         if not ad_folders:
             print("⚠️ No datetime folders found in 'ad' folder")
             print("📁 Please create folders in format: ad/YYYYMMDD/HHMM")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Orbita Form Filler v2 - asyncio orchestrator
+
+Runs the sync / prepare / post stages of OrbitaFormFillerV2 concurrently
+instead of one after another:
+
+    Drive (threads) ->  prepare queue  ->  extraction (AsyncOpenAI) + images (process pool)
+                                       ->  post queue  ->  browser (one thread)
+
+The queues are bounded (ASYNC_QUEUE_SIZE), so Drive and OpenAI stay a few
+ads ahead of the browser without downloading the whole folder tree first.
+Browser start and login overlap the first Drive downloads.
+
+The browser code is the same sync Playwright code as in v2; it runs in a
+dedicated thread because Playwright objects must be used from the thread
+that created them.
+
+Usage:
+    python orbita_form_filler_async.py
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+import config
+from ad_bundle_store import INVALID, POSTED_STATUSES, PREPARED, SUBMITTING
+from image_processing import process_image
+from orbita_form_filler_v2 import OpenAIExtractor, OrbitaFormFillerV2
+
+DONE = None  # Queue sentinel
+
+
+class AsyncOrbitaFormFiller:
+    """Overlaps Drive, extraction, image processing and the browser with asyncio"""
+
+    def __init__(self, filler: Optional[OrbitaFormFillerV2] = None, prepare_workers: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        self.filler = filler or OrbitaFormFillerV2()
+        self.prepare_workers = prepare_workers or config.PREPARE_WORKERS
+        self.queue_size = queue_size or config.ASYNC_QUEUE_SIZE
+        self.drive_executor = ThreadPoolExecutor(max_workers=config.DRIVE_WORKERS,
+                                                 thread_name_prefix="drive")
+        self.browser_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+        self.image_pool = ProcessPoolExecutor(max_workers=config.ASYNC_IMAGE_PROCESSES)
+        self.stats = {'synced': 0, 'unchanged': 0, 'prepared': 0, 'processed': 0, 'failed': 0,
+                      'skipped': 0, 'empty': 0, 'invalid': 0}
+        self.queued = set()     # Folder ids put on the post queue
+        self.requeued = []      # Folder ids reconcile_submitting() sent back to prepared
+
+    async def _drive(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.drive_executor, func, *args)
+
+    async def _browser(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.browser_executor, func, *args)
+
+    # ------------------------------------------------------------ pipeline
+
+    async def run(self) -> Dict[str, int]:
+        """Process all ads; returns the same counters as process_all_ads plus stage counts"""
+        prepare_queue = asyncio.Queue(maxsize=self.queue_size)
+        post_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        browser_ready = asyncio.ensure_future(self._start_browser())
+        producer = asyncio.ensure_future(self._produce(prepare_queue))
+        workers = [asyncio.ensure_future(self._prepare_worker(prepare_queue, post_queue))
+                   for _ in range(self.prepare_workers)]
+        poster = asyncio.ensure_future(self._post_worker(post_queue, browser_ready))
+
+        await producer
+        await asyncio.gather(*workers)
+        # _produce skipped these while they were still 'submitting'
+        if await browser_ready:
+            for folder_id in self.requeued:
+                meta = self.filler.bundle_store.load(folder_id)
+                if meta and meta.get('status') == PREPARED:
+                    await self._queue_post(post_queue, meta)
+        await post_queue.put(DONE)
+        await poster
+        return self.stats
+
+    async def _start_browser(self) -> bool:
+        try:
+            if not await self._browser(self.filler.start_browser):
+                print("❌ Browser start failed")
+                return False
+            store = self.filler.bundle_store
+            submitting = [meta['folder_id'] for meta in store.list_bundles(SUBMITTING)]
+            await self._browser(self.filler.reconcile_submitting)
+            self.requeued = [folder_id for folder_id in submitting
+                             if (store.load(folder_id) or {}).get('status') == PREPARED]
+            if not await self._browser(self.filler.register_and_login):
+                print("❌ Registration/login failed")
+                return False
+            return True
+        except Exception as e:
+            print(f"❌ Browser start failed: {e}")
+            return False
+
+    async def _produce(self, prepare_queue: asyncio.Queue):
+        """Sync Drive folders into the bundle store and queue them for prepare"""
+        try:
+            print("📁 Getting ad folders from Google Drive...")
+            ad_folders = await self._drive(self.filler.drive_client.get_ad_folders, self.filler.folder_filter)
+            processed_folders = self.filler._load_processed_ads()
+            print(f"📊 Found {len(ad_folders)} ad folders")
+
+            pending = [folder for folder in ad_folders if folder['id'] not in processed_folders]
+            self.stats['skipped'] += len(ad_folders) - len(pending)
+
+            # DRIVE_WORKERS folders in flight; a slot is held until the bundle is queued,
+            # so Drive never runs more than the queue size ahead of prepare
+            slots = asyncio.Semaphore(config.DRIVE_WORKERS)
+
+            async def sync_one(folder):
+                async with slots:
+                    try:
+                        print(f"\n📂 Syncing folder: {folder['name']}")
+                        result = await self._drive(self.filler._sync_folder, folder['id'], folder['name'])
+                        self.stats[result] += 1
+                        if result in ('synced', 'unchanged'):
+                            meta = self.filler.bundle_store.load(folder['id'])
+                            if meta and meta.get('status') not in (SUBMITTING,) + POSTED_STATUSES:
+                                await prepare_queue.put(meta)
+                    except Exception as e:
+                        print(f"❌ Error syncing {folder['name']}: {e}")
+                        self.stats['failed'] += 1
+
+            await asyncio.gather(*(sync_one(folder) for folder in pending))
+
+        except Exception as e:
+            print(f"❌ Error syncing ads: {e}")
+        finally:
+            for _ in range(self.prepare_workers):
+                await prepare_queue.put(DONE)
+
+    async def _prepare_worker(self, prepare_queue: asyncio.Queue, post_queue: asyncio.Queue):
+        while True:
+            meta = await prepare_queue.get()
+            if meta is DONE:
+                return
+
+            # Any error only fails this ad - a dead worker would leave the queues undrained
+            try:
+                result = await self._prepare(meta)
+                if result == 'prepared':
+                    self.stats['prepared'] += 1
+                elif result in ('invalid', 'failed'):
+                    self.stats[result] += 1
+
+                meta = self.filler.bundle_store.load(meta['folder_id'])
+                if meta and meta.get('status') == PREPARED:
+                    await self._queue_post(post_queue, meta)
+            except Exception as e:
+                print(f"❌ Error preparing {meta.get('folder_name', meta.get('folder_id'))}: {e}")
+                self.stats['failed'] += 1
+
+    async def _queue_post(self, post_queue: asyncio.Queue, meta: Dict):
+        if meta['folder_id'] not in self.queued:
+            self.queued.add(meta['folder_id'])
+            await post_queue.put(meta)
+
+    async def _prepare(self, meta: Dict) -> str:
+        """Async version of OrbitaFormFillerV2._prepare_bundle"""
+        filler = self.filler
+        try:
+            prepared_hash = filler._prepared_hash(meta)
+            if meta.get('status') in (PREPARED, INVALID) and meta.get('prepared_hash') == prepared_hash:
+                return 'unchanged'
+
+            ad_text, known_parameters = filler._read_bundle_input(meta['folder_id'])
+            parameters = filler.bundle_store.read_extracted(meta['folder_id'], prepared_hash)
+            if parameters is None:
+                parameters = await self._extract(ad_text, known_parameters)
+                filler.bundle_store.write_extracted(meta['folder_id'], parameters, prepared_hash)
+            parameters, errors, cleaned_text = filler._check_bundle_parameters(ad_text, parameters)
+
+            image_paths = []
+            if parameters is not None:
+                loop = asyncio.get_running_loop()
+                image_paths = await asyncio.gather(*(loop.run_in_executor(self.image_pool, process_image, *job)
+                                                     for job in filler._image_jobs(meta)))
+            return filler._store_prepared(meta, prepared_hash, cleaned_text, parameters, errors, image_paths)
+
+        except Exception as e:
+            return filler._prepare_failed(meta, e)
+
+    async def _extract(self, ad_text: str, known: Dict[str, str]) -> Dict[str, str]:
+        extractor = self.filler.extractor
+        if isinstance(extractor, OpenAIExtractor):
+            return await extractor.extract_parameters_async(ad_text, known=known)
+        # Local and hybrid backends are CPU-bound / sync - keep them off the event loop
+        return await asyncio.to_thread(extractor.extract_parameters, ad_text, known)
+
+    async def _post_worker(self, post_queue: asyncio.Queue, browser_ready: asyncio.Future):
+        """The single browser consumer"""
+        browser_ok = await browser_ready
+        posted = 0
+
+        while True:
+            meta = await post_queue.get()
+            if meta is DONE:
+                break
+            if not browser_ok:
+                continue  # Prepared bundles stay in the store for the next run
+
+            folder_name = meta.get('folder_name', meta['folder_id'])
+            # Any error only fails this ad - the queue must keep draining or the producers block on put()
+            try:
+                if posted:
+                    await self._browser(self.filler._wait_before_next_ad, posted)
+
+                print(f"\n📮 Posting: {folder_name}")
+                if self.filler.network_recorder:
+                    self.filler.network_recorder.start_ad(folder_name)
+                result = await self._browser(self.filler._post_bundle, meta)
+            except Exception as e:
+                print(f"❌ Error posting {folder_name}: {e}")
+                result = f"error: {e}"
+
+            if result == 'success':
+                posted += 1
+                self.stats['processed'] += 1
+                print(f"✅ Successfully processed: {folder_name}")
+            else:
+                self.stats['failed'] += 1
+                print(f"❌ Failed to process: {folder_name}")
+                if self.filler.network_recorder:
+                    self.filler.network_recorder.dump_failure(folder_name, reason=result)
+
+        if browser_ok and (config.LOGOUT_BETWEEN_ADS or posted):
+            try:
+                await self._browser(self.filler._logout)
+            except Exception as e:
+                print(f"⚠️ Logout failed: {e}")
+
+    def cleanup(self):
+        """Close the browser from its own thread, then the worker pools"""
+        try:
+            self.browser_executor.submit(self.filler.cleanup).result()
+        finally:
+            self.browser_executor.shutdown()
+            self.drive_executor.shutdown()
+            self.image_pool.shutdown()
+
+
+def main():
+    print("=" * 60)
+    print("🎯 ORBITA FORM FILLER V2.0 - ASYNC ORCHESTRATOR")
+    print("=" * 60)
+
+    orchestrator = AsyncOrbitaFormFiller()
+    filler = orchestrator.filler
+
+    try:
+        if not filler.initialize():
+            print("❌ Initialization failed")
+            return
+
+        stats = asyncio.run(orchestrator.run())
+
+        print("\n" + "=" * 60)
+        print("📊 FINAL STATISTICS")
+        print("=" * 60)
+        print(f"✅ Successfully processed: {stats['processed']}")
+        print(f"❌ Failed: {stats['failed']}")
+        print(f"⏭️ Skipped (already processed): {stats['skipped']}")
+        print(f"⚪ Skipped (empty documents): {stats['empty']}")
+        print(f"🚫 Skipped (invalid parameters): {stats['invalid']}")
+        print(f"📦 Synced {stats['synced']} ({stats['unchanged']} unchanged), prepared {stats['prepared']}")
+        print(f"📧 Account used: {filler.current_account_email}")
+        if filler.extractor:
+            print(f"🧮 Extractor ({filler.extractor.name}): {filler.extractor.get_stats()}")
+        print(f"🔁 Retries: {filler.retry_policy.get_stats()}")
+        if filler.drive_client:
+            print(f"🚦 Drive rate limiter: {filler.drive_client.rate_limiter.get_stats()}")
+        print("=" * 60)
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Process interrupted by user")
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+    finally:
+        orchestrator.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,36 +14,44 @@ Date: 2025
 
 import os
 import re
+import hashlib
 import time
 import random
+import shutil
 import string
 import tempfile
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import traceback
 import logging
-
-# Core dependencies
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-import openai
-
-# Third-party services
-from twocaptcha import TwoCaptcha
-
-# Tor integration
+import threading
 import subprocess
-import socket
-import requests
-import psutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+# Heavy dependencies (playwright, Google API client, openai, 2captcha,
+# requests) are imported inside the subsystem that uses them so that
+# status runs, benchmarks and test scripts start without loading them.
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
 
 # Configuration
 import config
+from network_recorder import NetworkRecorder
+from har_replay import HarReplay
+from text_cleaner import clean_ad_text
+from circuit_breaker import CircuitBreaker
+from gazetteer import find_address, format_address, normalize_address
+from form_catalogue import load_catalogue
+from ad_bundle_store import (AdBundleStore, drive_listing_hash, EMPTY, FAILED, INVALID, POSTED_STATUSES, PREPARED,
+                             SUBMITTED, SUBMITTING, SYNCED, VERIFIED)
+from image_processing import process_image
+from drive_transport import DriveTransport
+from rate_limiter import drive_rate_limiter
+from drive_filters import FolderFilter, add_filter_arguments
+from retry_policy import RetryPolicy, StageError, classify_error, BROWSER, NETWORK, SESSION, VALIDATION
+from extractors import PARAMETER_FIELDS, BaseExtractor, LocalRulesExtractor, HybridExtractor
 
 class TorIPChanger:
     """Tor IP changing functionality integrated for ad posting automation - Based on proven original implementation"""
@@ -251,6 +259,8 @@ class TorIPChanger:
             "https://ipinfo.io/json"
         ]
         
+        import requests
+        
         for attempt in range(max_retries):
             for service_url in ip_services:
                 try:
@@ -322,56 +332,76 @@ class TorIPChanger:
             print(f"❌ Error configuring browser proxy: {e}")
             return None
 
-class OpenAIExtractor:
-    """OpenAI integration for extracting parameters from ad text"""
+# params.txt labels (lowercase, without trailing colon) -> parameter field
+PARAMS_FILE_LABELS = {
+    'адрес': 'district', 'район': 'district', 'улица': 'district', 'address': 'district', 'district': 'district',
+    'комнаты': 'rooms', 'комнат': 'rooms', 'кол-во комнат': 'rooms', 'rooms': 'rooms',
+    'этаж': 'floor', 'floor': 'floor',
+    'мебель': 'furniture', 'furniture': 'furniture',
+    'цена': 'price', 'стоимость': 'price', 'price': 'price',
+}
+PARAMS_LABEL_LINE_RE = re.compile(r'^\s*([^:=]+?)\s*(?:[:=]|\s[-–—](?=\s|$))\s*(.*)$')
+CITY_PREFIX_RE = re.compile(r'^\s*ришон[\s-]*ле[\s-]*цион\w*\s*[,.]?\s*', re.IGNORECASE)
+
+def normalize_params_value(field: str, value: str) -> str:
+    """Bring a params.txt value to the format extract_parameters returns"""
+    value = value.strip()
+    if field == 'rooms':
+        return value.replace(',', '.')
+    if field == 'price':
+        return re.sub(r'\D', '', value)
+    if field == 'furniture':
+        return 'да' if value.lower().startswith(('да', 'yes', 'есть', '+')) else 'нет'
+    if field == 'district':
+        return CITY_PREFIX_RE.sub('', value).strip() or value
+    return value
+
+def parse_params_text(params_content: str) -> Dict[str, str]:
+    """Parse params.txt content into normalized parameters (label-keyed, positional fallback)"""
+    details = {}
+    lines = [line.strip() for line in params_content.replace('\ufeff', '').splitlines() if line.strip()]
+    pending_field = None
     
-    def __init__(self):
-        if not config.OPENAI_API_KEY or config.OPENAI_API_KEY == "your_openai_api_key_here":
-            raise ValueError("❌ OpenAI API key not configured in config.py")
+    for line in lines:
+        label = line.rstrip(':').strip().lower()
+        if label in PARAMS_FILE_LABELS:
+            # Value is on the next line
+            pending_field = PARAMS_FILE_LABELS[label]
+            continue
         
-        # Clear any proxy environment variables that might interfere with OpenAI client
-        env_vars_to_clear = ['HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY', 'http_proxy', 'https_proxy', 'all_proxy']
-        self.original_env = {}
-        
-        for var in env_vars_to_clear:
-            if var in os.environ:
-                self.original_env[var] = os.environ[var]
-                del os.environ[var]
+        match = PARAMS_LABEL_LINE_RE.match(line)
+        if match and match.group(1).strip().lower() in PARAMS_FILE_LABELS:
+            field = PARAMS_FILE_LABELS[match.group(1).strip().lower()]
+            if match.group(2).strip():
+                details.setdefault(field, match.group(2))
+                pending_field = None
+            else:
+                pending_field = field
+            continue
         
-        try:
-            # Create OpenAI client without proxy configuration
-            self.client = openai.OpenAI(
-                api_key=config.OPENAI_API_KEY,
-                timeout=30.0
-            )
-        finally:
-            # Restore original environment variables
-            for var, value in self.original_env.items():
-                os.environ[var] = value
+        if pending_field:
+            details.setdefault(pending_field, line)
+            pending_field = None
     
-    def extract_parameters(self, ad_text: str) -> Dict[str, str]:
-        """Extract apartment parameters and clean ad text using GPT-4o mini"""
-        
-        prompt = """
-Ты эксперт по анализу объявлений о продаже квартир в Израиле, особенно в городе Ришон-ле-Цион. 
-
-Выполни ДВЕ задачи:
+    # Old positional format without labels (line 2/4/6/8/10)
+    if not details and len(lines) >= 2:
+        positional = ['district', 'rooms', 'floor', 'furniture', 'price']
+        raw = params_content.strip().split('\n')
+        for index, field in enumerate(positional):
+            if len(raw) > index * 2 + 1 and raw[index * 2 + 1].strip():
+                details[field] = raw[index * 2 + 1]
+    
+    details = {field: normalize_params_value(field, value) for field, value in details.items()}
+    return {field: value for field, value in details.items() if value}
 
-ЗАДАЧА 1: ОЧИСТКА ТЕКСТА
-Очисти текст объявления следуя этим правилам:
-1. Полностью удали все эмодзи и иконки (📐, 🌞, 💰, 🏠, ✨, ⭐, и т.д.)
-2. Замени все специальные символы на текстовые эквиваленты:
-   * `~` заменить на "около"
-   * `м²` заменить на "кв. м"
-   * `₪` заменить на "шекелей"
-   * `$` заменить на "долларов"
-   * `€` заменить на "евро"
-3. Если в тексте есть слова на иврите, транслитерируй их на русский/кириллицу
-4. Сохрани основной смысл и структуру объявления
-5. Убери лишние символы и знаки, но сохрани читаемость
+# Static instruction block sent as the system message. Keep it byte-identical
+# between calls so the provider can serve it from the prompt cache; bump the
+# version whenever the text changes.
+EXTRACTION_PROMPT_VERSION = "params-v3"
+EXTRACTION_SYSTEM_PROMPT = f"""[prompt {EXTRACTION_PROMPT_VERSION}]
+Ты эксперт по анализу объявлений о продаже квартир в Израиле, особенно в городе Ришон-ле-Цион. 
 
-ЗАДАЧА 2: ИЗВЛЕЧЕНИЕ ПАРАМЕТРОВ  
-Проанализируй текст объявления и извлеки параметры:
+Пользователь присылает текст объявления. Проанализируй его и извлеки параметры:
 
 1. "rooms" - количество комнат (например: "3", "4", "5", "2.5", "4.5")
 2. "floor" - этаж (например: "2", "5", "10", "высокий этаж" -> "10+")  
@@ -383,66 +413,313 @@ class OpenAIExtractor:
    - Ключевые слова: "ул.", "улица", "район", "квартал", любые названия на иврите или русском связанные с Ришон-ле-Ционом
 
 Если параметр не найден, не включай его в ответ.
+Если в сообщении есть строка "Нужны только поля: ...", извлеки и верни только перечисленные поля.
+Текст может быть сокращён: строки без параметров удалены и заменены на "...".
 
 ФОРМАТ ОТВЕТА:
-Верни JSON со следующей структурой:
-{
-  "cleaned_text": "очищенный текст объявления",
-  "parameters": {
-    "rooms": "3",
-    "floor": "5",
-    "furniture": "да",
-    "price": "2500000",
-    "district": "ЦЕНТР"
-  }
-}
-
-Текст объявления:
+Верни только JSON с параметрами, без текста объявления:
+{{
+  "rooms": "3",
+  "floor": "5",
+  "furniture": "да",
+  "price": "2500000",
+  "district": "ЦЕНТР"
+}}
 """
+
+# Prefix of the user message when only some fields are asked for (the rest came from params.txt)
+FIELDS_REQUEST_PREFIX = "Нужны только поля: "
+
+# Lines worth keeping when a long ad has to be truncated
+PARAMETER_LINE_RE = re.compile(
+    r'\d|комнат|этаж|мебел|обставлен|цен[аы]|шекел|район|ул\.|улиц|квартал|адрес',
+    re.IGNORECASE
+)
+
+def truncate_ad_text(text: str, max_chars: int) -> str:
+    """Shorten a long ad: keep the opening lines, then only lines that look like parameters"""
+    if not max_chars or len(text) <= max_chars:
+        return text
+    
+    lines = [line for line in text.split('\n') if line.strip()]
+    kept = []
+    used = 0
+    head_budget = max_chars // 2
+    
+    # Opening lines usually carry type, rooms and address
+    index = 0
+    while index < len(lines) and used + len(lines[index]) + 1 <= head_budget:
+        kept.append(lines[index])
+        used += len(lines[index]) + 1
+        index += 1
+    if index == 0 and lines:
+        kept.append(lines[0][:head_budget])
+        used = len(kept[0]) + 1
+        index = 1
+    
+    # Remaining budget goes to lines with numbers or parameter keywords
+    skipped = False
+    for line in lines[index:]:
+        if PARAMETER_LINE_RE.search(line) and used + len(line) + 1 <= max_chars - 4:
+            if skipped:
+                kept.append("...")
+                used += 4
+                skipped = False
+            kept.append(line)
+            used += len(line) + 1
+        else:
+            skipped = True
+    
+    if skipped:
+        kept.append("...")
+    
+    return '\n'.join(kept)[:max_chars]
+
+class OpenAIExtractor(BaseExtractor):
+    """OpenAI integration for extracting parameters from ad text"""
+    
+    name = "openai"
+    
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = base_url or config.OPENAI_BASE_URL
+        self.stats = {'api_calls': 0, 'api_errors': 0, 'invalid_json': 0, 'fallbacks': 0,
+                      'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0, 'cached_tokens': 0,
+                      'truncated': 0, 'budget_skips': 0, 'breaker_skips': 0, 'params_file_only': 0,
+                      'partial_requests': 0,
+                      'prompt_version': EXTRACTION_PROMPT_VERSION}
+        self._stats_lock = threading.Lock()
+        self.breaker = CircuitBreaker(
+            "OpenAI",
+            failure_threshold=config.OPENAI_BREAKER_FAILURES,
+            window=config.OPENAI_BREAKER_WINDOW,
+            slow_call_seconds=config.OPENAI_BREAKER_SLOW_SECONDS,
+            cooldown=config.OPENAI_BREAKER_COOLDOWN
+        )
+        self.api_key = config.OPENAI_API_KEY
+        
+        if not self.api_key or self.api_key == "your_openai_api_key_here":
+            if not self.base_url:
+                raise ValueError("❌ OpenAI API key not configured in config.py")
+            # Local OpenAI-compatible servers (e.g. openai_stub_server.py) accept any key
+            self.api_key = "local-stub-key"
+        
+        self.client = self._create_client("OpenAI")
+        self.async_client = None  # AsyncOpenAI, created on first extract_parameters_async()
+        if self.base_url:
+            print(f"🤖 Using OpenAI-compatible endpoint: {self.base_url}")
+    
+    def _create_client(self, client_class: str):
+        """Create openai.OpenAI / openai.AsyncOpenAI without proxy configuration"""
+        # Clear any proxy environment variables that might interfere with OpenAI client
+        env_vars_to_clear = ['HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY', 'http_proxy', 'https_proxy', 'all_proxy']
+        original_env = {}
+        
+        for var in env_vars_to_clear:
+            if var in os.environ:
+                original_env[var] = os.environ[var]
+                del os.environ[var]
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Using available model
-                messages=[
-                    {"role": "system", "content": "You are an expert at extracting apartment parameters and cleaning Russian real estate ads."},
-                    {"role": "user", "content": f"{prompt}\n\n{ad_text}"}
-                ],
-                max_tokens=1000,  # Increased for cleaned text
-                temperature=0.1
-            )
-            
-            content = response.choices[0].message.content.strip()
+            import openai
             
-            # Try to parse JSON response
-            import json
+            return getattr(openai, client_class)(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=config.OPENAI_TIMEOUT,
+                max_retries=config.OPENAI_MAX_RETRIES
+            )
+        finally:
+            # Restore original environment variables
+            for var, value in original_env.items():
+                os.environ[var] = value
+    
+    def extract_parameters(self, ad_text: str, known: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Extract apartment parameters using GPT-4o mini (text is cleaned locally).
+        
+        Values in `known` (from params.txt) take precedence; the API is only
+        called when some fields are missing, and is asked for those fields only.
+        """
+        known = known or {}
+        if self._all_known(ad_text, known):
+            result = dict(known)
+            result["cleaned_text"] = clean_ad_text(ad_text)
+            return result
+        
+        result = self._extract_with_api(ad_text, self._missing_fields(known))
+        result.update({field: value for field, value in known.items() if value})
+        return result
+    
+    async def extract_parameters_async(self, ad_text: str, known: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """extract_parameters() on AsyncOpenAI, for the asyncio orchestrator"""
+        known = known or {}
+        if self._all_known(ad_text, known):
+            result = dict(known)
+            result["cleaned_text"] = clean_ad_text(ad_text)
+            return result
+        
+        fields = self._missing_fields(known)
+        cleaned_text, request = self._begin_api_call(ad_text, fields)
+        if request is None:
+            result = self._local_result(ad_text, cleaned_text)
+        else:
+            if self.async_client is None:
+                self.async_client = self._create_client("AsyncOpenAI")
             try:
-                result = json.loads(content)
-                
-                # Extract cleaned text and parameters
-                cleaned_text = result.get("cleaned_text", ad_text)
-                parameters = result.get("parameters", {})
-                
-                # Add cleaned text to parameters for form filling
-                parameters["cleaned_text"] = cleaned_text
-                
-                print(f"✅ Extracted parameters: {parameters}")
-                print(f"✅ Cleaned text: {cleaned_text[:100]}...")
-                return parameters
-                
-            except json.JSONDecodeError:
-                # If not valid JSON, try to extract manually
-                print(f"⚠️ Could not parse JSON, using fallback extraction")
-                fallback_result = self._fallback_extraction(ad_text)
-                # Add original text as cleaned text for fallback
-                fallback_result["cleaned_text"] = ad_text
-                return fallback_result
-                
+                self._count('api_calls')
+                started = time.perf_counter()
+                response = await self.async_client.chat.completions.create(**request)
+                self.breaker.record_success(time.perf_counter() - started)
+                result = self._parse_response(response, ad_text, cleaned_text, fields)
+            except Exception as e:
+                result = self._api_failed(e, ad_text, cleaned_text)
+        
+        result.update({field: value for field, value in known.items() if value})
+        return result
+    
+    @staticmethod
+    def _missing_fields(known: Dict[str, str]) -> List[str]:
+        return [field for field in PARAMETER_FIELDS if not known.get(field)]
+    
+    def _all_known(self, ad_text: str, known: Dict[str, str]) -> bool:
+        """True if params.txt supplied every field (no API call needed)"""
+        missing = self._missing_fields(known)
+        if not missing:
+            print("📋 All parameters known (params.txt or local rules), skipping OpenAI")
+            self._count('params_file_only')
+            return True
+        if known:
+            print(f"📋 Known parameters: {known}, asking OpenAI for: {', '.join(missing)}")
+        return False
+    
+    def _extract_with_api(self, ad_text: str, fields: Optional[List[str]] = None) -> Dict[str, str]:
+        """Extract the given parameters (default: all) with the API (local fallback on failure)"""
+        cleaned_text, request = self._begin_api_call(ad_text, fields)
+        if request is None:
+            return self._local_result(ad_text, cleaned_text)
+        
+        try:
+            self._count('api_calls')
+            started = time.perf_counter()
+            response = self.client.chat.completions.create(**request)
+            self.breaker.record_success(time.perf_counter() - started)
+            return self._parse_response(response, ad_text, cleaned_text, fields)
         except Exception as e:
-            print(f"❌ OpenAI extraction failed: {e}")
-            fallback_result = self._fallback_extraction(ad_text)
-            # Add original text as cleaned text for fallback
-            fallback_result["cleaned_text"] = ad_text
-            return fallback_result
+            return self._api_failed(e, ad_text, cleaned_text)
+    
+    def _begin_api_call(self, ad_text: str, fields: Optional[List[str]] = None) -> Tuple[str, Optional[Dict]]:
+        """Return (cleaned text, chat completion request), request None = use local extraction
+        
+        fields limits the request to some parameters (shorter answer, fewer completion tokens).
+        """
+        cleaned_text = clean_ad_text(ad_text)
+        
+        if self.budget_exhausted():
+            print(f"💸 Token budget ({config.OPENAI_RUN_TOKEN_BUDGET}) exhausted, using local extraction")
+            self._count('budget_skips')
+            return cleaned_text, None
+        
+        if not self.breaker.allow_request():
+            print("🔌 OpenAI circuit open, using local extraction")
+            self._count('breaker_skips')
+            return cleaned_text, None
+        
+        ad_input = truncate_ad_text(cleaned_text, config.OPENAI_MAX_AD_CHARS)
+        if len(ad_input) < len(cleaned_text):
+            print(f"✂️ Ad truncated for extraction: {len(cleaned_text)} -> {len(ad_input)} chars")
+            self._count('truncated')
+        
+        max_tokens = 200  # Parameters object only
+        if fields and len(fields) < len(PARAMETER_FIELDS):
+            # Only the missing fields - the system prompt stays identical, so it is still cached
+            ad_input = f"{FIELDS_REQUEST_PREFIX}{', '.join(fields)}\nТекст объявления:\n{ad_input}"
+            max_tokens = 40 * len(fields) + 20
+            self._count('partial_requests')
+        
+        # Static system prefix first (cacheable), variable ad text last
+        return cleaned_text, {
+            'model': "gpt-4o-mini",  # Using available model
+            'messages': [
+                {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                {"role": "user", "content": ad_input}
+            ],
+            'max_tokens': max_tokens,
+            'temperature': 0.1
+        }
+    
+    def _parse_response(self, response, ad_text: str, cleaned_text: str,
+                        fields: Optional[List[str]] = None) -> Dict[str, str]:
+        """Parameters from a chat completion (local fallback if it is not valid JSON)"""
+        self._record_usage(response)
+        content = response.choices[0].message.content.strip()
+        
+        # Try to parse JSON response
+        import json
+        try:
+            result = json.loads(content)
+        except json.JSONDecodeError:
+            # If not valid JSON, try to extract manually
+            print(f"⚠️ Could not parse JSON, using fallback extraction")
+            self._count('invalid_json')
+            return self._local_result(ad_text, cleaned_text)
+        
+        # Older prompt format wrapped the object in "parameters"
+        parameters = result.get("parameters", result) if isinstance(result, dict) else {}
+        parameters = {k: str(v) for k, v in parameters.items() if k != "cleaned_text" and v is not None}
+        if fields:
+            parameters = {k: v for k, v in parameters.items() if k in fields}
+        if parameters.get("district"):
+            parameters["district"] = normalize_address(parameters["district"])
+        
+        # Add locally cleaned text to parameters for form filling
+        parameters["cleaned_text"] = cleaned_text
+        
+        print(f"✅ Extracted parameters: {parameters}")
+        print(f"✅ Cleaned text: {cleaned_text[:100]}...")
+        return parameters
+    
+    def _api_failed(self, error: Exception, ad_text: str, cleaned_text: str) -> Dict[str, str]:
+        print(f"❌ OpenAI extraction failed: {error}")
+        self.breaker.record_failure(type(error).__name__)
+        self._count('api_errors')
+        return self._local_result(ad_text, cleaned_text)
+    
+    def _local_result(self, ad_text: str, cleaned_text: str) -> Dict[str, str]:
+        """Regex fallback extraction plus the cleaned text"""
+        self._count('fallbacks')
+        fallback_result = self._fallback_extraction(ad_text)
+        fallback_result["cleaned_text"] = cleaned_text
+        return fallback_result
+    
+    def get_stats(self) -> Dict:
+        """Extraction counters plus circuit breaker state"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['circuit'] = self.breaker.get_stats()
+        return stats
+    
+    def budget_exhausted(self) -> bool:
+        """True once this run has used its OpenAI token budget"""
+        budget = config.OPENAI_RUN_TOKEN_BUDGET
+        return bool(budget) and self.stats.get('total_tokens', 0) >= budget
+    
+    def _record_usage(self, response):
+        """Record token usage, including prompt tokens served from the provider cache"""
+        usage = getattr(response, 'usage', None)
+        if not usage:
+            return
+        
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = getattr(details, 'cached_tokens', 0) if details else 0
+        
+        self._count('prompt_tokens', getattr(usage, 'prompt_tokens', 0) or 0)
+        self._count('completion_tokens', getattr(usage, 'completion_tokens', 0) or 0)
+        self._count('total_tokens', getattr(usage, 'total_tokens', 0) or 0)
+        self._count('cached_tokens', cached or 0)
+    
+    def _count(self, key: str, value: int = 1):
+        """Thread-safe update of extraction counters"""
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + value
     
     def _fallback_extraction(self, ad_text: str) -> Dict[str, str]:
         """Fallback manual extraction if OpenAI fails"""
@@ -460,22 +737,10 @@ class OpenAIExtractor:
                 parameters['rooms'] = match.group(1)
                 break
         
-        # Extract district - expanded list with streets
-        districts = ['НАХЛАД ИУДА', 'РЕМЕЗ', 'НЕВЕ ДЕНЯ', 'КИРЬЯТ ГАОН', 'РАМАТ ЭЛИЯУ', 'ЦЕНТР', 'СТАРЫЙ ГОРОД']
-        streets = ['РОТШИЛЬД', 'ГЕРЦЛЬ', 'ЖАБОТИНСКИЙ', 'БЯЛИК', 'АХАД ХААМ', 'РОШ ПИНА', 'ВАЙЦМАН', 'БEN ГУРИОН', 'СОКОЛОВ']
-        
-        # Check districts first
-        for district in districts:
-            if district in ad_text.upper():
-                parameters['district'] = district
-                break
-        
-        # If no district found, check streets
-        if 'district' not in parameters:
-            for street in streets:
-                if street in ad_text.upper():
-                    parameters['district'] = f"ул. {street}"
-                    break
+        # Extract district (or street if no district is mentioned) via the gazetteer
+        address = find_address(ad_text)
+        if address:
+            parameters['district'] = format_address(address)
         
         # Extract price - improved to handle spaces and commas
         price_patterns = [
@@ -501,16 +766,54 @@ class OpenAIExtractor:
         print(f"✅ Fallback extracted: {parameters}")
         return parameters
 
+def create_extractor(backend: Optional[str] = None, base_url: Optional[str] = None) -> BaseExtractor:
+    """Build the parameter extractor selected by config.EXTRACTOR_BACKEND"""
+    backend = (backend or config.EXTRACTOR_BACKEND).lower()
+    
+    if backend == "local":
+        print("🧮 Using local rules extractor (no network)")
+        return LocalRulesExtractor()
+    if backend == "hybrid":
+        print(f"🧮 Using hybrid extractor (OpenAI below confidence {config.EXTRACTOR_MIN_CONFIDENCE})")
+        return HybridExtractor(OpenAIExtractor(base_url=base_url), min_confidence=config.EXTRACTOR_MIN_CONFIDENCE)
+    if backend != "openai":
+        raise ValueError(f"❌ Unknown EXTRACTOR_BACKEND: {backend}")
+    return OpenAIExtractor(base_url=base_url)
+
 class GoogleDriveClient:
     """Enhanced Google Drive client for new folder structure"""
     
-    def __init__(self):
-        self.service = None
+    def __init__(self, service=None, rate_limiter=None, raise_errors: bool = False):
+        # A prebuilt service (e.g. fake_drive.FakeDriveService) skips OAuth entirely
+        self.transport = DriveTransport.shared(service) if service is not None else None
+        # Every request goes through the (process-wide) quota-aware limiter
+        self.rate_limiter = rate_limiter or drive_rate_limiter()
+        # Re-raise download/listing errors instead of returning empty results (for callers that retry)
+        self.raise_errors = raise_errors
         self.credentials = None
+        self._folder_id_cache = {}
+        self._pool = None
+        self._worker = threading.local()
+    
+    @property
+    def service(self):
+        """Drive service of the calling thread (googleapiclient services are not thread-safe)"""
+        return self.transport.service() if self.transport else None
+    
+    @service.setter
+    def service(self, service):
+        self.transport = DriveTransport.shared(service) if service is not None else None
         
     def authenticate(self):
         """Authenticate with Google Drive API"""
+        if self.transport is not None and self.credentials is None:
+            print("✅ Using preconfigured Google Drive service")
+            return True
+        
         try:
+            from google.oauth2.credentials import Credentials
+            from google_auth_oauthlib.flow import Flow
+            from google.auth.transport.requests import Request
             creds = None
             
             # Load existing token
@@ -540,7 +843,9 @@ class GoogleDriveClient:
                     token.write(creds.to_json())
             
             self.credentials = creds
-            self.service = build('drive', 'v3', credentials=creds)
+            # One service per thread (built from the packaged discovery document)
+            self.transport = DriveTransport(credentials=creds, token_path='token.json')
+            self.transport.service()
             print("✅ Google Drive authenticated successfully")
             return True
             
@@ -548,6 +853,76 @@ class GoogleDriveClient:
             print(f"❌ Google Drive authentication failed: {e}")
             return False
     
+    def map_parallel(self, func, items: List, workers: Optional[int] = None) -> List:
+        """func over items on DRIVE_WORKERS threads, results in order (nested calls run inline)"""
+        workers = workers or config.DRIVE_WORKERS
+        if workers <= 1 or len(items) <= 1 or getattr(self._worker, 'active', False):
+            return [func(item) for item in items]
+        
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drive",
+                                            initializer=self._mark_worker)
+        return list(self._pool.map(func, items))
+    
+    def _mark_worker(self):
+        self._worker.active = True
+    
+    def get_folder_contents_many(self, folder_ids: List[str], workers: Optional[int] = None) -> List[Dict]:
+        """get_folder_contents for many folders in parallel"""
+        return self.map_parallel(self.get_folder_contents, folder_ids, workers)
+    
+    def download_images(self, images: List[Dict], target_dir: Optional[str] = None,
+                        workers: Optional[int] = None) -> List[Optional[str]]:
+        """Download images in parallel (paths in the same order, None for dropped images)"""
+        return self.map_parallel(lambda image: self.download_image(image['id'], image['name'], target_dir),
+                                 images, workers)
+    
+    def _execute(self, request) -> Dict:
+        """Execute a Drive API request within the rate limit (quota errors are retried)"""
+        return self.rate_limiter.call(request.execute)
+    
+    def _download_media(self, request):
+        """Download a get_media/export_media request into a BytesIO (every chunk rate limited)"""
+        import io
+        from googleapiclient.http import MediaIoBaseDownload
+        fh = io.BytesIO()
+        downloader = MediaIoBaseDownload(fh, request)
+        
+        done = False
+        while done is False:
+            status, done = self.rate_limiter.call(downloader.next_chunk)
+        
+        fh.seek(0)
+        return fh
+    
+    def close(self):
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def _list_all_files(self, query: str, fields: str = "nextPageToken, files(id, name, mimeType)",
+                        page_size: int = 1000, order_by: Optional[str] = None,
+                        limit: Optional[int] = None) -> List[Dict]:
+        """Run a files().list query and follow nextPageToken until all pages (or limit files) are read"""
+        files = []
+        page_token = None
+        if limit:
+            page_size = min(page_size, limit)
+        
+        while True:
+            params = {'q': query, 'fields': fields, 'pageSize': page_size}
+            if page_token:
+                params['pageToken'] = page_token
+            if order_by:
+                params['orderBy'] = order_by
+            
+            results = self._execute(self.service.files().list(**params))
+            files.extend(results.get('files', []))
+            
+            page_token = results.get('nextPageToken')
+            if not page_token or (limit and len(files) >= limit):
+                return files[:limit] if limit else files
+    
     def find_folder_by_path(self, path: str) -> Optional[str]:
         """Find folder ID by path in user's Drive"""
         try:
@@ -557,18 +932,25 @@ class GoogleDriveClient:
             current_folder_id = 'root'
             
             for part in path_parts:
+                # Path lookups are cached for the lifetime of the client
+                cache_key = (current_folder_id, part)
+                if cache_key in self._folder_id_cache:
+                    current_folder_id = self._folder_id_cache[cache_key]
+                    continue
+                
                 print(f"🔍 Searching for folder: '{part}' in parent: {current_folder_id}")
                 
                 # Simple search in current parent
                 query = f"name='{part}' and parents in '{current_folder_id}' and mimeType='application/vnd.google-apps.folder'"
-                results = self.service.files().list(
+                results = self._execute(self.service.files().list(
                     q=query, 
                     fields="files(id, name)"
-                ).execute()
+                ))
                 folders = results.get('files', [])
                 
                 if folders:
                     current_folder_id = folders[0]['id']
+                    self._folder_id_cache[cache_key] = current_folder_id
                     print(f"   ✅ Found: {part}")
                     print(f"   📂 Moving to folder ID: {current_folder_id}")
                 else:
@@ -580,42 +962,53 @@ class GoogleDriveClient:
             
         except Exception as e:
             print(f"❌ Error finding folder by path: {e}")
+            if self.raise_errors:
+                raise
             return None
     
-    def get_ad_folders(self) -> List[Dict]:
-        """Get all ad folders from the specified path"""
+    def get_ad_folders(self, folder_filter: Optional[FolderFilter] = None) -> List[Dict]:
+        """Get all ad folders from the specified path (only those matching folder_filter if given)"""
         try:
             parent_folder_id = self.find_folder_by_path(config.GOOGLE_DRIVE_PATH)
             if not parent_folder_id:
                 return []
             
-            # Get all subfolders in the ПРОДАЖА folder
+            # Get all subfolders in the ПРОДАЖА folder (all pages)
             query = f"parents in '{parent_folder_id}' and mimeType='application/vnd.google-apps.folder'"
-            results = self.service.files().list(q=query).execute()
-            
-            folders = results.get('files', [])
-            print(f"✅ Found {len(folders)} ad folders")
+            if not folder_filter:
+                folders = self._list_all_files(query)
+            else:
+                # The filter goes into the query - old folders are never listed
+                folders = self._list_all_files(folder_filter.apply(query), order_by=folder_filter.order_by(),
+                                               limit=folder_filter.newest)
+                folders = [folder for folder in folders if folder_filter.matches(folder)]
+            print(f"✅ Found {len(folders)} ad folders" +
+                  (f" ({folder_filter.describe()})" if folder_filter else ""))
             
             return folders
             
         except Exception as e:
             print(f"❌ Error getting ad folders: {e}")
+            if self.raise_errors:
+                raise
             return []
     
     def get_folder_contents(self, folder_id: str) -> Dict:
         """Get contents of a specific folder"""
         try:
             query = f"parents in '{folder_id}'"
-            results = self.service.files().list(q=query).execute()
-            
-            files = results.get('files', [])
+            files = self._list_all_files(query, fields="nextPageToken, files(id, name, mimeType, modifiedTime, size)")
             
-            # Separate text documents (Google Docs and .docx) and images
+            # Separate text documents (Google Docs and .docx), images and params.txt
             text_documents = []
             images = []
+            params_file = None
             
             for file in files:
-                if file['mimeType'] == 'application/vnd.google-apps.document':
+                if file['name'].strip().lower() == 'params.txt':
+                    # Prepared apartment parameters
+                    params_file = file
+                elif file['mimeType'] == 'application/vnd.google-apps.document':
                     # Google Doc
                     text_documents.append({'type': 'google_doc', 'file': file})
                 elif file['mimeType'] == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
@@ -629,12 +1022,42 @@ class GoogleDriveClient:
             
             return {
                 'text_documents': text_documents,
-                'images': images
+                'images': images,
+                'params_file': params_file,
+                'listing_hash': drive_listing_hash(files)
             }
             
         except Exception as e:
             print(f"❌ Error getting folder contents: {e}")
-            return {'text_documents': [], 'images': []}
+            if self.raise_errors:
+                raise
+            return {'text_documents': [], 'images': [], 'params_file': None, 'listing_hash': None}
+    
+    def parse_apartment_details(self, params_content: str) -> Dict[str, str]:
+        """Parse params.txt: label line + value line, or "Label: value" on one line"""
+        try:
+            details = parse_params_text(params_content)
+            print(f"✅ Parsed apartment details: {details}")
+            return details
+            
+        except Exception as e:
+            print(f"❌ Error parsing apartment details: {e}")
+            return {}
+    
+    def download_text_file(self, file_id: str) -> str:
+        """Download a plain text file (params.txt)"""
+        try:
+            request = self.service.files().get_media(fileId=file_id)
+            
+            fh = self._download_media(request)
+            
+            return fh.getvalue().decode('utf-8-sig')
+            
+        except Exception as e:
+            print(f"❌ Error downloading text file: {e}")
+            if self.raise_errors:
+                raise
+            return ""
     
     def download_document_text(self, document_info: Dict) -> str:
         """Download text from Google Doc or .docx file"""
@@ -658,6 +1081,8 @@ class GoogleDriveClient:
                 
         except Exception as e:
             print(f"❌ Error downloading document: {e}")
+            if self.raise_errors:
+                raise
             return ""
     
     def download_docx_text(self, file_id: str, filename: str) -> str:
@@ -666,13 +1091,7 @@ class GoogleDriveClient:
             # Download the .docx file
             request = self.service.files().get_media(fileId=file_id)
             
-            import io
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
+            fh = self._download_media(request)
             
             fh.seek(0)
             
@@ -745,6 +1164,8 @@ class GoogleDriveClient:
                 
         except Exception as e:
             print(f"❌ Error downloading .docx file {filename}: {e}")
+            if self.raise_errors:
+                raise
             return ""
     
     def _extract_docx_via_xml(self, file_handle):
@@ -798,13 +1219,7 @@ class GoogleDriveClient:
                 mimeType='text/plain'
             )
             
-            import io
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
+            fh = self._download_media(request)
             
             fh.seek(0)
             text = fh.read().decode('utf-8')
@@ -813,26 +1228,22 @@ class GoogleDriveClient:
             
         except Exception as e:
             print(f"❌ Error downloading Google Doc: {e}")
+            if self.raise_errors:
+                raise
             return ""
     
-    def download_image(self, file_id: str, filename: str) -> Optional[str]:
-        """Download image to temporary file"""
+    def download_image(self, file_id: str, filename: str, target_dir: Optional[str] = None) -> Optional[str]:
+        """Download image to temporary file (or into target_dir)"""
         try:
             # Get media (simple like test file)
             request = self.service.files().get_media(
                 fileId=file_id
             )
             
-            temp_dir = tempfile.gettempdir()
+            temp_dir = target_dir or tempfile.gettempdir()
             temp_path = os.path.join(temp_dir, filename)
             
-            import io
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
+            fh = self._download_media(request)
             
             with open(temp_path, 'wb') as f:
                 f.write(fh.getvalue())
@@ -841,12 +1252,93 @@ class GoogleDriveClient:
             
         except Exception as e:
             print(f"❌ Error downloading image {filename}: {e}")
+            # A missing or unreadable image (404/403) is dropped; only network errors fail the sync
+            if self.raise_errors and classify_error(e) == NETWORK:
+                raise
             return None
 
+def click_and_wait_for_post(page, selector: str, url_part: str, timeout: int = 30000):
+    """Click a submit control and wait for the form POST response
+    
+    Returns None if the click went through but no POST was seen within timeout;
+    errors of the click itself (element missing, detached, browser gone) are raised.
+    """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+    
+    clicked = False
+    try:
+        with page.expect_response(
+            lambda response: url_part in response.url and response.request.method == "POST",
+            timeout=timeout
+        ) as response_info:
+            page.click(selector)
+            clicked = True
+        response = response_info.value
+        print(f"📥 Form POST answered with HTTP {response.status}")
+    except PlaywrightTimeoutError as e:
+        if not clicked:
+            raise
+        print(f"⚠️ No form POST observed after submit: {e}")
+        response = None
+    
+    try:
+        page.wait_for_load_state('domcontentloaded', timeout=30000)
+    except Exception:
+        pass
+    return response
+
+AD_LIST_SNIPPET_CHARS = 100  # Start of the ad text looked for in the account's ad list (long enough
+                             # to tell apart ads that start with the same template)
+
+# Ad id in the redirect after submit and in the links of the ad list (/my/edit/123456/, ?id=123456)
+AD_ID_RE = re.compile(r'(?:[?&](?:id|ad_id|adv_id)=|/(?:edit|update|delete|view|show|ad|adv|item)/)(\d{3,})')
+
+def extract_ad_id(*urls: Optional[str]) -> Optional[str]:
+    """First ad id found in the given URLs"""
+    for url in urls:
+        match = AD_ID_RE.search(url or "")
+        if match:
+            return match.group(1)
+    return None
+
+def normalize_page_text(text: str) -> str:
+    """Lowercase, single-spaced text for substring matching"""
+    return " ".join(text.split()).lower()
+
+def visible_error_texts(page, selector: str) -> List[str]:
+    """Texts of visible error elements (hidden error-summary placeholders are ignored)"""
+    texts = []
+    try:
+        for element in page.locator(selector).all():
+            if element.is_visible():
+                text = (element.text_content() or "").strip()
+                if text:
+                    texts.append(text)
+    except Exception:
+        pass
+    return texts
+
+def capture_unclassified_page(page, label: str) -> str:
+    """Save full HTML for an outcome we could not classify; returns lowercased content"""
+    try:
+        content = page.content()
+        debug_dir = os.path.join("debug_logs", "unclassified")
+        os.makedirs(debug_dir, exist_ok=True)
+        html_path = os.path.join(debug_dir, f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html")
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"💾 Saved unclassified page to: {html_path}")
+        return content.lower()
+    except Exception as e:
+        print(f"⚠️ Could not capture page: {e}")
+        return ""
+
 class AccountRegistrar:
     """Handle automatic account registration"""
     
-    def __init__(self, page: Page):
+    def __init__(self, page: 'Page'):
+        from twocaptcha import TwoCaptcha
+        
         self.page = page
         self.solver = TwoCaptcha(config.CAPTCHA_API_KEY) if config.CAPTCHA_API_KEY != "your_2captcha_api_key_here" else None
     
@@ -890,68 +1382,63 @@ class AccountRegistrar:
                 if recaptcha_result:
                     print("✅ reCAPTCHA handling completed")
                 
-                # Submit registration
-                submit_button = self.page.locator("button[name='signup-button']")
-                submit_button.click(timeout=30000)
+                # Submit registration and wait for the POST answer
+                register_response = click_and_wait_for_post(
+                    self.page, "button[name='signup-button']", "/site/register"
+                )
+                if register_response is None:
+                    raise RuntimeError("no registration POST observed")
                 
-                # Wait for response with extended timeout
-                print("⏳ Waiting for registration response...")
-                time.sleep(8)  # Increased wait time
-                
-                # Check current URL and page content to determine success
+                # Check response, URL and targeted locators to determine success
+                print("⏳ Checking registration response...")
                 current_url = self.page.url
-                page_content = self.page.content().lower()
-                
-                # Russian success phrases
-                success_phrases = [
-                    "добро пожаловать",  # Welcome
-                    "успешно создали",   # Successfully created
-                    "успешно зарегистрированы",  # Successfully registered
-                    "регистрация завершена",  # Registration completed
-                    "вы успешно",  # You have successfully
-                ]
                 
                 # Multiple success indicators
                 success_indicators = [
+                    register_response is not None and 300 <= register_response.status < 400,  # Redirect after signup
                     "login" in current_url,  # Redirected to login
                     "success" in current_url,
-                    any(phrase in page_content for phrase in success_phrases),  # Russian success messages
                     self.page.locator("#login-form").is_visible(),  # Login form visible
                 ]
                 
-                # Error phrases (but exclude success contexts)
-                error_phrases = [
-                    "ошибка",  # Error in Russian
-                    "неверный",  # Invalid/incorrect
-                    "не удалось",  # Failed to
-                    "попробуйте снова",  # Try again
-                ]
-                
-                # Check for error indicators (but not if we already found success)
-                error_indicators = [
-                    any(phrase in page_content for phrase in error_phrases),
-                    self.page.locator(".alert-danger, .has-error").count() > 0,
-                ]
+                # Visible validation errors (the hidden error summary is ignored)
+                error_texts = visible_error_texts(self.page, ".alert-danger, .has-error, .invalid-feedback")
                 
                 # Determine result
                 has_success = any(success_indicators)
-                has_errors = any(error_indicators) and not has_success  # Ignore errors if we found success
+                has_errors = bool(error_texts) and not has_success  # Ignore errors if we found success
+                
+                if not has_success and not has_errors:
+                    # Unclassified - only now capture and scan the full page
+                    page_content = capture_unclassified_page(self.page, "registration")
+                    
+                    # Russian success phrases
+                    success_phrases = [
+                        "добро пожаловать",  # Welcome
+                        "успешно создали",   # Successfully created
+                        "успешно зарегистрированы",  # Successfully registered
+                        "регистрация завершена",  # Registration completed
+                        "вы успешно",  # You have successfully
+                    ]
+                    
+                    # Error phrases (but exclude success contexts)
+                    error_phrases = [
+                        "ошибка",  # Error in Russian
+                        "неверный",  # Invalid/incorrect
+                        "не удалось",  # Failed to
+                        "попробуйте снова",  # Try again
+                    ]
+                    
+                    has_success = any(phrase in page_content for phrase in success_phrases)
+                    has_errors = any(phrase in page_content for phrase in error_phrases) and not has_success
                 
                 if has_success:
                     print("✅ Registration successful!")
-                    print(f"   Welcome message detected in response")
                     return True, email
                 elif has_errors:
                     print("❌ Registration failed with errors")
-                    try:
-                        # Try to get error messages
-                        error_elements = self.page.locator('.alert-danger, .has-error').all()
-                        for element in error_elements:
-                            error_text = element.text_content()
-                            if error_text and error_text.strip():
-                                print(f"   Error: {error_text}")
-                    except:
-                        pass
+                    for error_text in error_texts:
+                        print(f"   Error: {error_text}")
                     
                     # Continue to next attempt if not the last one
                     if attempt < max_attempts:
@@ -961,8 +1448,8 @@ class AccountRegistrar:
                     else:
                         return False, email
                 else:
-                    print("⚠️ Registration status unclear - assuming success")
-                    return True, email  # Assume success if unclear
+                    # An account we cannot confirm is not used - the next attempt registers a new one
+                    raise RuntimeError("registration status unclear")
                     
             except Exception as e:
                 print(f"❌ Registration attempt {attempt} failed: {e}")
@@ -1028,23 +1515,54 @@ class AccountRegistrar:
 class OrbitaFormFillerV2:
     """Enhanced Orbita Form Filler with new algorithm"""
     
-    def __init__(self):
+    def __init__(self, replay_mode: bool = False):
         self.browser = None
         self.context = None
         self.page = None
-        self.tor_changer = TorIPChanger() if config.USE_TOR_IP_ROTATION else None
-        self.drive_client = GoogleDriveClient()
-        self.openai_extractor = OpenAIExtractor()
+        # Replay mode serves captured pages (see har_replay.py) - no Tor, Drive or OpenAI
+        self.replay = HarReplay(
+            config.REPLAY_HAR_PATH,
+            config.REPLAY_FORM_HTML,
+            config.REPLAY_LOGIN_HTML,
+            config.REPLAY_LOGIN_FILES_DIR
+        ) if replay_mode else None
+        self.tor_changer = TorIPChanger() if config.USE_TOR_IP_ROTATION and not replay_mode else None
+        # Drive errors are raised to the retry policy instead of turning into empty ads
+        self.drive_client = GoogleDriveClient(raise_errors=True)
+        self.retry_policy = RetryPolicy()
+        # Only folders matching this filter are listed from Drive (None = all)
+        self.folder_filter: Optional[FolderFilter] = None
+        self.extractor = create_extractor() if not replay_mode else None
+        # API extractor (own backend or behind the hybrid one) for token/circuit stats
+        self.openai_extractor = getattr(self.extractor, 'api', self.extractor)
+        if not isinstance(self.openai_extractor, OpenAIExtractor):
+            self.openai_extractor = None
+        # Option values of the add form selects (validated before the browser is used)
+        self.form_catalogue = load_catalogue()
+        self.form_catalogue_checked = False
+        # sync / prepare / post stages exchange ads through this store
+        self.bundle_store = AdBundleStore(config.BUNDLE_STORE_DIR)
         self.current_account_email = None
         self.processed_ads_log = "processed_ads_v2.log"
+        self.blocked_url_patterns = [re.compile(p) for p in config.BLOCKED_URL_PATTERNS]
+        self.allowed_url_patterns = [re.compile(p) for p in config.ALLOWED_URL_PATTERNS]
+        self.request_filter_stats = {'allowed': 0, 'blocked': 0}
+        self.network_recorder = NetworkRecorder(
+            session_name="production_session",
+            buffer_size=config.NETWORK_RECORDER_BUFFER_SIZE,
+            sample_rate=config.NETWORK_RECORDER_SAMPLE_RATE,
+            url_patterns=config.NETWORK_RECORDER_URL_PATTERNS,
+            exclude_patterns=config.NETWORK_RECORDER_EXCLUDE_PATTERNS,
+            record_headers=config.NETWORK_RECORDER_HEADERS
+        ) if config.NETWORK_RECORDER_ENABLED else None
         
-    def initialize(self) -> bool:
-        """Initialize all components"""
+    def initialize(self, use_tor: bool = True, use_drive: bool = True) -> bool:
+        """Initialize all components (sync/prepare stages need no Tor, post needs no Drive)"""
         try:
             print("🚀 Initializing Orbita Form Filler v2...")
             
             # Initialize Tor if enabled - REQUIRED per user request
-            if self.tor_changer:
+            if self.tor_changer and use_tor:
                 if not self.tor_changer.initialize_tor():
                     print("❌ Tor initialization failed - STOPPING as required")
                     return False
@@ -1055,7 +1573,7 @@ class OrbitaFormFillerV2:
                     print("✅ Tor started successfully - continuing")
             
             # Authenticate Google Drive
-            if not self.drive_client.authenticate():
+            if use_drive and not self.drive_client.authenticate():
                 print("❌ Google Drive authentication failed")
                 return False
             
@@ -1072,6 +1590,7 @@ class OrbitaFormFillerV2:
             try:
                 print(f"🌐 Starting browser (attempt {attempt}/{max_attempts})...")
                 
+                from playwright.sync_api import sync_playwright
                 playwright = sync_playwright().start()
                 
                 # Browser arguments
@@ -1122,12 +1641,25 @@ class OrbitaFormFillerV2:
                 # Set default timeout for all operations
                 self.context.set_default_timeout(60000)  # 60 seconds
                 
+                # Serve captured pages instead of the live site
+                if self.replay:
+                    self.replay.install(self.context)
+                
+                # Abort trackers and unneeded media (registered last, so it runs first)
+                if config.BLOCK_THIRD_PARTY_REQUESTS:
+                    self.context.route("**/*", self._filter_request)
+                    print("🚫 Third-party request filter enabled")
+                
                 # Create page
                 self.page = self.context.new_page()
                 
                 # Set page timeout
                 self.page.set_default_timeout(60000)  # 60 seconds
                 
+                # Record network activity for failed-ad debugging
+                if self.network_recorder:
+                    self.network_recorder.attach(self.page)
+                
                 print("✅ Browser started successfully")
                 return True
                 
@@ -1156,76 +1688,84 @@ class OrbitaFormFillerV2:
         
         return False
     
-    def register_and_login(self, max_attempts: int = 5) -> bool:
-        """Register new account and login with retry logic"""
-        for overall_attempt in range(1, max_attempts + 1):
+    def _filter_request(self, route):
+        """Abort analytics, tag-manager, ad-network and media requests unless allowlisted"""
+        request = route.request
+        url = request.url
+        
+        try:
+            if any(p.search(url) for p in self.allowed_url_patterns):
+                self.request_filter_stats['allowed'] += 1
+                route.fallback()
+                return
+            
+            if (request.resource_type in config.BLOCKED_RESOURCE_TYPES or
+                    any(p.search(url) for p in self.blocked_url_patterns)):
+                self.request_filter_stats['blocked'] += 1
+                route.abort()
+                return
+            
+            self.request_filter_stats['allowed'] += 1
+            route.fallback()
+            
+        except Exception:
+            # Never break page loads because of the filter itself
             try:
-                print(f"🔐 Registration process (overall attempt {overall_attempt}/{max_attempts})...")
-                
-                registrar = AccountRegistrar(self.page)
-                success, email = registrar.register_account(max_attempts=3)  # 3 attempts per overall attempt
-                
-                if success:
-                    self.current_account_email = email
-                    print(f"✅ Account registered and logged in: {email}")
-                    return True
-                else:
-                    print(f"❌ Account registration failed on attempt {overall_attempt}")
-                    
-                    # If not the last attempt, restart browser and try again
-                    if overall_attempt < max_attempts:
-                        print("🔄 Restarting browser for fresh attempt...")
-                        
-                        # Close current browser
-                        try:
-                            if self.page:
-                                self.page.close()
-                            if self.context:
-                                self.context.close()
-                            if self.browser:
-                                self.browser.close()
-                        except:
-                            pass
-                        
-                        # Wait before restarting
-                        time.sleep(10)
-                        
-                        # Restart browser
-                        if not self.start_browser():
-                            print("❌ Failed to restart browser")
-                            continue
-                        
-                        print(f"⏳ Retrying registration... (overall attempt {overall_attempt + 1}/{max_attempts})")
-                        continue
-                    else:
-                        print(f"❌ All {max_attempts} registration attempts exhausted")
-                        return False
-                    
-            except Exception as e:
-                print(f"❌ Registration/login attempt {overall_attempt} failed: {e}")
-                
-                # If not the last attempt, try to recover
-                if overall_attempt < max_attempts:
-                    print("🔄 Attempting to recover and retry...")
-                    time.sleep(15)  # Longer wait for recovery
-                    continue
-                else:
-                    print(f"❌ All {max_attempts} registration attempts failed")
-                    return False
+                route.fallback()
+            except Exception:
+                pass
+    
+    def register_and_login(self, max_attempts: Optional[int] = None) -> bool:
+        """Register a new account and log in (retried per the 'login' retry policy)"""
+        try:
+            # A refused registration or a crashed browser gets a fresh browser, network errors just a backoff
+            self.retry_policy.run('login', self._register_account, attempts=max_attempts,
+                                  recover={BROWSER: self._restart_browser, VALIDATION: self._restart_browser})
+            return True
+        except Exception as e:
+            print(f"❌ Registration/login failed: {e}")
+            return False
+    
+    def _register_account(self):
+        print("🔐 Registration process...")
+        registrar = AccountRegistrar(self.page)
+        success, email = registrar.register_account(max_attempts=3)
+        if not success:
+            raise StageError(VALIDATION, "account registration failed")
         
-        return False
+        self.current_account_email = email
+        print(f"✅ Account registered and logged in: {email}")
+    
+    def _restart_browser(self) -> bool:
+        """Close the browser and start a fresh one"""
+        print("🔄 Restarting browser...")
+        try:
+            if self.page:
+                self.page.close()
+            if self.context:
+                self.context.close()
+            if self.browser:
+                self.browser.close()
+        except Exception:
+            pass  # Probably what crashed
+        self.page = self.context = self.browser = None
+        return self.start_browser()
+    
+    def _restart_session(self) -> bool:
+        """Fresh browser and account after a browser crash while posting"""
+        return self._restart_browser() and self.register_and_login()
     
     def process_all_ads(self) -> Dict[str, int]:
         """Process all ads from Google Drive"""
         try:
             print("📁 Getting ad folders from Google Drive...")
             
-            ad_folders = self.drive_client.get_ad_folders()
+            ad_folders = self.retry_policy.run('sync', self.drive_client.get_ad_folders, self.folder_filter)
             if not ad_folders:
                 print("❌ No ad folders found")
-                return {'processed': 0, 'failed': 0, 'skipped': 0, 'empty': 0}
+                return {'processed': 0, 'failed': 0, 'skipped': 0, 'empty': 0, 'invalid': 0}
             
-            stats = {'processed': 0, 'failed': 0, 'skipped': 0, 'empty': 0}
+            stats = {'processed': 0, 'failed': 0, 'skipped': 0, 'empty': 0, 'invalid': 0}
             processed_folders = self._load_processed_ads()
             
             print(f"📊 Found {len(ad_folders)} ad folders")
@@ -1242,36 +1782,32 @@ class OrbitaFormFillerV2:
                     stats['skipped'] += 1
                     continue
                 
-                # Add small delay between folders to avoid API rate limits
-                if i > 0:  # Don't delay before first folder
-                    print("⏳ Brief pause between folders...")
-                    time.sleep(2)  # Back to reasonable 2 seconds
-                
                 # Process the ad
+                if self.network_recorder:
+                    self.network_recorder.start_ad(folder_name)
                 result = self._process_single_ad(folder_id, folder_name)
                 if result == 'success':
                     stats['processed'] += 1
-                    self._log_processed_ad(folder_id, folder_name)
                     print(f"✅ Successfully processed: {folder_name}")
                 elif result == 'empty':
                     stats['empty'] += 1
                     print(f"⚪ Skipped empty document: {folder_name}")
+                elif result == 'invalid':
+                    stats['invalid'] += 1
+                    print(f"🚫 Skipped ad with parameters the form does not accept: {folder_name}")
+                elif result == 'skipped':
+                    stats['skipped'] += 1
                 else:
                     stats['failed'] += 1
                     print(f"❌ Failed to process: {folder_name}")
+                    if self.network_recorder:
+                        self.network_recorder.dump_failure(folder_name, reason=result)
                 
                 # Wait between ads (except for the last one)
                 if i < len(ad_folders) - 1 and result == 'success':
-                    print(f"⏳ Waiting {config.WAIT_BETWEEN_ADS} seconds before next ad...")
-                    time.sleep(config.WAIT_BETWEEN_ADS)
-                    
-                    # Change IP if configured
-                    if (self.tor_changer and 
-                        config.TOR_IP_CHANGE_INTERVAL > 0 and 
-                        (i + 1) % config.TOR_IP_CHANGE_INTERVAL == 0):
-                        self.tor_changer.change_ip()
+                    self._wait_before_next_ad(i + 1)
                 elif i < len(ad_folders) - 1:
-                    print("⏭️ No wait needed before next ad (skipped or empty)")
+                    print("⏭️ No wait needed before next ad (skipped, empty or invalid)")
             
             # Logout after processing all ads
             if config.LOGOUT_BETWEEN_ADS or stats['processed'] > 0:
@@ -1281,59 +1817,490 @@ class OrbitaFormFillerV2:
             
         except Exception as e:
             print(f"❌ Error processing ads: {e}")
-            return {'processed': 0, 'failed': 0, 'skipped': 0, 'empty': 0}
+            return {'processed': 0, 'failed': 0, 'skipped': 0, 'empty': 0, 'invalid': 0}
+    
+    def _wait_before_next_ad(self, ads_done: int):
+        """Pause between posted ads and rotate the Tor IP if configured"""
+        print(f"⏳ Waiting {config.WAIT_BETWEEN_ADS} seconds before next ad...")
+        time.sleep(config.WAIT_BETWEEN_ADS)
+        
+        # Change IP if configured
+        if (self.tor_changer and 
+            config.TOR_IP_CHANGE_INTERVAL > 0 and 
+            ads_done % config.TOR_IP_CHANGE_INTERVAL == 0):
+            self.tor_changer.change_ip()
     
     def _process_single_ad(self, folder_id: str, folder_name: str) -> str:
-        """Process a single ad. Returns: 'success', 'empty', or 'failed'"""
+        """Process a single ad through all stages. Returns: 'success', 'empty', 'invalid', 'skipped' or 'failed'"""
         try:
-            # Get folder contents
-            print("📂 Getting folder contents...")
-            contents = self.drive_client.get_folder_contents(folder_id)
-            
-            if not contents['text_documents']:
-                print(f"❌ No text document found in folder: {folder_name}")
+            meta = self.bundle_store.load(folder_id)
+            if meta and meta.get('status') == SUBMITTING:
+                print(f"⏸️ Submission was interrupted, waiting for reconciliation: {folder_name}")
+                return 'skipped'
+            
+            synced = self._sync_folder(folder_id, folder_name)
+            if synced in ('empty', 'failed'):
+                return synced
+            
+            self._prepare_bundle(self.bundle_store.load(folder_id))
+            meta = self.bundle_store.load(folder_id)
+            if meta['status'] == INVALID:
+                return 'invalid'
+            if meta['status'] != PREPARED:
                 return 'failed'
             
-            # Get the first text document (ad text)
-            doc = contents['text_documents'][0]
-            print(f"📄 Downloading text document: {doc['file']['name']}")
-            ad_text = self.drive_client.download_document_text(doc)
-            
-            if not ad_text.strip():
-                print(f"⚪ Empty text document found: {doc['file']['name']}")
-                print(f"   Skipping folder '{folder_name}' - no content to post")
-                return 'empty'
-            
-            print(f"📄 Retrieved ad text ({len(ad_text)} characters)")
+            return self._post_bundle(meta)
             
-            # Extract parameters using OpenAI
-            parameters = self.openai_extractor.extract_parameters(ad_text)
+        except Exception as e:
+            print(f"❌ Error processing single ad: {e}")
+            return 'failed'
+    
+    # ------------------------------------------------------------ stage: sync
+    
+    def sync_ads(self) -> Dict[str, int]:
+        """Stage 1: download new or changed Drive ad folders into the bundle store"""
+        stats = {'synced': 0, 'unchanged': 0, 'empty': 0, 'failed': 0}
+        try:
+            print("📁 Getting ad folders from Google Drive...")
+            ad_folders = self.retry_policy.run('sync', self.drive_client.get_ad_folders, self.folder_filter)
+            processed_folders = self._load_processed_ads()
+            pending = [folder for folder in ad_folders if folder['id'] not in processed_folders]
+            return self.sync_folders(pending)
             
-            # Download images
-            image_paths = []
-            for i, image in enumerate(contents['images']):
-                print(f"🖼️ Downloading image {i+1}/{len(contents['images'])}: {image['name']}")
-                path = self.drive_client.download_image(image['id'], image['name'])
-                if path:
-                    image_paths.append(path)
+        except Exception as e:
+            print(f"❌ Error syncing ads: {e}")
+        return stats
+    
+    def sync_folders(self, folders: List[Dict]) -> Dict[str, int]:
+        """Sync the given Drive folders (dicts with 'id' and 'name') into the bundle store"""
+        stats = {'synced': 0, 'unchanged': 0, 'empty': 0, 'failed': 0}
+        # Folders are synced on DRIVE_WORKERS threads, each with its own Drive service
+        print(f"📂 Syncing {len(folders)} folders with {config.DRIVE_WORKERS} workers...")
+        results = self.drive_client.map_parallel(
+            lambda folder: self._sync_folder(folder['id'], folder['name']), folders)
+        for result in results:
+            stats[result] += 1
+        return stats
+    
+    def _sync_folder(self, folder_id: str, folder_name: str) -> str:
+        """Download one folder into its bundle. Returns: 'synced', 'unchanged', 'empty' or 'failed'"""
+        # What a failed attempt already downloaded is kept - a retry only fetches the rest
+        download_dir = tempfile.mkdtemp(prefix="orbita-images-")
+        progress = {}
+        try:
+            return self.retry_policy.run('sync', self._sync_folder_once, folder_id, folder_name,
+                                         download_dir, progress)
+        except Exception as e:
+            print(f"❌ Error syncing folder {folder_name}: {e}")
+            return 'failed'
+        finally:
+            shutil.rmtree(download_dir, ignore_errors=True)
+    
+    def _sync_folder_once(self, folder_id: str, folder_name: str, download_dir: str, progress: Dict) -> str:
+        """One sync attempt; results are kept in progress for the next attempt"""
+        # Get folder contents
+        if 'contents' not in progress:
+            print("📂 Getting folder contents...")
+            progress['contents'] = self.drive_client.get_folder_contents(folder_id)
+        contents = progress['contents']
+        
+        if not contents['text_documents']:
+            print(f"❌ No text document found in folder: {folder_name}")
+            return 'failed'
+        
+        # Never overwrite an ad that may already be online
+        meta = self.bundle_store.load(folder_id)
+        if meta and meta.get('status') in (SUBMITTING,) + POSTED_STATUSES:
+            return 'unchanged'
+        
+        # Nothing changed on Drive since the last sync
+        if meta and contents['listing_hash'] and meta.get('listing_hash') == contents['listing_hash']:
+            if meta.get('status') == EMPTY:
+                return 'empty'
+            print(f"♻️ Bundle is up to date: {folder_name}")
+            return 'unchanged'
+        
+        # Get the first text document (ad text)
+        doc = contents['text_documents'][0]
+        if 'ad_text' not in progress:
+            print(f"📄 Downloading text document: {doc['file']['name']}")
+            progress['ad_text'] = self.drive_client.download_document_text(doc)
+        ad_text = progress['ad_text']
+        
+        if contents.get('params_file') and 'params_text' not in progress:
+            print(f"📋 Reading {contents['params_file']['name']}")
+            progress['params_text'] = self.drive_client.download_text_file(contents['params_file']['id'])
+        params_text = progress.get('params_text')
+        
+        # Download images (in parallel, into a directory of this folder only)
+        image_paths = []
+        if ad_text.strip() and contents['images']:
+            missing = [image for image in contents['images']
+                       if not os.path.exists(os.path.join(download_dir, image['name']))]
+            if missing:
+                print(f"🖼️ Downloading {len(missing)} images")
+                self.drive_client.download_images(missing, download_dir)
+            image_paths = [os.path.join(download_dir, image['name']) for image in contents['images']
+                           if os.path.exists(os.path.join(download_dir, image['name']))]
+        
+        meta = self.bundle_store.write_synced(folder_id, folder_name, contents['listing_hash'],
+                                              ad_text, params_text, image_paths)
+        if meta['status'] == EMPTY:
+            print(f"⚪ Empty text document found: {doc['file']['name']}")
+            print(f"   Skipping folder '{folder_name}' - no content to post")
+            return 'empty'
+        
+        print(f"📄 Retrieved ad text ({len(ad_text)} characters), {len(image_paths)} images")
+        return 'synced'
+    
+    # ------------------------------------------------------------ stage: prepare
+    
+    def prepare_ads(self, workers: Optional[int] = None) -> Dict[str, int]:
+        """Stage 2: extract, validate and process images of all synced bundles in parallel"""
+        stats = {'prepared': 0, 'unchanged': 0, 'invalid': 0, 'failed': 0}
+        bundles = [meta for meta in self.bundle_store.list_bundles()
+                   if meta.get('status') in (SYNCED, PREPARED, INVALID, FAILED)]
+        if not bundles:
+            print("ℹ️ No synced ads to prepare")
+            return stats
+        
+        workers = workers or config.PREPARE_WORKERS
+        print(f"🧮 Preparing {len(bundles)} ads with {workers} workers...")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(self._prepare_bundle, bundles):
+                stats[result] += 1
+        return stats
+    
+    def _prepared_hash(self, meta: Dict) -> str:
+        """Bundle content + everything that changes the prepared output"""
+        extractor_name = self.extractor.name if self.extractor else "none"
+        key = (f"{meta.get('content_hash')}|{extractor_name}|{EXTRACTION_PROMPT_VERSION}|"
+               f"{self.form_catalogue.version}|{config.IMAGE_MAX_DIMENSION}")
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    def _prepare_bundle(self, meta: Dict) -> str:
+        """Extract parameters and process images of one bundle. Returns: 'prepared', 'unchanged', 'invalid' or 'failed'"""
+        try:
+            return self.retry_policy.run('prepare', self._prepare_bundle_once, meta)
+        except Exception as e:
+            return self._prepare_failed(meta, e)
+    
+    def _prepare_bundle_once(self, meta: Dict) -> str:
+        folder_id = meta['folder_id']
+        prepared_hash = self._prepared_hash(meta)
+        if meta.get('status') in (PREPARED, INVALID) and meta.get('prepared_hash') == prepared_hash:
+            return 'unchanged'
+        
+        # Extract (missing) parameters with the configured backend, unless an earlier attempt did
+        ad_text, known_parameters = self._read_bundle_input(folder_id)
+        parameters = self.bundle_store.read_extracted(folder_id, prepared_hash)
+        if parameters is None:
+            parameters = self.extractor.extract_parameters(ad_text, known=known_parameters)
+            self.bundle_store.write_extracted(folder_id, parameters, prepared_hash)
+        parameters, errors, cleaned_text = self._check_bundle_parameters(ad_text, parameters)
+        
+        image_paths = []
+        if parameters is not None:
+            image_paths = [process_image(*job) for job in self._image_jobs(meta)]
+        return self._store_prepared(meta, prepared_hash, cleaned_text, parameters, errors, image_paths)
+    
+    def _read_bundle_input(self, folder_id: str) -> Tuple[str, Dict[str, str]]:
+        """(ad text, parameters from params.txt) of a synced bundle"""
+        ad_text = self.bundle_store.read_text(folder_id, "ad.txt") or ""
+        
+        # Prepared parameters from params.txt take precedence over extraction
+        params_text = self.bundle_store.read_text(folder_id, "params.txt")
+        return ad_text, parse_params_text(params_text) if params_text else {}
+    
+    def _check_bundle_parameters(self, ad_text: str, parameters: Dict[str, str]
+                                 ) -> Tuple[Optional[Dict[str, str]], Dict[str, str], str]:
+        """(validated parameters or None, errors, cleaned text) from extractor output"""
+        parameters = dict(parameters)
+        cleaned_text = parameters.pop('cleaned_text', ad_text)
+        
+        # Check the values against the form options
+        parameters, errors = self._validate_parameters(parameters)
+        return parameters, errors, cleaned_text
+    
+    def _image_jobs(self, meta: Dict) -> List[Tuple[str, str, int]]:
+        """process_image() arguments for every raw image (old processed images are removed)"""
+        folder_id = meta['folder_id']
+        images_dir = self.bundle_store.path(folder_id, "images")
+        shutil.rmtree(images_dir, ignore_errors=True)
+        return [(self.bundle_store.path(folder_id, "raw", name), images_dir, i + 1)
+                for i, name in enumerate(meta.get('raw_images', []))]
+    
+    def _store_prepared(self, meta: Dict, prepared_hash: str, cleaned_text: str,
+                        parameters: Optional[Dict[str, str]], errors: Dict[str, str],
+                        image_paths: List[Optional[str]]) -> str:
+        images = [os.path.basename(path) for path in image_paths if path]
+        status = PREPARED if parameters is not None else INVALID
+        self.bundle_store.write_prepared(meta['folder_id'], cleaned_text, parameters or {}, images, prepared_hash,
+                                         status=status, errors=errors)
+        print(f"{'✅' if status == PREPARED else '🚫'} {meta.get('folder_name', meta['folder_id'])}: "
+              f"{status} ({len(images)} images)")
+        return 'prepared' if status == PREPARED else 'invalid'
+    
+    def _prepare_failed(self, meta: Dict, error: Exception) -> str:
+        print(f"❌ Error preparing {meta.get('folder_name', meta['folder_id'])}: {error}")
+        self.bundle_store.update(meta['folder_id'], status=FAILED, errors={'prepare': str(error)},
+                                 error_kind=classify_error(error))
+        return 'failed'
+    
+    # ------------------------------------------------------------ stage: post
+    
+    def post_ads(self, should_continue: Optional[Callable[[], bool]] = None) -> Dict[str, int]:
+        """Stage 3: post prepared bundles (local data only - no Drive or OpenAI calls)
+        
+        should_continue is asked before each ad (e.g. the daemon's posting window); False stops the run.
+        """
+        stats = {'processed': 0, 'failed': 0, 'skipped': 0, 'empty': 0, 'invalid': 0}
+        try:
+            processed_folders = self._load_processed_ads()
+            bundles = self.bundle_store.list_bundles(PREPARED)
+            stats['invalid'] = len(self.bundle_store.list_bundles(INVALID))
+            stats['empty'] = len(self.bundle_store.list_bundles(EMPTY))
+            print(f"📦 {len(bundles)} prepared ads in {config.BUNDLE_STORE_DIR}")
+            
+            for i, meta in enumerate(bundles):
+                if should_continue and not should_continue():
+                    print(f"⏸️ Posting paused, {len(bundles) - i} prepared ads left")
+                    break
+                
+                folder_name = meta.get('folder_name', meta['folder_id'])
+                if meta['folder_id'] in processed_folders:
+                    print(f"⏭️ Skipping already processed folder: {folder_name}")
+                    stats['skipped'] += 1
+                    continue
+                
+                print(f"\n📮 Posting {i+1}/{len(bundles)}: {folder_name}")
+                if self.network_recorder:
+                    self.network_recorder.start_ad(folder_name)
+                result = self._post_bundle(meta)
+                if result == 'success':
+                    stats['processed'] += 1
+                    print(f"✅ Successfully processed: {folder_name}")
+                    if i < len(bundles) - 1:
+                        self._wait_before_next_ad(stats['processed'])
+                else:
+                    stats['failed'] += 1
+                    print(f"❌ Failed to process: {folder_name}")
+                    if self.network_recorder:
+                        self.network_recorder.dump_failure(folder_name, reason=result)
             
-            print(f"🖼️ Downloaded {len(image_paths)} images")
+            if config.LOGOUT_BETWEEN_ADS or stats['processed'] > 0:
+                self._logout()
             
-            # Fill the form
-            success = self._fill_orbita_form(ad_text, parameters, image_paths)
+        except Exception as e:
+            print(f"❌ Error posting ads: {e}")
+        return stats
+    
+    def _post_bundle(self, meta: Dict) -> str:
+        """Fill the form from a prepared bundle. Returns: 'success' or 'failed'"""
+        folder_id = meta['folder_id']
+        try:
+            ad_text, parameters, image_paths = self.bundle_store.read_for_post(folder_id)
+        except Exception as e:
+            # Nothing was sent; 'failed' bundles are prepared again by the next run
+            print(f"❌ Prepared bundle is unreadable: {e}")
+            self.bundle_store.transition(folder_id, FAILED, errors={'post': str(e)}, error_kind=classify_error(e))
+            return 'failed'
+        print(f"🖼️ {len(image_paths)} prepared images")
+        
+        def mark_submitting():
+            # Durable before the form is sent - a crash from here on is resolved by reconcile_submitting()
+            self.bundle_store.transition(folder_id, SUBMITTING, account=self.current_account_email,
+                                         submitting_at=datetime.now().isoformat(timespec='seconds'))
+        
+        def record_ad_id(ad_id: str):
+            # Positive identifier for verification and reconciliation, stored even if the result is unclear
+            self.bundle_store.update(folder_id, ad_id=ad_id)
+        
+        # Fill the form; a retry starts from the form again (the bundle is already local)
+        try:
+            self.retry_policy.run('post', self._submit_ad, ad_text, parameters, image_paths,
+                                  on_submit=mark_submitting, on_ad_id=record_ad_id,
+                                  recover={BROWSER: self._restart_session, SESSION: self.register_and_login})
+        except Exception as e:
+            # If the form may have been sent the ad stays 'submitting', otherwise the next run posts it again
+            status = SUBMITTING if not getattr(e, 'retryable', True) else PREPARED
+            self.bundle_store.transition(folder_id, status, last_error=str(e), error_kind=classify_error(e))
+            return 'failed'
+        
+        folder_name = meta.get('folder_name', folder_id)
+        if not config.VERIFY_POSTED_ADS:
+            self._mark_posted(folder_id, folder_name, SUBMITTED)
+        elif self._verify_posted(folder_id):
+            self._mark_posted(folder_id, folder_name, VERIFIED)
+        # else: stays 'submitting' (not logged as processed) until reconcile_submitting() finds it
+        return 'success'
+    
+    def _mark_posted(self, folder_id: str, folder_name: str, status: str):
+        self.bundle_store.transition(folder_id, status, posted_at=datetime.now().isoformat(timespec='seconds'))
+        self._log_processed_ad(folder_id, folder_name)
+        # Images are not needed any more once the ad is up
+        self.bundle_store.drop_images(folder_id)
+    
+    def _verify_posted(self, folder_id: str) -> bool:
+        """True once the ad shows up in the account's ad list; otherwise it stays 'submitting'"""
+        try:
+            meta = self.bundle_store.load(folder_id) or {'folder_id': folder_id}
+            if self._check_ad_list([meta], self.current_account_email)[folder_id] == 'found':
+                print("🔎 Ad found in the account's ad list")
+                return True
+            print("🔎 Ad not (yet) in the account's ad list - left as submitting for reconciliation")
+        except Exception as e:
+            print(f"⚠️ Could not verify ad, left as submitting for reconciliation: {e}")
+        return False
+    
+    def _read_ad_list(self) -> Tuple[set, str, bool]:
+        """(ad ids linked from, text of, whether every page was read) of the logged-in account's ad list"""
+        ad_ids, texts = set(), []
+        for page_number in range(1, config.MY_ADS_MAX_PAGES + 1):
+            url = config.MY_ADS_URL if page_number == 1 else f"{config.MY_ADS_URL}?page={page_number}"
+            self.page.goto(url, timeout=60000)
+            self.page.wait_for_load_state('domcontentloaded')
+            links = self.page.eval_on_selector_all("a[href]", "links => links.map(link => link.href)")
+            page_ids = {ad_id for ad_id in (extract_ad_id(link) for link in links) if ad_id}
+            texts.append(normalize_page_text(self.page.inner_text("body")))
+            # A page without new ads is past the end of the list
+            if not page_ids - ad_ids:
+                return ad_ids, " ".join(texts), True
+            ad_ids |= page_ids
+        return ad_ids, " ".join(texts), False
+    
+    def _check_ad_list(self, bundles: List[Dict], account: Optional[str]) -> Dict[str, str]:
+        """'found', 'absent' or 'unknown' per folder id, from the account's ad list
+        
+        An ad is found by the ad id recorded at submit time, or by the start of its text.
+        Absence is only reported when it is proven: every page of the list was read,
+        the list is readable (shows the empty-list message, or the recorded ids of
+        other ads of the account) and every ad in it belongs to another bundle.
+        Anything else is 'unknown' - posting an ad that is online would post it twice.
+        """
+        ad_ids, listing, complete = self._read_ad_list()
+        checked = {meta['folder_id'] for meta in bundles}
+        known_ids = {meta['ad_id'] for meta in self.bundle_store.list_bundles()
+                     if meta.get('ad_id') and meta.get('account') == account and meta['folder_id'] not in checked}
+        empty_list = not ad_ids and any(marker in listing for marker in config.MY_ADS_EMPTY_MARKERS)
+        readable = empty_list or bool(ad_ids & known_ids)
+        
+        states = {}
+        for meta in bundles:
+            folder_id = meta['folder_id']
+            text = (self.bundle_store.read_text(folder_id, "cleaned.txt") or
+                    self.bundle_store.read_text(folder_id, "ad.txt") or "")
+            snippet = normalize_page_text(text)[:AD_LIST_SNIPPET_CHARS]
+            if (meta.get('ad_id') and meta['ad_id'] in ad_ids) or (snippet and snippet in listing):
+                states[folder_id] = 'found'
+            elif complete and readable and ad_ids <= known_ids:
+                states[folder_id] = 'absent'
+            else:
+                states[folder_id] = 'unknown'
+        return states
+    
+    def reconcile_submitting(self) -> Dict[str, int]:
+        """Resolve ads left in 'submitting' by a crash or an unconfirmed post (needs the browser,
+        before register_and_login)
+        
+        Logs in to the account that sent each of them: ads found in its ad list become
+        verified, ads proven absent go back to prepared and are posted again, the rest
+        stay 'submitting' until a later run can tell.
+        """
+        stats = {'verified': 0, 'requeued': 0, 'unresolved': 0}
+        bundles = self.bundle_store.list_bundles(SUBMITTING)
+        if not bundles:
+            return stats
+        
+        print(f"🧾 Reconciling {len(bundles)} ads with an unconfirmed submission...")
+        by_account = {}
+        for meta in bundles:
+            by_account.setdefault(meta.get('account'), []).append(meta)
+        
+        for account, account_bundles in by_account.items():
+            if not account or not self._login_account(account):
+                print(f"⚠️ Cannot check account {account or '(unknown)'} - "
+                      f"{len(account_bundles)} ads stay in 'submitting'")
+                stats['unresolved'] += len(account_bundles)
+                continue
             
-            # Cleanup temporary files
-            for path in image_paths:
-                try:
-                    os.remove(path)
-                except:
-                    pass
+            try:
+                states = self._check_ad_list(account_bundles, account)
+            except Exception as e:
+                print(f"⚠️ Could not read the ad list of {account}: {e}")
+                stats['unresolved'] += len(account_bundles)
+                continue
+            finally:
+                self._logout()
             
-            return 'success' if success else 'failed'
+            for meta in account_bundles:
+                folder_name = meta.get('folder_name', meta['folder_id'])
+                state = states[meta['folder_id']]
+                if state == 'found':
+                    self._mark_posted(meta['folder_id'], folder_name, VERIFIED)
+                    print(f"✅ Already online: {folder_name}")
+                    stats['verified'] += 1
+                elif state == 'absent':
+                    self.bundle_store.transition(meta['folder_id'], PREPARED)
+                    print(f"🔁 Not online, will be posted again: {folder_name}")
+                    stats['requeued'] += 1
+                else:
+                    print(f"❓ Cannot tell whether it is online, left as submitting: {folder_name}")
+                    stats['unresolved'] += 1
+        
+        print(f"🧾 Reconciled: {stats['verified']} already online, {stats['requeued']} to post again, "
+              f"{stats['unresolved']} unresolved")
+        return stats
+    
+    def _login_account(self, email: str) -> bool:
+        """Log in to an account registered by an earlier run (they all use REGISTRATION_PASSWORD)"""
+        try:
+            print(f"🔐 Logging in as {email}...")
+            self.page.goto("https://passport.orbita.co.il/site/login/", timeout=60000)
+            self.page.wait_for_load_state('networkidle', timeout=60000)
+            self.page.fill("#loginform-email", email, timeout=10000)
+            self.page.fill("#loginform-password", config.REGISTRATION_PASSWORD, timeout=10000)
+            login_response = click_and_wait_for_post(self.page, "button[name='login-button']", "/site/login")
+            
+            if login_response is None or "passport.orbita.co.il/site/login" in self.page.url:
+                for error_text in visible_error_texts(self.page, ".alert-danger, .has-error, .invalid-feedback"):
+                    print(f"   Error: {error_text}")
+                print(f"❌ Login as {email} failed")
+                return False
             
+            self.current_account_email = email
+            return True
         except Exception as e:
-            print(f"❌ Error processing single ad: {e}")
-            return 'failed'
+            print(f"❌ Login as {email} failed: {e}")
+            return False
+    
+    def _validate_parameters(self, parameters: Dict[str, str]) -> Tuple[Optional[Dict[str, str]], Dict[str, str]]:
+        """Normalize parameters to the form options; (None, errors) if the ad must not be posted"""
+        normalized, errors = self.form_catalogue.validate_parameters(parameters)
+        if not errors:
+            return normalized, errors
+        
+        for field, error in errors.items():
+            print(f"🚫 Invalid {field}: {error}")
+        
+        if config.INVALID_PARAMETERS_POLICY == "drop":
+            print(f"⚠️ Posting without: {', '.join(errors)}")
+            return {field: value for field, value in normalized.items() if field not in errors}, errors
+        return None, errors
+    
+    def _refresh_form_catalogue(self):
+        """Compare the catalogue with the live form once per run (after #dyncon is loaded)"""
+        if self.form_catalogue_checked or not config.FORM_CATALOGUE_LIVE_REFRESH:
+            return
+        self.form_catalogue_checked = True
+        try:
+            if self.page.locator("select[name='room']").count() == 0:
+                return
+            if self.form_catalogue.refresh_from_html(self.page.content(), source=self.page.url):
+                self.form_catalogue.save(config.FORM_CATALOGUE_PATH)
+                print(f"📚 Form catalogue updated (version {self.form_catalogue.version})")
+        except Exception as e:
+            print(f"⚠️ Could not refresh form catalogue: {e}")
     
     def _dismiss_popups(self):
         """Dismiss any popup windows that appear on the page"""
@@ -1405,7 +2372,21 @@ class OrbitaFormFillerV2:
             print(f"⚠️ Error dismissing popups: {e}")
     
     def _fill_orbita_form(self, ad_text: str, parameters: Dict[str, str], image_paths: List[str]) -> bool:
-        """Fill the Orbita form with ad data"""
+        """Fill the Orbita form with ad data; True if the ad was posted"""
+        try:
+            return self._submit_ad(ad_text, parameters, image_paths)
+        except Exception as e:
+            print(f"❌ Ad not posted: {e}")
+            return False
+    
+    def _submit_ad(self, ad_text: str, parameters: Dict[str, str], image_paths: List[str],
+                   on_submit: Optional[Callable[[], None]] = None,
+                   on_ad_id: Optional[Callable[[str], None]] = None) -> bool:
+        """Fill and submit the form; returns True or raises (StageError for classified failures)
+        
+        on_submit is called right before the submit button is clicked, on_ad_id with
+        the ad id from the submit redirect (if there is one).
+        """
         try:
             print("📝 Filling Orbita form...")
             
@@ -1522,6 +2503,7 @@ class OrbitaFormFillerV2:
             
             # Fill extracted parameters from OpenAI/fallback
             print("🏠 Filling extracted apartment parameters...")
+            self._refresh_form_catalogue()
             self._fill_apartment_parameters(parameters)
             
             # Fill contact information
@@ -1569,7 +2551,12 @@ class OrbitaFormFillerV2:
             
             time.sleep(config.STEP_DELAY)
             
+            # Last moment before the ad can go out
+            if on_submit:
+                on_submit()
+            
             # Submit form with multiple selectors and better error handling
+            submit_response = None
             try:
                 print("🚀 Submitting form...")
                 submit_selectors = [
@@ -1587,210 +2574,153 @@ class OrbitaFormFillerV2:
                 
                 submitted = False
                 for selector in submit_selectors:
+                    if self.page.locator(selector).count() == 0:
+                        continue
                     try:
-                        if self.page.locator(selector).count() > 0:
-                            self.page.click(selector)
-                            print("✅ Form submitted successfully!")
-                            time.sleep(5)  # Wait for submission response
-                            submitted = True
-                            break
-                    except:
+                        submit_response = click_and_wait_for_post(self.page, selector, "/my/add")
+                    except Exception as e:
+                        # The click itself failed - nothing was sent, try the next control
+                        print(f"⚠️ Could not click {selector}: {e}")
                         continue
+                    submitted = True
+                    break
                 
                 if not submitted:
                     print("❌ Submit button not found")
-                    return False
+                    raise StageError(NETWORK, "submit button not found (form did not load)")
+                if submit_response is None:
+                    # Clicked, but the POST was not seen - the ad may or may not be online
+                    raise StageError(NETWORK, "no form POST observed after submit - outcome unknown",
+                                     retryable=False)
+                print("✅ Form submitted!")
+                
+                ad_id = extract_ad_id(submit_response.headers.get('location'), self.page.url)
+                if ad_id:
+                    print(f"🆔 Ad id: {ad_id}")
+                    if on_ad_id:
+                        on_ad_id(ad_id)
                     
+            except StageError:
+                raise
             except Exception as e:
                 print(f"❌ Form submission failed: {e}")
-                return False
+                # The POST may have gone out - retrying could post the ad twice
+                raise StageError(classify_error(e), f"form submission failed: {e}", retryable=False)
             
-            # Check if submission was successful with proper URL and content checks
+            # Check if submission was successful from the POST response, URL and targeted locators
             print("⏳ Checking submission result...")
-            time.sleep(3)  # Additional wait for page to load
             
             try:
-                current_url = self.page.url
-                page_content = self.page.content().lower()
+                outcome = self._classify_submission(submit_response)
                 
-                # Primary success indicator - URL parameter
-                if "addsuccess=1" in current_url:
-                    print("🎉 SUCCESS! Ad posted successfully! (URL success parameter found)")
+                if outcome == 'success':
+                    print("🎉 SUCCESS! Ad posted successfully!")
                     return True
-                
-                # Authentication check - redirected to login
-                elif "passport.orbita.co.il/site/login" in current_url:
+                elif outcome == 'login':
                     print("❌ Redirected to login - authentication issue")
-                    return False
+                    raise StageError(SESSION, "redirected to login after submit")
+                elif outcome == 'error':
+                    raise StageError(VALIDATION, "the form rejected the ad")
+                
+                # Unclassified - only now capture and scan the full page
+                print(f"🤔 Unclassified page after submission: {self.page.url}")
+                page_content = capture_unclassified_page(self.page, "submission")
+                
+                russian_success_phrases = [
+                    "объявление добавлено",
+                    "объявление создано", 
+                    "успешно добавлено",
+                    "спасибо",
+                    "добавлено",
+                    "успешно",
+                    "размещено",
+                    "опубликовано"
+                ]
                 
-                # Still on form page - check for validation errors
-                elif "my/add" in current_url:
-                    print("⚠️ Still on form page - checking for validation errors...")
-                    
-                    # Check for Russian success phrases first
-                    russian_success_phrases = [
-                        "объявление добавлено",
-                        "объявление создано", 
-                        "успешно добавлено",
-                        "спасибо",
-                        "размещено",
-                        "опубликовано"
-                    ]
-                    
-                    if any(phrase in page_content for phrase in russian_success_phrases):
-                        print("✅ SUCCESS! Ad posted successfully! (Russian success message found)")
-                        return True
-                    
-                    # Check for validation errors
-                    try:
-                        error_elements = self.page.locator('.alert, .error, .help-block, .text-danger, .invalid-feedback').all()
-                        errors_found = []
-                        for element in error_elements:
-                            error_text = element.text_content()
-                            if error_text and error_text.strip():
-                                errors_found.append(error_text.strip())
-                                print(f"❌ Form error: {error_text}")
-                        
-                        if errors_found:
-                            return False
-                        else:
-                            print("⚠️ No clear success or error indicators - assuming success")
-                            return True
-                            
-                    except Exception as e:
-                        print(f"⚠️ Could not check for errors: {e}")
-                        return True  # Assume success if can't check
+                current_url = self.page.url
+                success_indicators = [
+                    "success" in current_url,
+                    "thank" in current_url,
+                    any(phrase in page_content for phrase in russian_success_phrases)
+                ]
                 
-                # Other pages - check for success indicators
-                else:
-                    print(f"🤔 Unexpected page after submission: {current_url}")
-                    
-                    # Check for success indicators in content
-                    success_indicators = [
-                        "success" in current_url,
-                        "thank" in current_url,
-                        "добавлено" in current_url,
-                        any(phrase in page_content for phrase in ["спасибо", "добавлено", "успешно", "размещено"])
-                    ]
-                    
-                    if any(success_indicators):
-                        print("✅ SUCCESS! Ad posted successfully! (Success indicators found)")
-                        return True
-                    else:
-                        print("⚠️ Unclear result - assuming success")
-                        return True  # Assume success if unclear
+                if any(success_indicators):
+                    print("✅ SUCCESS! Ad posted successfully! (Success indicators found)")
+                    return True
+                
+                # The POST went out but the result is unknown - left for reconcile_submitting()
+                print("⚠️ Unclear result after submission")
+                raise StageError(NETWORK, "unclear result after submit - outcome unknown", retryable=False)
                         
+            except StageError:
+                raise
             except Exception as e:
                 print(f"⚠️ Could not check submission status: {e}")
-                return True  # Assume success if can't check
+                raise StageError(classify_error(e), f"could not check submission status: {e}", retryable=False)
                 
+        except StageError:
+            raise
         except Exception as e:
             print(f"❌ Form filling failed: {e}")
             traceback.print_exc()  # Print full error trace for debugging
-            return False
+            raise
+    
+    def _classify_submission(self, submit_response) -> str:
+        """Classify the add-form outcome: 'success', 'login', 'error' or 'unknown'"""
+        current_url = self.page.url
+        location = ""
+        if submit_response is not None:
+            location = submit_response.headers.get('location', '') or ""
+        
+        # Primary success indicator - URL parameter (final URL or redirect target)
+        if "addsuccess=1" in current_url or "addsuccess=1" in location:
+            return 'success'
+        
+        # Authentication check - redirected to login
+        if "passport.orbita.co.il/site/login" in current_url or "passport.orbita.co.il/site/login" in location:
+            return 'login'
+        
+        # Validation errors shown on the form
+        error_texts = visible_error_texts(self.page, ".alert-danger, .has-error, .has-error .help-block, .invalid-feedback")
+        if error_texts:
+            for error_text in error_texts:
+                print(f"❌ Form error: {error_text}")
+            return 'error'
+        
+        if self.page.locator(".alert-success:visible").count() > 0:
+            return 'success'
+        
+        return 'unknown'
     
     def _fill_apartment_parameters(self, parameters: Dict[str, str]):
         """Fill apartment parameters fields based on extracted data"""
         try:
-            # Rooms - using select dropdown with value mapping like in old working version
-            if 'rooms' in parameters:
-                print(f"🚪 Filling rooms: {parameters['rooms']}")
-                try:
-                    rooms_value = parameters['rooms']
-                    # Map room values to option values (from working old version)
-                    room_mapping = {
-                        "1": "77", "1.5": "78", "2": "79", "2.5": "80",
-                        "3": "81", "3.5": "82", "4": "83", "4.5": "84", 
-                        "5": "85", "5.5": "86", "6+": "87"
-                    }
-                    
-                    option_value = room_mapping.get(rooms_value, "0")  # Default to "Не указано"
-                    
-                    room_selectors = [
-                        'select[name="room"]',
-                        'select#room',
-                        'select:has(option[value="81"])'  # Has option for 3 rooms
-                    ]
-                    
-                    for selector in room_selectors:
-                        try:
-                            if self.page.locator(selector).count() > 0:
-                                self.page.select_option(selector, value=option_value)
-                                print(f"✅ Rooms filled successfully: {rooms_value} (option value: {option_value})")
-                                break
-                        except:
-                            continue
-                    else:
-                        print("⚠️ Rooms select field not found")
-                        
-                except Exception as e:
-                    print(f"❌ Error filling rooms: {e}")
-            
-            # Floor - using select dropdown with value mapping
-            if 'floor' in parameters:
-                print(f"🏢 Filling floor: {parameters['floor']}")
-                try:
-                    floor_value = parameters['floor']
-                    # Map floor values to option values (from working old version)
-                    floor_mapping = {
-                        "0": "57", "1": "58", "2": "59", "3": "60", "4": "61",
-                        "5": "62", "6": "63", "7": "64", "8": "65", "9": "66",
-                        "10+": "67"
-                    }
-                    
-                    option_value = floor_mapping.get(floor_value, "0")  # Default to "Не указано"
-                    
-                    floor_selectors = [
-                        'select[name="floor"]',
-                        'select#floor',
-                        'select.floor-select'
-                    ]
-                    
-                    for selector in floor_selectors:
-                        try:
-                            if self.page.locator(selector).count() > 0:
-                                self.page.select_option(selector, value=option_value)
-                                print(f"✅ Floor filled successfully: {floor_value} (option value: {option_value})")
-                                break
-                        except:
-                            continue
-                    else:
-                        print("⚠️ Floor select field not found")
-                        
-                except Exception as e:
-                    print(f"❌ Error filling floor: {e}")
-            
-            # Furniture - using select dropdown with value mapping
-            if 'furniture' in parameters:
-                print(f"🛋️ Filling furniture: {parameters['furniture']}")
+            # Rooms / floor / furniture - option values come from the form catalogue
+            for field, select, icon in (('rooms', 'room', '🚪'), ('floor', 'floor', '🏢'),
+                                        ('furniture', 'furniture', '🛋️')):
+                if field not in parameters:
+                    continue
+                print(f"{icon} Filling {field}: {parameters[field]}")
                 try:
-                    furniture_value = parameters['furniture'].lower()
-                    # Map furniture values to option values (from working old version)
-                    furniture_mapping = {
-                        "да": "26", "нет": "27", "частично": "28"
-                    }
-                    
-                    option_value = furniture_mapping.get(furniture_value, "0")  # Default to "Не указано"
-                    
-                    furniture_selectors = [
-                        'select[name="furniture"]',
-                        'select#furniture',
-                        'select.furniture-select'
-                    ]
+                    option_value = self.form_catalogue.option_value(select, parameters[field])
+                    if option_value is None:
+                        print(f"⚠️ No '{select}' option for {parameters[field]!r}, leaving it empty")
+                        continue
                     
-                    for selector in furniture_selectors:
+                    selectors = [f'select[name="{select}"]', f'select#{select}']
+                    for selector in selectors:
                         try:
                             if self.page.locator(selector).count() > 0:
                                 self.page.select_option(selector, value=option_value)
-                                print(f"✅ Furniture filled successfully: {furniture_value} (option value: {option_value})")
+                                print(f"✅ {field.capitalize()} filled successfully: {parameters[field]} (option value: {option_value})")
                                 break
                         except:
                             continue
                     else:
-                        print("⚠️ Furniture select field not found")
+                        print(f"⚠️ {field.capitalize()} select field not found")
                         
                 except Exception as e:
-                    print(f"❌ Error filling furniture: {e}")
+                    print(f"❌ Error filling {field}: {e}")
             
             # Price - using input field
             if 'price' in parameters:
@@ -1851,17 +2781,21 @@ class OrbitaFormFillerV2:
             if email_input.is_visible() and self.current_account_email:
                 email_input.fill(self.current_account_email)
             
-            # Phone prefix - select '055' (value="92")
+            # Phone prefix - option value of config.CONTACT_PHONE_PREFIX from the catalogue
             phone_code_select = self.page.locator("select[name='phonecode']")
             if phone_code_select.is_visible():
-                phone_code_select.select_option(value="92")  # 055 prefix
-                print("✅ Selected phone prefix: 055")
+                phone_code = self.form_catalogue.option_value('phonecode', config.CONTACT_PHONE_PREFIX)
+                if phone_code:
+                    phone_code_select.select_option(value=phone_code)
+                else:
+                    phone_code_select.select_option(label=config.CONTACT_PHONE_PREFIX)
+                print(f"✅ Selected phone prefix: {config.CONTACT_PHONE_PREFIX}")
             
             # Phone number - use hardcoded number
             phone_input = self.page.locator("input[name='phonenum']")
             if phone_input.is_visible():
                 phone_input.fill("5072867")  # Hardcoded phone number
-                print("✅ Filled phone number: 055-5072867")
+                print(f"✅ Filled phone number: {config.CONTACT_PHONE_PREFIX}-5072867")
             
         except Exception as e:
             print(f"⚠️ Contact info filling error: {e}")
@@ -1870,6 +2804,7 @@ class OrbitaFormFillerV2:
         """Solve reCAPTCHA on the form"""
         try:
             if not hasattr(self, 'solver') or not self.solver:
+                from twocaptcha import TwoCaptcha
                 self.solver = TwoCaptcha(config.CAPTCHA_API_KEY) if config.CAPTCHA_API_KEY != "your_2captcha_api_key_here" else None
             
             if not self.solver:
@@ -1943,7 +2878,9 @@ class OrbitaFormFillerV2:
     
     def _load_processed_ads(self) -> set:
         """Load list of already processed ads"""
-        processed = set()
+        # The log line of an ad can be lost in a crash, its bundle status is written first
+        processed = {meta['folder_id'] for meta in self.bundle_store.list_bundles()
+                     if meta.get('status') in POSTED_STATUSES}
         try:
             if os.path.exists(self.processed_ads_log):
                 with open(self.processed_ads_log, 'r', encoding='utf-8') as f:
@@ -1976,38 +2913,133 @@ class OrbitaFormFillerV2:
                 self.browser.close()
             if self.tor_changer:
                 self.tor_changer.stop_tor()
+            if self.network_recorder:
+                self.network_recorder.close()
+            self.drive_client.close()
             
             print("🧹 Cleanup completed")
             
         except Exception as e:
             print(f"⚠️ Cleanup error: {e}")
 
+def print_status(processed_ads_log: str = "processed_ads_v2.log"):
+    """Print processed-ads summary without starting any subsystem"""
+    entries = []
+    try:
+        if os.path.exists(processed_ads_log):
+            with open(processed_ads_log, 'r', encoding='utf-8') as f:
+                entries = [line.strip() for line in f if '#' in line]
+    except Exception as e:
+        print(f"⚠️ Could not read processed ads log: {e}")
+    
+    print("=" * 60)
+    print("📊 ORBITA FORM FILLER V2.0 - STATUS")
+    print("=" * 60)
+    print(f"📁 Drive path: {config.GOOGLE_DRIVE_PATH}")
+    print(f"✅ Processed ads: {len(entries)} ({processed_ads_log})")
+    if entries:
+        print(f"🕒 Last: {entries[-1]}")
+    print(f"🧅 Tor: {'enabled' if config.USE_TOR_IP_ROTATION else 'disabled'}")
+    if os.path.isdir(config.BUNDLE_STORE_DIR):
+        counts = AdBundleStore(config.BUNDLE_STORE_DIR).status_counts()
+        print(f"📦 Bundles: {', '.join(f'{status} {count}' for status, count in sorted(counts.items())) or 'none'}")
+    print("=" * 60)
+
+def run_offline_stage(stage: str, workers: int, folder_filter: Optional[FolderFilter] = None):
+    """Run the sync or prepare stage (no browser, no Tor)"""
+    print("=" * 60)
+    print(f"📦 ORBITA FORM FILLER V2.0 - {stage.upper()} STAGE")
+    print("=" * 60)
+    
+    filler = OrbitaFormFillerV2()
+    filler.folder_filter = folder_filter
+    try:
+        if stage == "sync":
+            if not filler.initialize(use_tor=False):
+                print("❌ Initialization failed")
+                return
+            stats = filler.sync_ads()
+        else:
+            stats = filler.prepare_ads(workers)
+        
+        print("\n" + "=" * 60)
+        print(f"📊 {stage.upper()}: " + ", ".join(f"{key} {value}" for key, value in stats.items()))
+        print(f"📦 Bundles: {filler.bundle_store.status_counts()}")
+        print(f"🔁 Retries: {filler.retry_policy.get_stats()}")
+        if filler.drive_client:
+            print(f"🚦 Drive rate limiter: {filler.drive_client.rate_limiter.get_stats()}")
+        print("=" * 60)
+    except KeyboardInterrupt:
+        print("\n⚠️ Process interrupted by user")
+    finally:
+        filler.cleanup()
+
 def main():
     """Main execution function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Orbita Form Filler v2.0")
+    parser.add_argument("--status", action="store_true",
+                        help="Print processed-ads summary and exit (no browser, Drive or OpenAI)")
+    parser.add_argument("--stage", choices=["sync", "prepare", "post", "all"],
+                        help="Run pipeline stages through the local bundle store "
+                             "(default: sync, prepare and post folder by folder)")
+    parser.add_argument("--workers", type=int, default=config.PREPARE_WORKERS,
+                        help="Parallel workers for the prepare stage")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from the bundle store: reconcile ads left in "
+                             "'submitting' state, then post the remaining prepared ads (no Drive)")
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+    folder_filter = FolderFilter.from_args(args)
+    
+    if args.resume:
+        args.stage = "post"
+    
+    if args.status:
+        print_status()
+        return
+    
+    if args.stage in ("sync", "prepare"):
+        run_offline_stage(args.stage, args.workers, folder_filter)
+        return
+    
     print("=" * 60)
     print("🎯 ORBITA FORM FILLER V2.0 - ENHANCED ALGORITHM")
     print("=" * 60)
     
     filler = OrbitaFormFillerV2()
+    filler.folder_filter = folder_filter
     
     try:
-        # Initialize
-        if not filler.initialize():
+        # Initialize (the post stage reads the bundle store only)
+        if not filler.initialize(use_drive=args.stage != "post"):
             print("❌ Initialization failed")
             return
         
+        # Staged run: Drive and extraction work is done before the browser starts
+        if args.stage == "all":
+            filler.sync_ads()
+            filler.prepare_ads(args.workers)
+        
         # Start browser
         if not filler.start_browser():
             print("❌ Browser start failed")
             return
         
+        # Ads a crashed run may already have sent are checked before anything is posted
+        filler.reconcile_submitting()
+        
         # Register and login
         if not filler.register_and_login():
             print("❌ Registration/login failed")
             return
         
         # Process all ads
-        stats = filler.process_all_ads()
+        if args.stage in ("post", "all"):
+            stats = filler.post_ads()
+        else:
+            stats = filler.process_all_ads()
         
         # Print final statistics
         print("\n" + "=" * 60)
@@ -2017,7 +3049,21 @@ def main():
         print(f"❌ Failed: {stats['failed']}")
         print(f"⏭️ Skipped (already processed): {stats['skipped']}")
         print(f"⚪ Skipped (empty documents): {stats['empty']}")
+        print(f"🚫 Skipped (invalid parameters): {stats['invalid']}")
         print(f"📧 Account used: {filler.current_account_email}")
+        if filler.extractor and filler.extractor is not filler.openai_extractor:
+            print(f"🧮 Extractor ({filler.extractor.name}): {filler.extractor.get_stats()}")
+        if filler.openai_extractor:
+            ai = filler.openai_extractor.get_stats()
+            print(f"🤖 OpenAI: {ai['api_calls']} calls, {ai['total_tokens']} tokens "
+                  f"({ai['cached_tokens']} cached prompt tokens), {ai['fallbacks']} local fallbacks, "
+                  f"prompt {ai['prompt_version']}")
+            circuit = ai['circuit']
+            print(f"🔌 OpenAI circuit: {circuit['state']} (opened {circuit['opened']}x, "
+                  f"{circuit['short_circuited']} calls skipped, {circuit['probes']} probes)")
+        print(f"🔁 Retries: {filler.retry_policy.get_stats()}")
+        if filler.drive_client:
+            print(f"🚦 Drive rate limiter: {filler.drive_client.rate_limiter.get_stats()}")
         print("=" * 60)
         
     except KeyboardInterrupt:
@@ -0,0 +1,199 @@
+"""
+Quota-aware rate limiting for Google Drive API calls
+
+Every Drive request takes a token from a token bucket shared by all
+threads. The refill rate adapts to the quota: a 403 userRateLimitExceeded /
+rateLimitExceeded or a 429 halves it, every successful call raises it a
+little again (AIMD), so the client settles just below the quota instead of
+sleeping a fixed time between calls.
+
+Throttled and transient (5xx, connection) errors are retried with jittered
+exponential backoff (Retry-After is honoured), so a quota hiccup does not
+fail an ad. Other errors are raised immediately.
+"""
+
+import time
+import random
+import threading
+from typing import Callable, Dict, Optional
+
+import config
+
+THROTTLE_REASONS = ("userRateLimitExceeded", "rateLimitExceeded", "quotaExceeded")
+TRANSIENT_STATUSES = (500, 502, 503, 504)
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of a googleapiclient HttpError (or fake_drive.FakeDriveError)"""
+    status = getattr(error, 'status', None) or getattr(getattr(error, 'resp', None), 'status', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """'throttled', 'transient' or None (not worth retrying)"""
+    status = error_status(error)
+    details = str(error)
+    content = getattr(error, 'content', b'')
+    if isinstance(content, bytes):
+        details += content.decode('utf-8', 'replace')
+
+    if status == 429 or (status == 403 and any(reason in details for reason in THROTTLE_REASONS)):
+        return "throttled"
+    if status in TRANSIENT_STATUSES:
+        return "transient"
+    if status is None and isinstance(error, (ConnectionError, TimeoutError)):
+        return "transient"
+    return None
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Retry-After header of a throttled response, in seconds"""
+    resp = getattr(error, 'resp', None)
+    value = resp.get('retry-after') if hasattr(resp, 'get') else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose rate can be changed on the fly"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns the time waited"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the token now (the balance may go negative) so waiters are served in order
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def set_rate(self, rate: float):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = rate
+
+
+class RateLimiter:
+    """Adaptive token bucket + retries around API calls"""
+
+    def __init__(self, name: str, rate: float, min_rate: float, max_rate: float, burst: int,
+                 max_retries: int, backoff_base: float, backoff_max: float):
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # rate 0 = no token bucket (retries only), e.g. for fake_drive benchmarks
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self._stats_lock = threading.Lock()
+        self.stats = {'calls': 0, 'throttled': 0, 'transient_errors': 0, 'retries': 0, 'gave_up': 0,
+                      'wait_seconds': 0.0, 'backoff_seconds': 0.0}
+
+    @classmethod
+    def unlimited(cls, name: str) -> 'RateLimiter':
+        """No rate limit, same retry behaviour"""
+        return cls(name, rate=0, min_rate=0, max_rate=0, burst=0, max_retries=config.DRIVE_MAX_RETRIES,
+                   backoff_base=config.DRIVE_BACKOFF_BASE, backoff_max=config.DRIVE_BACKOFF_MAX)
+
+    def call(self, func: Callable, *args, **kwargs):
+        """func(*args, **kwargs) within the rate limit, retrying throttled/transient errors"""
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire() if self.bucket else 0.0
+            self._count('wait_seconds', waited)
+            self._count('calls')
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                kind = classify_error(e)
+                if kind is None:
+                    raise
+                if kind == "throttled":
+                    self._count('throttled')
+                    self._slow_down()
+                else:
+                    self._count('transient_errors')
+
+                if attempt >= self.max_retries:
+                    self._count('gave_up')
+                    raise
+
+                # Full jitter: spread retries of parallel workers apart
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+                delay = max(delay, retry_after(e) or 0.0)
+                attempt += 1
+                self._count('retries')
+                self._count('backoff_seconds', delay)
+                print(f"⏳ {self.name} {kind} (HTTP {error_status(e)}), retry {attempt}/{self.max_retries} "
+                      f"in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            self._speed_up()
+            return result
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['rate'] = round(self.bucket.rate, 2) if self.bucket else None
+        stats['wait_seconds'] = round(stats['wait_seconds'], 2)
+        stats['backoff_seconds'] = round(stats['backoff_seconds'], 2)
+        return stats
+
+    def _slow_down(self):
+        if not self.bucket:
+            return
+        rate = max(self.min_rate, self.bucket.rate / 2)
+        if rate < self.bucket.rate:
+            print(f"🐢 {self.name} quota hit, rate {self.bucket.rate:.1f} -> {rate:.1f} req/s")
+        self.bucket.set_rate(rate)
+
+    def _speed_up(self):
+        # Additive increase: max_rate / 100 per successful call
+        if self.bucket and self.bucket.rate < self.max_rate:
+            self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.max_rate / 100))
+
+    def _count(self, key: str, value: float = 1):
+        with self._stats_lock:
+            self.stats[key] += value
+
+
+_drive_limiter = None
+_drive_limiter_lock = threading.Lock()
+
+
+def drive_rate_limiter() -> RateLimiter:
+    """Limiter shared by every GoogleDriveClient in the process (the quota is per user)"""
+    global _drive_limiter
+    with _drive_limiter_lock:
+        if _drive_limiter is None:
+            _drive_limiter = RateLimiter(
+                "Drive",
+                rate=config.DRIVE_RATE_LIMIT,
+                min_rate=config.DRIVE_RATE_MIN,
+                max_rate=config.DRIVE_RATE_MAX,
+                burst=config.DRIVE_RATE_BURST,
+                max_retries=config.DRIVE_MAX_RETRIES,
+                backoff_base=config.DRIVE_BACKOFF_BASE,
+                backoff_max=config.DRIVE_BACKOFF_MAX
+            )
+        return _drive_limiter
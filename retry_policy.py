@@ -0,0 +1,131 @@
+"""
+Per-stage retry policy for the sync / prepare / login / post stages
+
+Errors are classified first:
+
+    network     - timeouts, connection resets, Drive 5xx/quota, pages that did not load
+    browser     - the browser, context or page crashed or was closed
+    session     - the site logged us out (redirect to the login page)
+    validation  - the site rejected what we sent (form errors, refused registration)
+    data        - bad input (missing files, unparsable documents) and any
+                  error that is not recognised - never retried
+
+Each stage has its own retry budget per error kind and its own backoff
+(config.RETRY_POLICIES). Only the failed stage is retried: sync, prepare
+and post keep their outputs in the bundle store, so a post retry never
+downloads from Drive or calls OpenAI again. A recovery action per error
+kind (e.g. restart the browser after a crash) runs before the retry.
+"""
+
+import time
+import random
+import socket
+import ssl
+import threading
+import http.client
+from typing import Callable, Dict, Optional
+
+import config
+from rate_limiter import error_status, classify_error as classify_api_error
+
+NETWORK = "network"
+BROWSER = "browser"
+SESSION = "session"
+VALIDATION = "validation"
+DATA = "data"
+
+# Playwright raises plain Error/TimeoutError - the message tells what happened
+BROWSER_ERROR_MARKERS = ("has been closed", "Target closed", "browser has disconnected", "crashed",
+                         "Browser closed")
+NETWORK_ERROR_MARKERS = ("Timeout", "timed out", "net::ERR_", "NS_ERROR_", "Connection reset",
+                         "Connection refused", "Connection aborted", "RemoteDisconnected", "ServerNotFoundError")
+NETWORK_ERRORS = (ConnectionError, TimeoutError, socket.gaierror, ssl.SSLError, http.client.HTTPException)
+
+
+class StageError(Exception):
+    """A stage failure whose kind is already known"""
+
+    def __init__(self, kind: str, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.kind = kind
+        # False when retrying could do harm (e.g. the form may already have been submitted)
+        self.retryable = retryable
+
+
+def classify_error(error: Exception) -> str:
+    """network, browser, session, validation or data"""
+    if isinstance(error, StageError):
+        return error.kind
+    if classify_api_error(error):
+        return NETWORK  # Drive quota/5xx errors the rate limiter gave up on
+
+    status = error_status(error)
+    if status is not None and 400 <= status < 500 and status not in (408, 429):
+        return DATA  # File not found, no access, ...
+
+    message = f"{type(error).__name__}: {error}"
+    if any(marker in message for marker in BROWSER_ERROR_MARKERS):
+        return BROWSER
+    if isinstance(error, NETWORK_ERRORS) or any(marker in message for marker in NETWORK_ERROR_MARKERS):
+        return NETWORK
+    # Everything else (bad data, bugs, unknown errors) is not retried - retrying
+    # a bug only repeats it, and a retried post could send the form twice
+    return DATA
+
+
+class RetryPolicy:
+    """Runs stage functions with per-stage, per-error-kind retry budgets"""
+
+    def __init__(self, policies: Optional[Dict[str, Dict]] = None):
+        self.policies = policies or config.RETRY_POLICIES
+        self._stats_lock = threading.Lock()
+        self.stats = {}
+
+    def run(self, stage: str, func: Callable, *args, recover: Optional[Dict[str, Callable[[], bool]]] = None,
+            attempts: Optional[int] = None, **kwargs):
+        """func(*args, **kwargs), retried as the stage policy allows; the last error is re-raised
+
+        recover maps an error kind to a callable run before the retry (False = give up).
+        attempts caps the total number of attempts.
+        """
+        policy = self.policies.get(stage, {})
+        budgets = dict(policy.get('retries', {}))
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                result = func(*args, **kwargs)
+                self._count(stage, 'ok')
+                return result
+            except Exception as e:
+                kind = classify_error(e)
+                self._count(stage, kind)
+
+                if (not getattr(e, 'retryable', True) or budgets.get(kind, 0) <= 0 or
+                        (attempts is not None and attempt >= attempts)):
+                    self._count(stage, 'gave_up')
+                    raise
+                budgets[kind] -= 1
+
+                delay = min(policy.get('backoff_max', 60.0), policy.get('backoff', 2.0) * (2 ** (attempt - 1)))
+                delay *= random.uniform(0.5, 1.0)
+                print(f"🔁 {stage}: {kind} error ({e}) - retry in {delay:.1f}s "
+                      f"({budgets[kind]} {kind} retries left)")
+                self._count(stage, 'retries')
+                time.sleep(delay)
+
+                action = (recover or {}).get(kind)
+                if action and not action():
+                    print(f"❌ {stage}: could not recover from {kind} error")
+                    self._count(stage, 'gave_up')
+                    raise
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        with self._stats_lock:
+            return {stage: dict(counts) for stage, counts in self.stats.items()}
+
+    def _count(self, stage: str, key: str):
+        with self._stats_lock:
+            counts = self.stats.setdefault(stage, {})
+            counts[key] = counts.get(key, 0) + 1
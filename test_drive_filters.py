@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the Drive folder filters and the daemon's posting windows
+"""
+
+import io
+import sys
+import argparse
+import contextlib
+from datetime import datetime
+
+from drive_filters import FolderFilter, add_filter_arguments, digit_prefixes, widen_date_range
+from orbita_daemon import in_posting_window, seconds_until_window
+
+# (low, high, expected prefixes)
+PREFIX_CASES = [
+    ("20250115", "20250131", ["20250115", "20250116", "20250117", "20250118", "20250119", "2025012",
+                              "20250130", "20250131"]),
+    ("20250300", "20250399", ["202503"]),
+    ("20240000", "20259999", ["2024", "2025"]),
+    ("0930", "0930", ["0930"]),
+    ("0000", "9999", [""]),
+]
+
+# (low, high, expected widened range)
+WIDEN_CASES = [
+    ("20240101", "20251231", ("20240000", "20259999")),
+    ("20240101", "20250228", ("20240000", "20250299")),
+    ("20250301", "20250331", ("20250300", "20250399")),
+    ("20250115", "20250120", ("20250115", "20250120")),
+    ("20240201", "20240229", ("20240200", "20240299")),  # Leap year
+]
+
+# (now, windows, inside, seconds until the window opens)
+WINDOW_CASES = [
+    (datetime(2025, 3, 1, 10, 0), ["09:00-18:00"], True, 0),
+    (datetime(2025, 3, 1, 8, 30), ["09:00-18:00"], False, 1800),
+    (datetime(2025, 3, 1, 23, 30), ["22:00-02:00"], True, 0),
+    (datetime(2025, 3, 1, 1, 59), ["22:00-02:00"], True, 0),
+    (datetime(2025, 3, 1, 2, 0), ["22:00-02:00"], False, 20 * 3600),
+    (datetime(2025, 3, 1, 18, 0), ["09:00-12:00", "14:00-18:00"], False, 15 * 3600),
+    (datetime(2025, 3, 1, 3, 0), [], True, 0),
+]
+
+
+def test_filters() -> bool:
+    ok = True
+
+    for low, high, expected in PREFIX_CASES:
+        prefixes = digit_prefixes(low, high)
+        if prefixes != expected:
+            print(f"❌ digit_prefixes({low}, {high}): expected {expected}, got {prefixes}")
+            ok = False
+
+    for low, high, expected in WIDEN_CASES:
+        widened = widen_date_range(low, high)
+        if widened != expected:
+            print(f"❌ widen_date_range({low}, {high}): expected {expected}, got {widened}")
+            ok = False
+
+    # Bad times are rejected by argparse, relative ones are kept as given
+    parser = argparse.ArgumentParser()
+    add_filter_arguments(parser)
+    for value, valid in [("2025-03-01", True), ("2025-03-01T08:00", True), ("7d", True), ("12h", True),
+                         ("yesterday", False), ("2025-13-01", False)]:
+        try:
+            with contextlib.redirect_stderr(io.StringIO()):
+                args = parser.parse_args(["--created-after", value])
+            if not valid or args.created_after != value:
+                print(f"❌ --created-after {value}: accepted as {args.created_after!r}")
+                ok = False
+        except SystemExit:
+            if valid:
+                print(f"❌ --created-after {value}: rejected")
+                ok = False
+
+    # Drive's 'name contains' matches any word prefix - matches() checks the real prefix
+    folder_filter = FolderFilter(name_prefix="Квартира")
+    for name, expected in [("Квартира Ремез", True), ("Большая Квартира", False), ("квартира", False)]:
+        if folder_filter.matches({'name': name}) != expected:
+            print(f"❌ name prefix 'Квартира' on {name!r}: expected {expected}")
+            ok = False
+
+    folder_filter = FolderFilter(name_from="20250110", name_to="20250120")
+    for name, expected in [("20250109", False), ("20250110", True), ("20250120", True), ("20250121", False)]:
+        if folder_filter.matches({'name': name}) != expected:
+            print(f"❌ name range on {name!r}: expected {expected}")
+            ok = False
+
+    for now, windows, inside, seconds in WINDOW_CASES:
+        if in_posting_window(now, windows) != inside or seconds_until_window(now, windows) != seconds:
+            print(f"❌ {now:%H:%M} {windows}: expected {inside}/{seconds}s, "
+                  f"got {in_posting_window(now, windows)}/{seconds_until_window(now, windows)}s")
+            ok = False
+
+    print(f"{'✅' if ok else '❌'} Drive filters and posting windows")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if test_filters() else 1)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test script for the add-form option catalogue (built from the saved page.html)
+"""
+
+import sys
+from form_catalogue import FormCatalogue
+
+# (parameters, expected normalized values, fields expected to be invalid)
+CASES = [
+    ({'rooms': "4,5", 'floor': "3", 'furniture': "да", 'price': "2,500,000", 'district': " Ремез "},
+     {'rooms': "4.5", 'floor': "3", 'furniture': "Да", 'price': "2500000", 'district': "Ремез"}, []),
+    ({'rooms': "7", 'floor': "14", 'furniture': "Частично"},
+     {'rooms': "6+", 'floor': "10+", 'furniture': "Частично"}, []),
+    ({'rooms': "2.25", 'floor': "первый", 'furniture': "может быть", 'price': "договорная"},
+     {}, ['rooms', 'floor', 'furniture', 'price']),
+    # The sign must survive: basement floor "-1" is not floor "1"
+    ({'rooms': "-2", 'floor': "-1", 'price': "-500000"}, {}, ['rooms', 'floor', 'price']),
+]
+
+def test_catalogue() -> bool:
+    catalogue = FormCatalogue.from_saved_form()
+    print(f"📚 {len(catalogue.selects)} selects, version {catalogue.version}")
+    # page.html has no #dyncon selects - those come from the hand-copied fixture
+    print(f"⚠️ Not checked against a real capture: {', '.join(catalogue.unverified)}")
+
+    ok = True
+    for select, label, value in [('room', "3", "81"), ('floor', "10+", "67"), ('furniture', "нет", "27"),
+                                 ('phonecode', "055", "92"), ('board', "Квартиры - Продам", None)]:
+        found = catalogue.option_value(select, label)
+        if found is None or (value and found != value):
+            print(f"❌ {select}/{label}: expected {value or 'an option'}, got {found}")
+            ok = False
+
+    for parameters, expected, invalid in CASES:
+        normalized, errors = catalogue.validate_parameters(parameters)
+        for field, value in expected.items():
+            if normalized.get(field) != value:
+                print(f"❌ {field}: expected {value!r}, got {normalized.get(field)!r}")
+                ok = False
+        if sorted(errors) != sorted(invalid):
+            print(f"❌ Invalid fields: expected {invalid}, got {errors}")
+            ok = False
+
+    print(f"{'✅' if ok else '❌'} Form catalogue")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if test_catalogue() else 1)
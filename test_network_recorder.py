@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for request body recording in the network recorder (no browser needed)
+"""
+
+import sys
+import shutil
+import tempfile
+
+from network_recorder import NetworkRecorder
+
+JPEG = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00\xff\xdb'
+
+
+class FakeRequest:
+    """The parts of a Playwright Request the recorder reads"""
+
+    def __init__(self, url: str, body: bytes, content_type: str, method: str = "POST"):
+        self.url = url
+        self.method = method
+        self.resource_type = "document"
+        self.headers = {"content-type": content_type, "cookie": "PHPSESSID=secret-session"}
+        self.post_data_buffer = body
+
+    @property
+    def post_data(self):
+        # Like Playwright: strict UTF-8 decoding
+        return self.post_data_buffer.decode('utf-8')
+
+
+def test_recorder() -> bool:
+    log_root = tempfile.mkdtemp()
+    recorder = NetworkRecorder(log_root=log_root, record_headers=True)
+    ok = True
+
+    try:
+        boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
+        multipart = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"text\"\r\n\r\nКвартира\r\n"
+                     f"--{boundary}\r\nContent-Disposition: form-data; name=\"image\"; filename=\"01.jpg\"\r\n"
+                     f"Content-Type: image/jpeg\r\n\r\n").encode('utf-8') + JPEG + f"\r\n--{boundary}--\r\n".encode()
+        login = ("_csrf=abc123token&loginform-email=user%40example.com&loginform-password=Sup3rSecret"
+                 "&login-button=").encode()
+
+        recorder._on_request(FakeRequest("https://doska.orbita.co.il/my/add/", multipart,
+                                         f"multipart/form-data; boundary={boundary}"))
+        recorder._on_request(FakeRequest("https://passport.orbita.co.il/site/login/", login,
+                                         "application/x-www-form-urlencoded"))
+        upload, login_entry = [entry for entry in recorder.buffer if entry['type'] == 'request']
+
+        if upload.get('post_data') != f"<{len(multipart)} bytes multipart/form-data>":
+            print(f"❌ Multipart body: expected only its size, got {upload.get('post_data')!r}")
+            ok = False
+
+        post_data = login_entry.get('post_data', "")
+        if "Sup3rSecret" in post_data or "abc123token" in post_data:
+            print(f"❌ Login body leaks secrets: {post_data!r}")
+            ok = False
+        if "loginform-email=user%40example.com" not in post_data:
+            print(f"❌ Login body lost its non-secret fields: {post_data!r}")
+            ok = False
+        if "secret-session" in str(login_entry.get('headers')):
+            print(f"❌ Cookie header recorded: {login_entry.get('headers')}")
+            ok = False
+    finally:
+        recorder.close()
+        shutil.rmtree(log_root, ignore_errors=True)
+
+    print(f"{'✅' if ok else '❌'} Network recorder request bodies")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if test_recorder() else 1)
@@ -155,7 +155,7 @@ def test_fallback_only():
             
             # Extract district - expanded list with streets
             districts = ['НАХЛАД ИУДА', 'РЕМЕЗ', 'НЕВЕ ДЕНЯ', 'КИРЬЯТ ГАОН', 'РАМАТ ЭЛИЯУ', 'ЦЕНТР', 'СТАРЫЙ ГОРОД']
-            streets = ['РОТШИЛЬД', 'ГЕРЦЛЬ', 'ЖАБОТИНСКИЙ', 'БЯЛИК', 'АХАД ХААМ', 'РОШ ПИНА', 'ВАЙЦМАН', 'БEN ГУРИОН', 'СОКОЛОВ']
+            streets = ['РОТШИЛЬД', 'ГЕРЦЛЬ', 'ЖАБОТИНСКИЙ', 'БЯЛИК', 'АХАД ХААМ', 'РОШ ПИНА', 'ВАЙЦМАН', 'БЕН ГУРИОН', 'СОКОЛОВ']
             
             # Check districts first
             for district in districts:
@@ -1,54 +1,94 @@
 #!/usr/bin/env python3
 """
-Test script for OpenAI text cleaning functionality
+Test script for ad text cleaning (local cleaner + OpenAI parameter extraction)
 """
 
 import os
 import sys
 import json
-from orbita_form_filler_v2 import OpenAIExtractor
+from text_cleaner import clean_ad_text, has_blocked_characters
 
-def test_text_cleaning():
-    """Test the text cleaning functionality"""
-    
-    # Sample ad text with emojis and special characters
-    test_ad_text = """
+BLOCKED_AD_FILE = "заблокированный текст объявления.txt"
+
+# Sample ad text with emojis and special characters
+TEST_AD_TEXT = """
     🏠 Продается квартира в центре Ришон-ле-Циона! 🌞
-    
+
     📐 Площадь: ~80 м²
     🛏️ 3 комнаты
     💰 Цена: 2,500,000 ₪
     📍 Адрес: ул. Ротшильд, 15
     ✨ Полностью обставлена
     🚗 Парковка в цене
-    
+
     תיאור בעברית: דירה מרווחת ויפה
-    
+
     ⭐ Контакт: 050-123-4567
     """
-    
-    print("🧪 Testing OpenAI Text Cleaning...")
-    print(f"Original text:\n{test_ad_text}")
-    print("\n" + "="*50 + "\n")
-    
+
+def check_cleaned(name: str, original: str, expected_phrases) -> bool:
+    """Clean one text and check the result"""
+    cleaned = clean_ad_text(original)
+
+    print(f"📝 {name} - cleaned text:\n{cleaned}\n")
+
+    ok = True
+    if has_blocked_characters(cleaned):
+        print("❌ Cleaned text still contains emoji, Hebrew or special symbols")
+        ok = False
+    for phrase in expected_phrases:
+        if phrase not in cleaned:
+            print(f"❌ Expected phrase not found: {phrase!r}")
+            ok = False
+
+    print(f"{'✅' if ok else '❌'} {name}")
+    print("=" * 50 + "\n")
+    return ok
+
+def test_local_cleaning() -> bool:
+    """Test the local text cleaner on the sample and the blocked ad"""
+    print("🧪 Testing local text cleaning...")
+    print("=" * 50 + "\n")
+
+    results = [check_cleaned("Sample ad", TEST_AD_TEXT, [
+        "около 80 кв. м", "2,500,000 шекелей", "ул. Ротшильд, 15", "квартира"
+    ])]
+
+    if os.path.exists(BLOCKED_AD_FILE):
+        with open(BLOCKED_AD_FILE, 'r', encoding='utf-8') as f:
+            blocked_text = f.read()
+        results.append(check_cleaned("Blocked ad", blocked_text, [
+            "Ул. ха-Башан", "124 кв. м", "около 24 кв. м", "2,290,000 шекелей", "Площадь около 95 кв. м"
+        ]))
+    else:
+        print(f"⚠️ {BLOCKED_AD_FILE} not found, skipping")
+
+    return all(results)
+
+def test_openai_extraction():
+    """Test OpenAI parameter extraction (needs OPENAI_API_KEY or OPENAI_BASE_URL)"""
+    from orbita_form_filler_v2 import OpenAIExtractor
+
+    print("🧪 Testing OpenAI parameter extraction...")
+
     try:
         # Initialize OpenAI extractor
         extractor = OpenAIExtractor()
-        
-        # Extract parameters and clean text
-        result = extractor.extract_parameters(test_ad_text)
-        
+
+        # Extract parameters (text is cleaned locally)
+        result = extractor.extract_parameters(TEST_AD_TEXT)
+
         print("✅ OpenAI Processing Results:")
         print(f"Parameters: {json.dumps(result, indent=2, ensure_ascii=False)}")
-        
-        if "cleaned_text" in result:
-            print(f"\n📝 Cleaned text:\n{result['cleaned_text']}")
-        else:
-            print("⚠️ No cleaned text found in result")
-            
+
     except Exception as e:
-        print(f"❌ Error testing text cleaning: {e}")
+        print(f"❌ Error testing parameter extraction: {e}")
         print("⚠️ Make sure OPENAI_API_KEY is configured in config.py")
 
 if __name__ == "__main__":
-    test_text_cleaning() 
\ No newline at end of file
+    local_ok = test_local_cleaning()
+
+    if "--openai" in sys.argv:
+        test_openai_extraction()
+
+    sys.exit(0 if local_ok else 1)
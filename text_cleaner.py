@@ -0,0 +1,119 @@
+"""
+Local ad text cleaner
+
+Deterministic replacement for the "clean the text" part of the OpenAI
+prompt: removes emoji, spells out special symbols (~, м², ₪, $, €) and
+transliterates Hebrew words to Cyrillic. Runs in microseconds, so the
+model only has to return the small parameters object.
+"""
+
+import re
+from typing import Dict
+
+# Symbols spelled out for the Orbita textarea
+SYMBOL_TABLE = str.maketrans({
+    '~': ' около ',
+    '₪': ' шекелей ',
+    '$': ' долларов ',
+    '€': ' евро ',
+})
+
+# "м²" / "кв.м²" / "m²" -> "кв. м" (multi-character, so handled by regex)
+SQUARE_METERS_RE = re.compile(r'(?:кв\.?\s*)?[мm]\s?²')
+
+# Emoji, pictographs, dingbats, arrows/stars, flags, keycaps, ZWJ and variation selectors
+EMOJI_RE = re.compile(
+    '['
+    '\U0001F000-\U0001FAFF'
+    '\U0001F1E6-\U0001F1FF'
+    '☀-➿'
+    '⬀-⯿'
+    '⌀-⏿'
+    '←-⇿'
+    '⃣'
+    '‍'
+    '︎️'
+    ']+'
+)
+
+HEBREW_WORD_RE = re.compile(r'[א-תװ-״][֑-״\'"״׳-]*')
+HEBREW_POINTS_RE = re.compile(r'[֑-ׇ]')
+
+# Known words (streets, districts, common ad words) with their usual Russian spelling
+HEBREW_WORDS: Dict[str, str] = {
+    'הבשן': 'ха-Башан',
+    'רמז': 'Ремез',
+    'ראשון': 'Ришон',
+    'לציון': 'ле-Цион',
+    'ראשון לציון': 'Ришон ле-Цион',
+    'רחוב': 'улица',
+    'דירה': 'квартира',
+    'חדרים': 'комнат',
+    'קומה': 'этаж',
+    'ממ"ד': 'мамад',
+    'ממד': 'мамад',
+    'חניה': 'парковка',
+    'מעלית': 'лифт',
+    'מרפסת': 'балкон',
+    'טאבו': 'табу',
+    'ארנונה': 'арнона',
+}
+
+# Letter-by-letter fallback for unknown words
+HEBREW_LETTERS = str.maketrans({
+    'א': 'а', 'ב': 'б', 'ג': 'г', 'ד': 'д', 'ה': 'х', 'ו': 'в', 'ז': 'з',
+    'ח': 'х', 'ט': 'т', 'י': 'и', 'כ': 'к', 'ך': 'х', 'ל': 'л', 'מ': 'м',
+    'ם': 'м', 'נ': 'н', 'ן': 'н', 'ס': 'с', 'ע': 'а', 'פ': 'п', 'ף': 'ф',
+    'צ': 'ц', 'ץ': 'ц', 'ק': 'к', 'ר': 'р', 'ש': 'ш', 'ת': 'т',
+    'װ': 'в', 'ױ': 'ой', 'ײ': 'ей', '״': '', '׳': '', '"': '', "'": '',
+})
+
+SPACES_RE = re.compile(r'[ \t ]{2,}')
+SPACE_BEFORE_PUNCT_RE = re.compile(r' +([,.;:!?)])')
+LINE_EDGE_SPACES_RE = re.compile(r'^[ \t\u00a0]+|[ \t\u00a0]+$', re.MULTILINE)
+
+
+def transliterate_hebrew_word(word: str) -> str:
+    """Transliterate one Hebrew word to Cyrillic"""
+    word = HEBREW_POINTS_RE.sub('', word)
+    if word in HEBREW_WORDS:
+        return HEBREW_WORDS[word]
+
+    # Final he is usually a vowel ("דירה" -> "дира")
+    if len(word) > 1 and word.endswith('ה'):
+        word = word[:-1] + 'א'
+
+    result = word.translate(HEBREW_LETTERS)
+    return result[:1].upper() + result[1:]
+
+
+def transliterate_hebrew(text: str) -> str:
+    """Replace every Hebrew word (known phrases first) with Cyrillic"""
+    if not HEBREW_WORD_RE.search(text):
+        return text
+    for phrase, replacement in HEBREW_WORDS.items():
+        if ' ' in phrase and phrase in text:
+            text = text.replace(phrase, replacement)
+    return HEBREW_WORD_RE.sub(lambda m: transliterate_hebrew_word(m.group(0)), text)
+
+
+def clean_ad_text(text: str) -> str:
+    """Clean ad text for the Orbita form (no emoji, symbols or Hebrew)"""
+    if not text:
+        return ""
+
+    text = EMOJI_RE.sub(' ', text)
+    text = SQUARE_METERS_RE.sub(' кв. м', text)
+    text = text.translate(SYMBOL_TABLE)
+    text = transliterate_hebrew(text)
+
+    text = SPACES_RE.sub(' ', text)
+    text = SPACE_BEFORE_PUNCT_RE.sub(r'\1', text)
+    text = LINE_EDGE_SPACES_RE.sub('', text)
+    return text.strip()
+
+
+def has_blocked_characters(text: str) -> bool:
+    """True if text still contains emoji, Hebrew or symbols the site rejects"""
+    return bool(EMOJI_RE.search(text) or HEBREW_WORD_RE.search(text)
+                or SQUARE_METERS_RE.search(text) or any(ch in text for ch in '~₪$€'))